@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark archive-mode hashing on archives of many small files.
+
+Usage: python3 benchmarks/bench_archives.py [--members 5000] [--member-kb 4]
+
+Builds zip, tar and tar.gz archives of the same random members and times
+the plain archive SHA-256 against the archive-mode pass, which also hashes
+every member (without extracting to disk). Half the members are first
+recorded in the local index, so the known-member report is exercised too;
+backend checks are answered in-process and counted, up to the per-archive
+DDAS_ARCHIVE_MAX_BACKEND_CHECKS cap.
+"""
+import argparse
+import hashlib
+import io
+import logging
+import os
+import sys
+import tarfile
+import tempfile
+import time
+import zipfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+# The index entries below are synthetic; keep them out of the checkout's state files
+os.environ.setdefault('DDAS_SNAPSHOT_PATH', '')
+os.environ.setdefault('DDAS_METADATA_DB', '')
+
+import server  # noqa: E402
+
+
+class Response:
+    status_code = 200
+
+    def json(self):
+        return {"exists": False}
+
+
+class NotFoundBackend:
+    calls = 0
+
+    def get(self, url, **kwargs):
+        self.calls += 1
+        return Response()
+
+
+def build_archives(tmp, members):
+    paths = {'zip': os.path.join(tmp, 'bench.zip'), 'tar': os.path.join(tmp, 'bench.tar'),
+             'tar.gz': os.path.join(tmp, 'bench.tar.gz')}
+    with zipfile.ZipFile(paths['zip'], 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members:
+            archive.writestr(name, data)
+    for kind, mode in (('tar', 'w'), ('tar.gz', 'w:gz')):
+        with tarfile.open(paths[kind], mode) as archive:
+            for name, data in members:
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                archive.addfile(info, io.BytesIO(data))
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--members', type=int, default=5000)
+    parser.add_argument('--member-kb', type=int, default=4)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    server.HASH_ALGORITHM = 'blake2b'
+    server.ARCHIVE_MAX_MEMBERS = args.members
+    backend = server.backend_client = NotFoundBackend()
+
+    user_id = server.user_id_from_token('bench')
+    members = [(f"dir{i % 50}/file-{i}.bin", os.urandom(args.member_kb * 1024)) for i in range(args.members)]
+    for name, data in members[::2]:
+        fast_hash = server.new_hasher('blake2b')
+        fast_hash.update(data)
+        server.remember_hash(user_id, fast_hash.hexdigest(), hashlib.sha256(data).hexdigest(), name)
+
+    print(f"{args.members} members of {args.member_kb} KB")
+    print(f"{'format':<8}{'MB':>8}{'plain ms':>10}{'archive ms':>12}{'members/s':>11}{'known':>8}{'checks':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for kind, path in build_archives(tmp, members).items():
+            start = time.perf_counter()
+            server.calculate_file_hash(path)
+            plain = time.perf_counter() - start
+
+            backend.calls = 0
+            start = time.perf_counter()
+            file_hash, hashed = server.calculate_archive_hashes(path, server.archive_kind(path))
+            report = server.find_known_members(user_id, kind, hashed, {})
+            archive = time.perf_counter() - start
+            assert file_hash == server.calculate_file_hash(path)
+
+            print(f"{kind:<8}{os.path.getsize(path) / 1024 ** 2:>8.1f}{plain * 1000:>10.1f}"
+                  f"{archive * 1000:>12.1f}{len(hashed) / archive:>11.0f}{report['known_count']:>8}"
+                  f"{backend.calls:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark the hashing read path with and without I/O hints.
+
+Usage: python3 benchmarks/bench_io_hints.py [--size-mb 1024] [--dir /path/on/real/disk]
+
+For each mode (plain reads, fadvise, direct I/O) the file is hashed once with a
+cold cache and once warm, reporting throughput and how much of the file is
+left in the page cache afterwards. Linux only: cold runs rely on
+POSIX_FADV_DONTNEED and residency is read with mincore(2). Use a directory on
+a real filesystem - tmpfs keeps everything in memory and rejects O_DIRECT.
+"""
+import argparse
+import ctypes
+import ctypes.util
+import mmap
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import server  # noqa: E402
+
+libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+
+MODES = {
+    'plain': {'HASH_FADVISE': False, 'HASH_DIRECT_IO': False},
+    'fadvise': {'HASH_FADVISE': True, 'HASH_DIRECT_IO': False},
+    'direct': {'HASH_FADVISE': True, 'HASH_DIRECT_IO': True},
+}
+
+
+def resident_fraction(path):
+    """Fraction of the file's pages currently in the page cache"""
+    size = os.path.getsize(path)
+    page = mmap.PAGESIZE
+    pages = -(-size // page)
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_COPY)
+        try:
+            vec = (ctypes.c_ubyte * pages)()
+            addr = ctypes.addressof(ctypes.c_char.from_buffer(mapped))
+            if libc.mincore(ctypes.c_void_p(addr), ctypes.c_size_t(size), vec) != 0:
+                raise OSError(ctypes.get_errno(), 'mincore failed')
+            resident = sum(v & 1 for v in vec)
+        finally:
+            mapped.close()
+    return resident / pages
+
+
+def evict(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+
+def warm(path):
+    with open(path, 'rb') as f:
+        while f.read(server.HASH_CHUNK_SIZE):
+            pass
+
+
+def run(path, size):
+    start = time.perf_counter()
+    server.calculate_file_hash(path)
+    elapsed = time.perf_counter() - start
+    return size / 1024 ** 2 / elapsed, resident_fraction(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size-mb', type=int, default=1024)
+    parser.add_argument('--dir', default=os.path.dirname(os.path.abspath(__file__)))
+    args = parser.parse_args()
+
+    size = args.size_mb * 1024 * 1024
+    path = os.path.join(args.dir, 'ddas_io_bench.bin')
+    with open(path, 'wb') as f:
+        block = os.urandom(1024 * 1024)
+        for _ in range(args.size_mb):
+            f.write(block)
+
+    try:
+        print(f"File: {args.size_mb} MB at {path}")
+        print(f"{'mode':<10}{'cold MB/s':>12}{'cached after':>14}{'warm MB/s':>12}{'cached after':>14}")
+        for name, settings in MODES.items():
+            for attr, value in settings.items():
+                setattr(server, attr, value)
+
+            evict(path)
+            cold_rate, cold_resident = run(path, size)
+            warm(path)
+            warm_rate, warm_resident = run(path, size)
+            print(f"{name:<10}{cold_rate:>12.0f}{cold_resident:>13.0%}"
+                  f"{warm_rate:>12.0f}{warm_resident:>13.0%}")
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Drive /process end to end with a realistic mix of downloads and report throughput.
+
+Usage: python3 benchmarks/bench_load.py [--requests 300] [--concurrency 8]
+       [--duplicate-rate 0.3] [--median-kb 256] [--sigma 1.5] [--max-mb 32]
+       [--latency-ms 0] [--jitter-ms 0] [--error-rate 0] [--conflict-rate 0]
+       [--server-url http://127.0.0.1:5001] [--output load.json]
+
+File sizes are log-normal (most downloads are small, a few are very large),
+capped at --max-mb. A --duplicate-rate share of requests re-download an
+earlier file under a new name (a hard link, so the content is identical).
+
+By default the DDAS server and the stub backend (stub_backend.py, with the
+injected latency/error/409 rates) both run in this process on local ports
+and requests go over real HTTP. With --server-url an already running server
+is driven instead; it must share this machine's filesystem and its backend
+is whatever it was started with (e.g. DDAS_BACKEND_API_URL pointing at
+python3 stub_backend.py).
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, REPO_ROOT)
+
+import requests  # noqa: E402
+from stub_backend import StubFaults, start_stub_backend  # noqa: E402
+from werkzeug.serving import make_server  # noqa: E402
+
+BLOCK = os.urandom(1024 * 1024)
+
+
+def file_sizes(rng, count, median_kb, sigma, max_mb):
+    mu = math.log(median_kb * 1024)
+    return [int(min(max(rng.lognormvariate(mu, sigma), 1024), max_mb * 1024 * 1024)) for _ in range(count)]
+
+
+def write_file(path, size, seed):
+    with open(path, 'wb') as f:
+        f.write(seed.to_bytes(16, 'big'))  # Distinct content per file
+        remaining = size - 16
+        while remaining > 0:
+            f.write(BLOCK[:remaining])
+            remaining -= len(BLOCK)
+
+
+def plan_requests(tmp, rng, count, duplicate_rate, sizes):
+    """Create the files; returns [(path, size)] in request order"""
+    plan, originals = [], []
+    unique = iter(sizes)
+    for i in range(count):
+        if originals and rng.random() < duplicate_rate:
+            source, size = rng.choice(originals)
+            path = os.path.join(tmp, f'copy-{i}-{os.path.basename(source)}')
+            try:
+                os.link(source, path)
+            except OSError:
+                path = source
+        else:
+            size = next(unique)
+            path = os.path.join(tmp, f'download-{i}.bin')
+            write_file(path, size, i)
+            originals.append((path, size))
+        plan.append((path, size))
+    return plan
+
+
+def verdict(response):
+    try:
+        body = response.json()
+    except ValueError:
+        return 'error'
+    if response.status_code != 200 or not body.get('success'):
+        return 'error'
+    return 'duplicate' if body.get('duplicate') else 'uploaded'
+
+
+def latency_summary(samples_ms):
+    ordered = sorted(samples_ms)
+    if len(ordered) < 2:
+        return {key: round(ordered[0], 2) if ordered else None for key in ('mean', 'p50', 'p90', 'p99', 'max')}
+    cuts = statistics.quantiles(ordered, n=100, method='inclusive')
+    return {"mean": round(statistics.mean(ordered), 2), "p50": round(cuts[49], 2),
+            "p90": round(cuts[89], 2), "p99": round(cuts[98], 2), "max": round(ordered[-1], 2)}
+
+
+def run_load(server_url, plan, concurrency, token):
+    local = threading.local()
+
+    def send(item):
+        path, size = item
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()  # Keep-alive per client thread
+        start = time.perf_counter()
+        try:
+            outcome = verdict(session.post(f'{server_url}/process', json={'path': path, 'auth_token': token},
+                                           timeout=300))
+        except requests.RequestException:
+            outcome = 'error'
+        return outcome, size, (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(send, plan))
+    return outcomes, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duplicate-rate', type=float, default=0.3)
+    parser.add_argument('--median-kb', type=float, default=256)
+    parser.add_argument('--sigma', type=float, default=1.5, help='Log-normal shape; larger means a longer tail')
+    parser.add_argument('--max-mb', type=float, default=32)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Stub backend latency per call')
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Stub backend calls answered with 500')
+    parser.add_argument('--conflict-rate', type=float, default=0.0, help='Stub backend uploads answered with 409')
+    parser.add_argument('--server-url', help='Drive this running server instead of an in-process one')
+    parser.add_argument('--token', default='load-test')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='Also write the results as JSON')
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        stub = ddas = None
+        server_url = args.server_url
+        if server_url is None:
+            faults = StubFaults(args.latency_ms, args.jitter_ms, args.error_rate, args.conflict_rate, args.seed)
+            backend_url, stub = start_stub_backend(faults)
+            # Configure before import: server.py reads its settings at import time
+            os.environ['DDAS_BACKEND_API_URL'] = backend_url
+            os.environ.setdefault('DDAS_SNAPSHOT_PATH', '')
+            os.environ.setdefault('DDAS_LOG_PATH', os.path.join(tmp, 'server.log'))
+            os.environ.setdefault('DDAS_METADATA_DB', os.path.join(tmp, 'metadata.db'))
+            os.environ.setdefault('DDAS_LOG_LEVEL', 'WARNING')
+            import server
+            ddas = make_server('127.0.0.1', 0, server.app, threaded=True)
+            threading.Thread(target=ddas.serve_forever, daemon=True).start()
+            server_url = f'http://127.0.0.1:{ddas.server_port}'
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+        sizes = file_sizes(rng, args.requests, args.median_kb, args.sigma, args.max_mb)  # Duplicates leave some unused
+        plan = plan_requests(tmp, rng, args.requests, args.duplicate_rate, sizes)
+        total_mb = sum(size for _, size in plan) / 1024 ** 2
+        print(f"{args.requests} requests, {total_mb:.1f} MB, concurrency {args.concurrency}, "
+              f"median {statistics.median(size for _, size in plan) / 1024:.0f} KB, "
+              f"largest {max(size for _, size in plan) / 1024 ** 2:.1f} MB")
+        outcomes, elapsed = run_load(server_url, plan, args.concurrency, args.token)
+        if ddas is not None:
+            ddas.shutdown()
+            stub.shutdown()
+
+    results = {
+        "requests": len(outcomes),
+        "seconds": round(elapsed, 3),
+        "requests_per_s": round(len(outcomes) / elapsed, 2),
+        "mb_per_s": round(total_mb / elapsed, 2),
+        "all": latency_summary([ms for _, _, ms in outcomes]),
+        "verdicts": {},
+    }
+    print(f"{elapsed:.2f} s: {results['requests_per_s']:.1f} req/s, {results['mb_per_s']:.1f} MB/s")
+    print(f"{'verdict':<11}{'count':>7}{'mean ms':>10}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name in ('uploaded', 'duplicate', 'error', 'all'):
+        samples = [ms for outcome, _, ms in outcomes if name in (outcome, 'all')]
+        if not samples:
+            continue
+        summary = latency_summary(samples)
+        if name != 'all':
+            results["verdicts"][name] = dict(summary, count=len(samples))
+        print(f"{name:<11}{len(samples):>7}" + ''.join(f"{summary[key]:>10.1f}"
+                                                      for key in ('mean', 'p50', 'p90', 'p99', 'max')))
+
+    if stub is not None:
+        results["backend"] = dict(stub.app.config['STUB_STATS'])
+        print("stub backend: " + ", ".join(f"{key} {value}" for key, value in results["backend"].items()))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
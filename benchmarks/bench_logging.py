@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark /process request latency with logging off, synchronous and queued.
+
+Usage: python3 benchmarks/bench_logging.py [--requests 2000] [--threads 8]
+
+Requests hit the local fast-hash index so no backend is needed; what remains
+is request handling, hashing a small file and the log lines each request
+emits. "sync" reproduces the old FileHandler setup, "queue" is the
+QueueHandler/QueueListener pipeline the server installs.
+"""
+import argparse
+import atexit
+import logging
+import os
+import queue
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import server  # noqa: E402
+
+
+def configure(mode, log_path):
+    """Install the logging setup for a mode; returns a listener to stop, if any"""
+    root = logging.getLogger()
+    logging.disable(logging.NOTSET)
+    if mode == 'off':
+        logging.disable(logging.CRITICAL)
+        return None
+    if mode == 'sync':
+        handler = logging.FileHandler(log_path)
+        handler.setFormatter(logging.Formatter(server.TEXT_LOG_FORMAT))
+        root.handlers = [handler]
+        return None
+    handler = RotatingFileHandler(log_path, maxBytes=server.LOG_MAX_BYTES, backupCount=1)
+    handler.setFormatter(server.JsonLinesFormatter())
+    log_queue = queue.SimpleQueue()
+    root.handlers = [QueueHandler(log_queue)]
+    listener = QueueListener(log_queue, handler)
+    listener.start()
+    return listener
+
+
+def worker(path, count, latencies):
+    client = server.app.test_client()
+    payload = {'path': path, 'auth_token': 'bench'}
+    for _ in range(count):
+        start = time.perf_counter()
+        client.post('/process', json=payload)
+        latencies.append(time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=8)
+    args = parser.parse_args()
+
+    atexit.unregister(server.log_listener.stop)
+    server.log_listener.stop()
+    server.HASH_ALGORITHM = 'blake2b'
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'download.bin')
+        with open(path, 'wb') as f:
+            f.write(os.urandom(4096))
+        fast_hash = server.calculate_file_hash(path, 'blake2b')
+        server.remember_hash(server.user_id_from_token('bench'), fast_hash,
+                             server.calculate_file_hash(path), 'original.bin')
+
+        print(f"{args.requests} requests on {args.threads} threads")
+        print(f"{'logging':<8}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}")
+        for mode in ('off', 'sync', 'queue'):
+            listener = configure(mode, os.path.join(tmp, f'{mode}.log'))
+            latencies = []
+            per_thread = args.requests // args.threads
+            threads = [threading.Thread(target=worker, args=(path, per_thread, latencies))
+                       for _ in range(args.threads)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            if listener:
+                listener.stop()
+
+            cuts = statistics.quantiles(latencies, n=100)
+            print(f"{mode:<8}{statistics.mean(latencies) * 1000:>10.3f}"
+                  f"{cuts[49] * 1000:>10.3f}{cuts[98] * 1000:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
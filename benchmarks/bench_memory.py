@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Check that /process memory stays flat as concurrency grows.
+
+Usage: python3 benchmarks/bench_memory.py [--size-mb 64] [--concurrency 1,8,32] [--limit-mb 8]
+
+Each level posts that many /process requests at once for distinct files, with
+the backend replaced by an in-process client that drains the upload body.
+Peak Python heap growth is read with tracemalloc; read buffers come from the
+preallocated pool, so they are not part of the growth. Exits non-zero if any
+level grows past --limit-mb.
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import server  # noqa: E402
+
+
+class Response:
+    def __init__(self, status_code, data):
+        self.status_code = status_code
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+class DrainingBackend:
+    """Answers "not found" to hash checks and reads uploads in small pieces"""
+
+    def get(self, url, **kwargs):
+        return Response(200, {"exists": False})
+
+    def post(self, url, data=None, content=None, **kwargs):
+        for _ in data if data is not None else content:
+            pass
+        return Response(201, {})
+
+
+def run_level(paths):
+    client = server.app.test_client()
+    failures = []
+
+    def call(path):
+        response = client.post('/process', json={'path': path, 'auth_token': 'bench'})
+        if not response.get_json().get('success'):
+            failures.append(response.get_json())
+
+    threads = [threading.Thread(target=call, args=(p,)) for p in paths]
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return tracemalloc.get_traced_memory()[1] - baseline, elapsed, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size-mb', type=int, default=64)
+    parser.add_argument('--concurrency', default='1,8,32')
+    parser.add_argument('--limit-mb', type=float, default=8)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    server.backend_client = DrainingBackend()
+
+    levels = [int(n) for n in args.concurrency.split(',')]
+    print(f"{args.size_mb} MB files, pool of {server.buffer_pool.count} x "
+          f"{server.buffer_pool.buffer_size // 1024} KB buffers")
+    print(f"{'requests':>10}{'peak MB':>10}{'seconds':>10}")
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        block = os.urandom(1024 * 1024)
+        for i in range(max(levels)):
+            path = os.path.join(tmp, f'download-{i}.bin')
+            with open(path, 'wb') as f:
+                f.write(i.to_bytes(8, 'big'))  # distinct content per file
+                for _ in range(args.size_mb):
+                    f.write(block)
+            paths.append(path)
+
+        tracemalloc.start()
+        for level in levels:
+            peak, elapsed, failures = run_level(paths[:level])
+            print(f"{level:>10}{peak / 1024 ** 2:>10.2f}{elapsed:>10.1f}")
+            if failures:
+                print(f"  {len(failures)} requests failed: {failures[0]}")
+                ok = False
+            if peak > args.limit_mb * 1024 ** 2:
+                print(f"  peak exceeds {args.limit_mb} MB")
+                ok = False
+        tracemalloc.stop()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark the SQLite metadata store: batched vs. per-row inserts and indexed queries.
+
+Usage: python3 benchmarks/bench_metadata_store.py [--rows 100000] [--users 20] [--queries 2000]
+
+"per-row commit" inserts each row in its own transaction, as recording
+straight from the request path would. "batched" queues rows with record()
+and lets the store insert them with executemany, one transaction per batch.
+Queries then run against the filled database: a digest lookup (the local
+duplicate check) and a 50-row history page, each with and without its index.
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+
+def make_rows(count, users, rng):
+    start = time.time() - 90 * 86400
+    rows = []
+    for i in range(count):
+        digest = '%064x' % rng.getrandbits(256)
+        rows.append((f"user-{i % users}", start + i * 90 * 86400 / count, f"/downloads/file-{i}.bin",
+                     f"file-{i}.bin", rng.randint(1024, 64 * 1024 ** 2), digest,
+                     'uploaded' if rng.random() < 0.7 else 'duplicate', None, None, None, 12.5))
+    return rows
+
+
+def per_row(store_class, path, rows):
+    connection = sqlite3.connect(path)
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')
+    connection.executescript(store_class.SCHEMA)
+    start = time.perf_counter()
+    for row in rows:
+        with connection:
+            connection.execute(store_class.INSERT, row)
+    return time.perf_counter() - start
+
+
+def batched(store, rows):
+    start = time.perf_counter()
+    for row in rows:
+        store.record(row)
+    store.flush()
+    return time.perf_counter() - start
+
+
+def timed_us(fn, args_list):
+    samples = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(samples), statistics.quantiles(samples, n=100, method='inclusive')[98]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--queries', type=int, default=2000)
+    args = parser.parse_args()
+    rng = random.Random(1)
+    rows = make_rows(args.rows, args.users, rng)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Configure before import: server.py reads its settings at import time
+        os.environ.setdefault('DDAS_SNAPSHOT_PATH', '')
+        os.environ.setdefault('DDAS_LOG_PATH', os.path.join(tmp, 'server.log'))
+        os.environ.setdefault('DDAS_LOG_LEVEL', 'WARNING')
+        os.environ['DDAS_METADATA_DB'] = ''  # The stores below are opened explicitly
+        import server
+        run(server.MetadataStore, tmp, rows, args.queries, rng)
+
+
+def run(store_class, tmp, rows, queries, rng):
+    print(f"{'insert':<16}{'rows':>9}{'seconds':>9}{'rows/s':>11}")
+    per_row_rows = rows[:5000]  # A transaction per row is slow; a few thousand show the rate
+    seconds = per_row(store_class, os.path.join(tmp, 'per_row.db'), per_row_rows)
+    print(f"{'per-row commit':<16}{len(per_row_rows):>9}{seconds:>9.2f}{len(per_row_rows) / seconds:>11.0f}")
+    store = store_class(os.path.join(tmp, 'batched.db'))
+    seconds = batched(store, rows)
+    print(f"{'batched':<16}{len(rows):>9}{seconds:>9.2f}{len(rows) / seconds:>11.0f}   ({store.batches} transactions)")
+
+    picks = [rows[rng.randrange(len(rows))] for _ in range(queries)]
+    connection = sqlite3.connect(os.path.join(tmp, 'batched.db'))
+    scan_digest = store_class.FIND_DIGEST.replace('FROM files', 'FROM files NOT INDEXED')
+    scan_picks = picks[:max(2, queries // 100)]  # Full scans are slow; fewer samples suffice
+    history = (f"SELECT {store_class.HISTORY_COLUMNS} FROM files{{}} WHERE user_id = ?"
+               " AND processed_at >= ? ORDER BY processed_at DESC LIMIT 50")
+
+    print(f"\n{'query':<28}{'p50 us':>10}{'p99 us':>10}")
+    results = [
+        ('digest lookup', timed_us(store.find_digest, [(row[0], row[5]) for row in picks])),
+        ('digest lookup, no index', timed_us(lambda *p: connection.execute(scan_digest, p).fetchone(),
+                                             [(row[0], row[5]) for row in scan_picks])),
+        ('history page', timed_us(store.history, [(row[0], row[1]) for row in picks])),
+        ('history page, no index', timed_us(lambda *p: connection.execute(history.format(' NOT INDEXED'),
+                                                                          p).fetchall(),
+                                            [(row[0], row[1]) for row in scan_picks])),
+    ]
+    for label, (p50, p99) in results:
+        print(f"{label:<28}{p50:>10.1f}{p99:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
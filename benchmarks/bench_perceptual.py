@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark perceptual hashing and the Hamming-distance index.
+
+Usage: python3 benchmarks/bench_perceptual.py [--images 200] [--entries 50000]
+
+Generates synthetic photos, then re-encodes each one as a lower-quality,
+resized JPEG (what a CDN does) and reports fingerprint time per image, the
+batched hash time, the distance between originals and their variants versus
+unrelated images, and index search latency at --entries fingerprints.
+Needs numpy and Pillow.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import server  # noqa: E402
+
+numpy = server.numpy
+Image = server.PIL_Image
+
+
+def synthetic_photo(rng, size=(640, 480)):
+    """Smooth random colour field with a few shapes - enough structure to hash"""
+    low = rng.integers(0, 256, (6, 8, 3), dtype=numpy.uint8)
+    image = Image.fromarray(low).resize(size, Image.BICUBIC)
+    pixels = numpy.asarray(image).copy()
+    for _ in range(5):
+        x, y = rng.integers(0, size[0] - 100), rng.integers(0, size[1] - 100)
+        pixels[y:y + rng.integers(20, 100), x:x + rng.integers(20, 100)] = rng.integers(0, 256, 3)
+    return Image.fromarray(pixels)
+
+
+def distance(a, b):
+    return bin(a[0] ^ b[0]).count('1'), bin(a[1] ^ b[1]).count('1')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--images', type=int, default=200)
+    parser.add_argument('--entries', type=int, default=50000)
+    args = parser.parse_args()
+    if numpy is None or Image is None:
+        sys.exit("numpy and Pillow are required")
+
+    rng = numpy.random.default_rng(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        originals, variants = [], []
+        for i in range(args.images):
+            photo = synthetic_photo(rng)
+            original = os.path.join(tmp, f'photo-{i}.png')
+            variant = os.path.join(tmp, f'photo-{i}-cdn.jpg')
+            photo.save(original)
+            photo.resize((320, 240), Image.BILINEAR).save(variant, quality=60)
+            originals.append(original)
+            variants.append(variant)
+
+        start = time.perf_counter()
+        original_hashes = [server.calculate_perceptual_hash(p) for p in originals]
+        variant_hashes = [server.calculate_perceptual_hash(p) for p in variants]
+        per_image = (time.perf_counter() - start) / (2 * args.images) * 1000
+
+        grids = [server.image_pixels(p) for p in originals]
+        phash_pixels = numpy.stack([g[0] for g in grids])
+        dhash_pixels = numpy.stack([g[1] for g in grids])
+        start = time.perf_counter()
+        server.perceptual_hashes(phash_pixels, dhash_pixels)
+        batched = (time.perf_counter() - start) / args.images * 1e6
+
+    same = [distance(a, b) for a, b in zip(original_hashes, variant_hashes)]
+    other = [distance(a, b) for a, b in zip(original_hashes, original_hashes[1:])]
+    limit = server.PERCEPTUAL_MAX_DISTANCE
+    print(f"{args.images} images: decode + hash {per_image:.2f} ms/image, "
+          f"hash only (batched) {batched:.1f} us/image")
+    print(f"{'pair':<12}{'pHash median':>14}{'dHash median':>14}{'matched':>10}")
+    for label, pairs in (('variant', same), ('unrelated', other)):
+        matched = sum(p <= limit and d <= limit for p, d in pairs) / len(pairs)
+        print(f"{label:<12}{statistics.median(p for p, _ in pairs):>14}"
+              f"{statistics.median(d for _, d in pairs):>14}{matched:>10.0%}")
+
+    index = server.PerceptualIndex(args.entries)
+    random_hashes = rng.integers(0, 2 ** 63, (args.entries, 2), dtype=numpy.int64).astype(numpy.uint64)
+    for i, (phash, dhash) in enumerate(random_hashes):
+        index.add(int(phash), int(dhash), f'{i:064x}', f'image-{i}.jpg')
+    queries = [variant_hashes[i % args.images] for i in range(1000)]
+    start = time.perf_counter()
+    for phash, dhash in queries:
+        index.search(phash, dhash, limit)
+    search_us = (time.perf_counter() - start) / len(queries) * 1e6
+    print(f"index search over {len(index)} fingerprints: {search_us:.0f} us/query")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Measure hashing throughput, /process latency and memory for the IEEE report.
+
+Usage: python3 benchmarks/bench_performance.py [--output perf.json] [--sizes-mb 1,10,100]
+       [--runs 3] [--requests 20] [--file-mb 10]
+
+calculate_file_hash is timed on files of each size (warm page cache, median
+of --runs), with the process CPU time over those runs and the Python heap peak
+of one more traced run. /process is driven through the Flask test client against a stub
+backend on a local port that keeps uploaded hashes, so the first pass over
+--requests distinct files takes the upload path and the second the duplicate
+path; one warm-up request first keeps import and connection set-up out of
+the figures. Results are printed and, with --output, written as JSON for
+generate_ieee_report.py --benchmarks.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import server  # noqa: E402
+from stub_backend import start_stub_backend  # noqa: E402
+
+
+def write_file(path, size_mb, seed):
+    block = os.urandom(1024 * 1024)
+    with open(path, 'wb') as f:
+        f.write(seed.to_bytes(8, 'big'))  # Distinct content per file
+        for _ in range(size_mb):
+            f.write(block)
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024  # bytes on macOS, KB elsewhere
+
+
+def percentiles(samples_ms):
+    cuts = statistics.quantiles(samples_ms, n=100) if len(samples_ms) > 1 else samples_ms * 99
+    return {"mean": round(statistics.mean(samples_ms), 2), "p50": round(cuts[49], 2),
+            "p90": round(cuts[89], 2), "p99": round(cuts[98], 2)}
+
+
+def bench_hashing(tmp, sizes_mb, runs):
+    results = []
+    for size_mb in sizes_mb:
+        path = os.path.join(tmp, f'hash-{size_mb}.bin')
+        write_file(path, size_mb, size_mb)
+        server.calculate_file_hash(path, drop_cache=False)  # Warm the page cache
+        times = []
+        cpu_start = time.process_time()
+        for _ in range(runs):
+            start = time.perf_counter()
+            server.calculate_file_hash(path, drop_cache=False)
+            times.append(time.perf_counter() - start)
+        cpu_percent = (time.process_time() - cpu_start) / sum(times) * 100  # Of one core
+        tracemalloc.start()
+        server.calculate_file_hash(path, drop_cache=False)
+        heap_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        seconds = statistics.median(times)
+        results.append({"size_mb": size_mb, "runs": runs, "median_s": round(seconds, 4),
+                        "mb_per_s": round(size_mb / seconds, 1), "cpu_percent": round(cpu_percent, 1),
+                        "heap_peak_mb": round(heap_peak / 1024 ** 2, 3)})
+        os.remove(path)
+    return results
+
+
+def bench_process(tmp, count, file_mb):
+    client = server.app.test_client()
+    paths = []
+    for i in range(count):
+        path = os.path.join(tmp, f'download-{i}.bin')
+        write_file(path, file_mb, 1000 + i)
+        paths.append(path)
+
+    warm_up = os.path.join(tmp, 'warm-up.bin')
+    write_file(warm_up, 1, 999)
+    client.post('/process', json={'path': warm_up, 'auth_token': 'bench'})  # Imports, backend connection
+
+    results = {}
+    tracemalloc.start()
+    for scenario in ('upload', 'duplicate'):
+        server.stage_latency = server.LatencyTracker()
+        latencies = []
+        start = time.perf_counter()
+        for path in paths:
+            request_start = time.perf_counter()
+            response = client.post('/process', json={'path': path, 'auth_token': 'bench'}).get_json()
+            latencies.append((time.perf_counter() - request_start) * 1000)
+            if not response.get('success') or response.get('duplicate') != (scenario == 'duplicate'):
+                raise SystemExit(f"unexpected /process result in {scenario} pass: {response}")
+        elapsed = time.perf_counter() - start
+        stages = server.stage_latency.summary()
+        stages.pop('total', None)
+        results[scenario] = {"latency_ms": percentiles(latencies), "requests_per_s": round(count / elapsed, 2),
+                             "stages_ms": stages}
+    tracemalloc_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return results, tracemalloc_peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--output', default=None)
+    parser.add_argument('--sizes-mb', default='1,10,100')
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--requests', type=int, default=20)
+    parser.add_argument('--file-mb', type=int, default=10)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+    baseline_rss = peak_rss_mb()
+    server.BACKEND_API_URL, stub = start_stub_backend()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            hashing = bench_hashing(tmp, [int(n) for n in args.sizes_mb.split(',')], args.runs)
+            process, tracemalloc_peak = bench_process(tmp, args.requests, args.file_mb)
+    finally:
+        stub.shutdown()
+
+    report = {
+        "environment": {
+            "generated_at": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "python": platform.python_version(),
+            "hash_algorithm": server.HASH_ALGORITHM,
+            "hash_chunk_kb": server.buffer_pool.buffer_size // 1024,
+            "hash_buffers": server.buffer_pool.count,
+        },
+        "hashing": hashing,
+        "process": dict(process, file_mb=args.file_mb, requests=args.requests),
+        "memory": {"baseline_rss_mb": round(baseline_rss, 1), "peak_rss_mb": round(peak_rss_mb(), 1),
+                   "python_heap_peak_mb": round(tracemalloc_peak / 1024 ** 2, 2)},
+    }
+
+    print(f"{'file MB':>8}{'median s':>10}{'MB/s':>10}{'CPU %':>8}{'heap MB':>10}")
+    for row in hashing:
+        print(f"{row['size_mb']:>8}{row['median_s']:>10.3f}{row['mb_per_s']:>10.0f}"
+              f"{row['cpu_percent']:>8.0f}{row['heap_peak_mb']:>10.3f}")
+    print(f"\n/process, {args.requests} x {args.file_mb} MB files")
+    print(f"{'path':<10}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'req/s':>8}")
+    for scenario, row in process.items():
+        latency = row['latency_ms']
+        print(f"{scenario:<10}{latency['p50']:>10.1f}{latency['p90']:>10.1f}{latency['p99']:>10.1f}"
+              f"{row['requests_per_s']:>8.1f}")
+    memory = report['memory']
+    print(f"\nRSS {memory['baseline_rss_mb']} MB at start, {memory['peak_rss_mb']} MB peak; "
+          f"Python heap peak during /process {memory['python_heap_peak_mb']} MB")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.output}")
+
+
+if __name__ == '__main__':
+    main()
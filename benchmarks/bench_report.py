@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark IEEE report generation cost as the report grows.
+
+Usage: python3 benchmarks/bench_report.py [--copies 1,10,50]
+
+Renders ieee_report.json repeated --copies times two ways: "per-run", where
+every paragraph sets font name, size and alignment on its own run (how the
+generator used to work), and "styled", the template renderer that references
+named styles. Reports render and save time and the .docx size. Performance
+figures are synthetic so no benchmark run is needed; charts are left out to
+time the document work alone.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import generate_ieee_report as report  # noqa: E402
+from docx import Document  # noqa: E402
+
+SYNTHETIC_PERF = {
+    "environment": {"generated_at": "2025-11-01T00:00:00+00:00", "platform": "bench", "processor": "bench",
+                    "cpu_count": 8, "python": "3", "hash_chunk_kb": 1024, "hash_buffers": 32},
+    "hashing": [{"size_mb": size, "runs": 3, "median_s": size / 800, "mb_per_s": 800.0, "cpu_percent": 99.0,
+                 "heap_peak_mb": 0.01} for size in (1, 10, 100)],
+    "process": {
+        "file_mb": 10, "requests": 20,
+        "upload": {"latency_ms": {"mean": 120.0, "p50": 118.0, "p90": 130.0, "p99": 139.0},
+                   "requests_per_s": 8.5, "stages_ms": {"hash": {"p50": 13.0, "p99": 15.0}}},
+        "duplicate": {"latency_ms": {"mean": 28.0, "p50": 28.0, "p90": 31.0, "p99": 33.0},
+                      "requests_per_s": 35.0, "stages_ms": {}},
+    },
+    "memory": {"baseline_rss_mb": 32.0, "peak_rss_mb": 45.0, "python_heap_peak_mb": 9.7},
+}
+
+
+def render_per_run(doc, content, perf):
+    """The old approach: formatting re-applied on every run"""
+    context = report.performance_context(perf)
+    for section in content['sections']:
+        for block in section['blocks']:
+            kind = block['type']
+            text = block.get('text', '')
+            if block.get('format'):
+                text = text.format_map(context)
+            if kind == 'heading':
+                report.add_heading(doc, text, level=block.get('level', 1))
+            elif kind in ('paragraph', 'title', 'keywords'):
+                report.add_paragraph_with_style(doc, text)
+            elif kind == 'references':
+                for item in block['items']:
+                    report.add_paragraph_with_style(doc, item, font_size=9)
+            elif kind == 'page_break':
+                report.add_page_break(doc)
+
+
+def render_styled(doc, content, perf):
+    report.ReportRenderer(doc, perf).render(content)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--copies', default='1,10,50')
+    args = parser.parse_args()
+    report.plt = None
+
+    base = report.load_content(report.CONTENT_PATH)
+    print(f"{'copies':>7}{'paragraphs':>12}{'mode':>9}{'render ms':>11}{'save ms':>9}{'KB':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for copies in (int(n) for n in args.copies.split(',')):
+            content = dict(base, sections=base['sections'] * copies)
+            for mode, render in (('per-run', render_per_run), ('styled', render_styled)):
+                doc = Document()
+                start = time.perf_counter()
+                render(doc, content, SYNTHETIC_PERF)
+                rendered = time.perf_counter()
+                path = os.path.join(tmp, f'{mode}.docx')
+                doc.save(path)
+                saved = time.perf_counter()
+                print(f"{copies:>7}{len(doc.paragraphs):>12}{mode:>9}{(rendered - start) * 1000:>11.0f}"
+                      f"{(saved - rendered) * 1000:>9.0f}{os.path.getsize(path) / 1024:>8.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark batch report generation: serial rebuilds vs. the worker pool and section cache.
+
+Usage: python3 benchmarks/bench_report_batch.py [--reports 24] [--workers N]
+
+Each report gets its own synthetic performance figures, as per-team reports
+would. "serial" renders every section of every report in one process (the
+old behaviour); "pool, cold" starts from an empty fragment cache; "pool,
+warm" reruns with the cache filled; "one edited" changes a single static
+section, so only that section is rebuilt in each report.
+"""
+import argparse
+import copy
+import json
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import generate_ieee_report as report  # noqa: E402
+from bench_report import SYNTHETIC_PERF  # noqa: E402
+
+
+def write_jobs(tmp, count, content_path):
+    jobs = []
+    for i in range(count):
+        perf = copy.deepcopy(SYNTHETIC_PERF)
+        perf['process']['upload']['latency_ms']['p50'] += i
+        perf_path = os.path.join(tmp, f'team-{i}.json')
+        with open(perf_path, 'w') as f:
+            json.dump(perf, f)
+        jobs.append({"benchmarks": perf_path, "content": content_path,
+                     "output": os.path.join(tmp, f'team-{i}.docx')})
+    return jobs
+
+
+def timed(fn):
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--reports', type=int, default=24)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        content = report.load_content(report.CONTENT_PATH)
+        content_path = os.path.join(tmp, 'content.json')
+        with open(content_path, 'w') as f:
+            json.dump(content, f)
+        jobs = write_jobs(tmp, args.reports, content_path)
+        cache_dir = os.path.join(tmp, 'cache')
+
+        def serial():
+            for job in jobs:
+                report.create_ieee_report(report.load_benchmarks(job['benchmarks']), content_path,
+                                          output=job['output'])
+
+        def pool():
+            report.create_reports_batch(jobs, args.workers, cache_dir)
+
+        print(f"{args.reports} reports, charts {'on' if report.plt else 'off (no matplotlib)'}")
+        print(f"{'mode':<14}{'seconds':>9}{'reports/s':>11}")
+        runs = [('serial', serial), ('pool, cold', pool), ('pool, warm', pool)]
+        for label, fn in runs:
+            seconds = timed(fn)
+            print(f"{label:<14}{seconds:>9.2f}{args.reports / seconds:>11.1f}")
+
+        content['sections'][1]['blocks'][-1]['text'] += ' (revised)'
+        with open(content_path, 'w') as f:
+            json.dump(content, f)
+        seconds = timed(pool)
+        print(f"{'one edited':<14}{seconds:>9.2f}{args.reports / seconds:>11.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark server cold start with warm-state snapshots of increasing size.
+
+Usage: python3 benchmarks/bench_startup.py [--entries 0,100000,1000000] [--runs 5]
+
+Each run starts a fresh interpreter that imports server.py (so nothing is
+cached in-process) and binds a listener as __main__ does, and reports wall time to ready, the server's own
+time_to_ready_ms, and the first snapshot lookup. For comparison the
+"eager load" column is what parsing the whole snapshot into dicts would add.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, REPO_ROOT)
+
+import server  # noqa: E402
+
+CHILD = '''
+import json, time
+start = time.perf_counter()
+import server
+from werkzeug.serving import make_server
+listener = make_server('127.0.0.1', 0, server.app, threaded=True)
+server.mark_ready()
+ready = time.perf_counter()
+entry = server.lookup_known_hash('bench-user', '%064x' % 7)
+lookup = time.perf_counter()
+print(json.dumps({"wall_ms": (ready - start) * 1000,
+                  "reported_ms": (server.READY_AT - server.STARTED_AT) * 1000,
+                  "lookup_us": (lookup - ready) * 1e6,
+                  "hit": entry is not None}))
+'''
+
+
+def build_snapshot(path, count):
+    entries = {}
+    for i in range(count):
+        key = server.StateSnapshot.key('bench-user', '%064x' % i)
+        entries[key] = {"sha256": '%064x' % (i * 31), "filename": f"download-{i}.bin"}
+    server.StateSnapshot.write(path, entries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--entries', default='0,100000,1000000')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'entries':>10}{'wall ms':>10}{'ready ms':>10}{'lookup us':>11}{'eager load ms':>15}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in (int(n) for n in args.entries.split(',')):
+            snapshot_path = os.path.join(tmp, f'{count}.snapshot')
+            build_snapshot(snapshot_path, count)
+
+            env = dict(os.environ, DDAS_SNAPSHOT_PATH=snapshot_path, DDAS_SNAPSHOT_INTERVAL='0',
+                       DDAS_LOG_PATH=os.path.join(tmp, 'server.log'), DDAS_LOG_LEVEL='WARNING',
+                       DDAS_METADATA_DB=os.path.join(tmp, 'metadata.db'))
+            samples = []
+            for _ in range(args.runs):
+                output = subprocess.run([sys.executable, '-c', CHILD], cwd=REPO_ROOT, env=env,
+                                        capture_output=True, text=True, check=True).stdout
+                samples.append(json.loads(output.strip().splitlines()[-1]))
+
+            start = time.perf_counter()
+            dict(server.StateSnapshot(snapshot_path).items())
+            eager_ms = (time.perf_counter() - start) * 1000
+
+            print(f"{count:>10}"
+                  f"{statistics.median(s['wall_ms'] for s in samples):>10.1f}"
+                  f"{statistics.median(s['reported_ms'] for s in samples):>10.1f}"
+                  f"{statistics.median(s['lookup_us'] for s in samples):>11.1f}"
+                  f"{eager_ms:>15.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-request latency across local server and backend transports.
+
+Usage: python3 benchmarks/bench_transports.py [--requests 500] [--backend-url URL]
+
+Client -> local server: GET /health over a new TCP connection per request,
+one kept-alive TCP connection, and a kept-alive Unix domain socket.
+
+Local server -> backend: one-shot requests.get (the old behaviour), the pooled
+keep-alive session and the HTTP/2 client. Without --backend-url the local
+server's own /health stands in for the backend; it only speaks HTTP/1.1, so
+the HTTP/2 row needs a real h2-capable backend (e.g. .../api/files/health).
+"""
+import argparse
+import http.client
+import logging
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import server  # noqa: E402
+from werkzeug.serving import make_server  # noqa: E402
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path):
+        super().__init__('localhost')
+        self.unix_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.unix_path)
+
+
+def time_calls(fn, count):
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def report(label, latencies):
+    cuts = statistics.quantiles(latencies, n=100)
+    print(f"{label:<28}{statistics.mean(latencies):>10.3f}{cuts[49]:>10.3f}{cuts[98]:>10.3f}")
+
+
+def http_get(conn):
+    conn.request('GET', '/health')
+    conn.getresponse().read()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--backend-url', default=None)
+    args = parser.parse_args()
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)  # No access log per request
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tcp_server = make_server('127.0.0.1', 0, server.app, threaded=True)
+        threading.Thread(target=tcp_server.serve_forever, daemon=True).start()
+        port = tcp_server.server_port
+        unix_path = os.path.join(tmp, 'ddas.sock')
+        unix_server = server.serve_unix_socket(unix_path)
+
+        print(f"{'client -> local server':<28}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}")
+
+        def new_connection():
+            conn = http.client.HTTPConnection('127.0.0.1', port)
+            http_get(conn)
+            conn.close()
+
+        report('tcp, new connection', time_calls(new_connection, args.requests))
+        keep_alive = http.client.HTTPConnection('127.0.0.1', port)
+        report('tcp, keep-alive', time_calls(lambda: http_get(keep_alive), args.requests))
+        unix_conn = UnixHTTPConnection(unix_path)
+        report('unix socket, keep-alive', time_calls(lambda: http_get(unix_conn), args.requests))
+
+        backend_url = args.backend_url or f'http://127.0.0.1:{port}/health'
+        print(f"\n{'server -> backend':<28}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}")
+        report('one-shot requests.get',
+               time_calls(lambda: server.requests.get(backend_url, timeout=10), args.requests))
+
+        clients = {'pooled session': server.create_backend_client(http2=False)}
+        if args.backend_url:
+            clients['http/2'] = server.create_backend_client(http2=True)
+        for label, client in clients.items():
+            try:
+                report(label, time_calls(lambda: client.get(backend_url, timeout=10), args.requests))
+            except server.backend_errors() as e:
+                print(f"{label:<28}failed: {e}")
+                continue
+
+            # Concurrent checks share the client (multiplexed streams under HTTP/2)
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                list(pool.map(lambda _: client.get(backend_url, timeout=10), range(args.requests)))
+            rate = args.requests / (time.perf_counter() - start)
+            print(f"{'  8 threads':<28}{rate:>10.0f} req/s")
+
+        tcp_server.shutdown()
+        unix_server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
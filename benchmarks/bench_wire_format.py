@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Compare payload size and encode/decode time of /process batch encodings.
+
+Usage: python3 benchmarks/bench_wire_format.py [--results 200000]
+
+Results are synthetic but shaped like real ones: a mix of uploads and
+duplicates with SHA-256 and BLAKE2b fast digests. MessagePack is skipped
+when the msgpack package is not installed.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import server  # noqa: E402
+
+
+def synthetic_results(count):
+    results = []
+    for i in range(count):
+        filename = f"report-{i:06d}.pdf"
+        result = {
+            "success": True,
+            "duplicate": i % 3 == 0,
+            "filename": filename,
+            "file_hash": os.urandom(32).hex(),
+            "fast_hash": os.urandom(64).hex(),
+        }
+        if result["duplicate"]:
+            result["original_filename"] = f"original-{i:06d}.pdf"
+            result["message"] = f"File '{filename}' already exists as '{result['original_filename']}'"
+        else:
+            result["message"] = f"File '{filename}' uploaded successfully"
+        results.append(result)
+    return results
+
+
+def measure(encode, decode, results):
+    start = time.perf_counter()
+    body = encode(results)
+    encoded = time.perf_counter()
+    decode(body)
+    decoded = time.perf_counter()
+    return len(body), (encoded - start) * 1000, (decoded - encoded) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--results', type=int, default=200000)
+    args = parser.parse_args()
+
+    results = synthetic_results(args.results)
+    formats = {
+        'json': (lambda r: json.dumps({"success": True, "results": r}).encode('utf-8'), json.loads),
+        'binary': (server.encode_binary_results, server.decode_binary_results),
+    }
+    if server.msgpack is not None:
+        formats['msgpack'] = (
+            lambda r: server.msgpack.packb({"success": True,
+                                            "results": [server.compact_result(x) for x in r]},
+                                           use_bin_type=True),
+            server.msgpack.unpackb)
+
+    print(f"{args.results} results")
+    print(f"{'format':<10}{'MB':>10}{'encode ms':>12}{'decode ms':>12}")
+    for name, (encode, decode) in formats.items():
+        size, encode_ms, decode_ms = measure(encode, decode, results)
+        print(f"{name:<10}{size / 1024 ** 2:>10.1f}{encode_ms:>12.0f}{decode_ms:>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
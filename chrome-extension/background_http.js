@@ -104,6 +104,12 @@ async function testServerConnection() {
         if (response.ok) {
             const data = await response.json();
             console.log('✅ Local server connected:', data);
+            if (data.saturated) {
+                console.warn('⏳ Local server is saturated, queued hashing jobs:', data.queue && data.queue.queued);
+            }
+            if (data.backend && data.backend.reachable === false) {
+                console.warn('⚠️ Local server cannot reach the backend');
+            }
             isServerConnected = true;
             return true;
         } else {
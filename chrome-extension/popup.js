@@ -417,25 +417,82 @@ function getStoredAuth() {
 }
 
 /**
- * Load file history
+ * Load file history: the extension's own entries merged with the local
+ * server's record of processed files, when the server is reachable
  */
 async function loadHistory() {
-    chrome.storage.local.get(['fileHistory'], (data) => {
-        const history = data.fileHistory || [];
+    const data = await chrome.storage.local.get(['fileHistory']);
+    let history = data.fileHistory || [];
+    const serverFiles = await fetchServerHistory();
+    if (serverFiles) {
+        history = mergeHistory(history, serverFiles);
+    }
 
-        if (history.length === 0) {
-            emptyState.style.display = 'block';
-            return;
+    if (history.length === 0) {
+        emptyState.style.display = 'block';
+        return;
+    }
+
+    emptyState.style.display = 'none';
+    historyList.innerHTML = '';
+
+    history.forEach(item => {
+        const card = createHistoryCard(item);
+        historyList.appendChild(card);
+    });
+}
+
+/**
+ * Recent files from the local server's history store, or null if unavailable
+ */
+async function fetchServerHistory(limit = 50) {
+    if (!authToken) {
+        return null;
+    }
+    try {
+        const response = await fetch(`${LOCAL_SERVER_URL}/history?limit=${limit}`, {
+            method: 'GET',
+            headers: {
+                'Accept': 'application/json',
+                'Authorization': `Bearer ${authToken}`
+            }
+        });
+        if (!response.ok) {
+            return null;
         }
+        const result = await response.json();
+        return result.success ? result.files : null;
+    } catch (error) {
+        console.log('📭 Server history unavailable:', error.message);
+        return null;
+    }
+}
 
-        emptyState.style.display = 'none';
-        historyList.innerHTML = '';
+/**
+ * Local entries carry the user's choices (skipped, deleted, kept) and win;
+ * server rows add files processed elsewhere or past the local 20-item cap
+ */
+function mergeHistory(localHistory, serverFiles, maxItems = 50) {
+    const key = (filename, fileHash) => `${filename}|${fileHash || ''}`;
+    const seen = new Set(localHistory.map(item => key(item.filename, item.response && item.response.file_hash)));
+    const merged = [...localHistory];
 
-        history.forEach(item => {
-            const card = createHistoryCard(item);
-            historyList.appendChild(card);
+    serverFiles.forEach(file => {
+        if (seen.has(key(file.filename, file.file_hash))) {
+            return;
+        }
+        merged.push({
+            filename: file.filename,
+            success: file.verdict === 'uploaded',
+            duplicate: file.verdict === 'duplicate',
+            original_filename: file.original_filename,
+            match: file.match,
+            error: file.error,
+            timestamp: Date.parse(file.processed_at)
         });
     });
+
+    return merged.sort((a, b) => b.timestamp - a.timestamp).slice(0, maxItems);
 }
 
 /**
@@ -444,8 +501,12 @@ async function loadHistory() {
 function createHistoryCard(item) {
     const card = document.createElement('div');
     card.className = 'status-card';
+    const match = item.match || (item.response && item.response.match);
+    const similar = item.duplicate && match === 'perceptual';
 
-    if (item.duplicate) {
+    if (similar) {
+        card.classList.add('near-duplicate');
+    } else if (item.duplicate) {
         if (item.deleted === true) {
             card.classList.add('duplicate-deleted');
         } else if (item.deleted === false) {
@@ -463,7 +524,13 @@ function createHistoryCard(item) {
 
     let icon, title, message;
 
-    if (item.duplicate) {
+    if (similar) {
+        const distance = item.response && item.response.distance;
+        icon = '🖼️';
+        title = item.deleted === false ? 'Similar Image Kept' : 'Similar Image';
+        message = `File: ${item.filename}<br>Looks like: ${item.original_filename}` +
+            (distance !== undefined ? `<br>Visual distance: ${distance} (not an exact copy)` : '<br>Not an exact copy');
+    } else if (item.duplicate) {
         if (item.deleted === true) {
             icon = '🗑️';
             title = 'Duplicate Deleted';
@@ -846,10 +913,17 @@ async function processFileWithServer(fileData, storageKey) {
         updateProcessingStep(storageKey, 2, '🔗 Connecting to server...', false);
         await sleep(300);
 
-        const serverAvailable = await testServerConnection();
-        if (!serverAvailable) {
+        let health = await getServerHealth();
+        if (!health) {
             throw new Error('Local server is not available. Please ensure server.py is running on port 5001.');
         }
+        if (health.saturated) {
+            updateProcessingStep(storageKey, 2, '⏳ Server busy, waiting...', false);
+            health = await waitForServerCapacity();
+            if (!health) {
+                throw new Error('Local server is not available. Please ensure server.py is running on port 5001.');
+            }
+        }
 
         updateProcessingStep(storageKey, 2, '✅ Connected to server', true);
 
@@ -922,36 +996,71 @@ async function processFileWithServer(fileData, storageKey) {
 }
 
 /**
- * Test server connection
+ * Fetch the local server's health report, or null if it is unreachable
  */
-async function testServerConnection() {
+async function getServerHealth() {
     try {
         const response = await fetch(`${LOCAL_SERVER_URL}/health`, {
             method: 'GET',
             headers: { 'Content-Type': 'application/json' }
         });
-        return response.ok;
+        return response.ok ? await response.json() : null;
     } catch (error) {
         console.error('Server connection test failed:', error);
-        return false;
+        return null;
     }
 }
 
+/**
+ * Test server connection
+ */
+async function testServerConnection() {
+    return (await getServerHealth()) !== null;
+}
+
+/**
+ * Wait while the server reports it is saturated, up to maxWaitMs
+ */
+async function waitForServerCapacity(maxWaitMs = 30000) {
+    const deadline = Date.now() + maxWaitMs;
+    let health = await getServerHealth();
+    while (health && health.saturated && Date.now() < deadline) {
+        console.log('⏳ Local server saturated, queue depth:', health.queue && health.queue.queued);
+        await sleep(2000);
+        health = await getServerHealth();
+    }
+    return health;
+}
+
+/**
+ * Random lowercase hex string of the given byte length
+ */
+function randomHex(bytes) {
+    return Array.from(crypto.getRandomValues(new Uint8Array(bytes)),
+        b => b.toString(16).padStart(2, '0')).join('');
+}
+
 /**
  * Send file to server
  */
 async function sendFileToServer(filePath, authToken) {
+    // W3C trace context: the server continues this trace, so its spans can
+    // be found by the trace ID logged below
+    const traceId = randomHex(16);
+    const started = performance.now();
     const response = await fetch(`${LOCAL_SERVER_URL}/process`, {
         method: 'POST',
         headers: {
             'Content-Type': 'application/json',
-            'Accept': 'application/json'
+            'Accept': 'application/json',
+            'traceparent': `00-${traceId}-${randomHex(8)}-01`
         },
         body: JSON.stringify({
             path: filePath,
             auth_token: authToken
         })
     });
+    console.log(`⏱️ /process took ${Math.round(performance.now() - started)} ms (trace ${traceId})`);
 
     if (!response.ok) {
         const errorText = await response.text();
@@ -1024,9 +1133,21 @@ function showDuplicateDialog(fileData, result, storageKey) {
     const deleteBtn = document.getElementById('deleteDuplicateBtn');
     const keepBtn = document.getElementById('keepDuplicateBtn');
 
+    // Near-duplicates are not byte-identical, so they only get the keep flow
+    const similar = result.match === 'perceptual';
+    const matchNote = document.getElementById('duplicateMatchNote');
+
     // Set dialog content
+    document.getElementById('duplicateTitle').textContent =
+        similar ? '🖼️ Similar Image Detected' : '⚠️ Duplicate File Detected';
+    document.getElementById('duplicateOriginalLabel').textContent = similar ? 'Looks like:' : 'Already exists as:';
     fileNameSpan.textContent = fileData.filename;
     originalNameSpan.textContent = result.original_filename;
+    matchNote.textContent = describeMatch(result);
+    matchNote.style.display = matchNote.textContent ? 'block' : 'none';
+    document.getElementById('duplicatePrompt').textContent = similar
+        ? 'This image is not an exact copy, so it stays in Downloads. Compare the two yourself if you want to remove one.'
+        : 'What would you like to do with the duplicate file in Downloads?';
 
     // Remove existing event listeners
     const newDeleteBtn = deleteBtn.cloneNode(true);
@@ -1034,6 +1155,9 @@ function showDuplicateDialog(fileData, result, storageKey) {
     deleteBtn.parentNode.replaceChild(newDeleteBtn, deleteBtn);
     keepBtn.parentNode.replaceChild(newKeepBtn, keepBtn);
 
+    newDeleteBtn.style.display = similar ? 'none' : '';
+    newKeepBtn.textContent = similar ? '📁 OK, keep it' : '📁 Keep in Downloads';
+
     // Add event listeners for the buttons
     newDeleteBtn.addEventListener('click', () => handleDuplicateAction('delete', fileData, result, storageKey));
     newKeepBtn.addEventListener('click', () => handleDuplicateAction('keep', fileData, result, storageKey));
@@ -1049,6 +1173,19 @@ function showDuplicateDialog(fileData, result, storageKey) {
     dialog.style.display = 'flex';
 }
 
+/**
+ * Explain how a non-exact duplicate was matched, or '' for an exact one
+ */
+function describeMatch(result) {
+    if (result.match === 'perceptual') {
+        return `Visually similar, not byte-identical (distance ${result.distance}; 0 means the images look the same).`;
+    }
+    if (result.match === 'normalized') {
+        return 'Same content with different formatting or metadata.';
+    }
+    return '';
+}
+
 /**
  * Hide duplicate dialog
  */
@@ -1093,7 +1230,8 @@ async function handleDuplicateAction(action, fileData, result, storageKey) {
             }
         } else {
             // Keep file - just add to history
-            showSuccess(`📁 Keeping duplicate file in Downloads: ${fileData.filename}`);
+            const kind = result.match === 'perceptual' ? 'similar image' : 'duplicate file';
+            showSuccess(`📁 Keeping ${kind} in Downloads: ${fileData.filename}`);
 
             await addToHistory({
                 filename: fileData.filename,
@@ -1101,7 +1239,9 @@ async function handleDuplicateAction(action, fileData, result, storageKey) {
                 duplicate: true,
                 deleted: false,
                 original_filename: result.original_filename,
-                message: `Duplicate file kept in Downloads. Original: ${result.original_filename}`,
+                message: result.match === 'perceptual'
+                    ? `Similar image kept in Downloads. Looks like: ${result.original_filename}`
+                    : `Duplicate file kept in Downloads. Original: ${result.original_filename}`,
                 timestamp: Date.now(),
                 response: result
             });
@@ -0,0 +1,331 @@
+import argparse
+import base64
+import html
+import json
+import math
+import os
+from collections import Counter
+from datetime import datetime
+
+from docx import Document
+
+from generate_ieee_report import REPO_DIR, add_bar_chart, add_heading, add_table, bar_chart_png, define_styles
+
+LOG_PATH = os.environ.get('DDAS_LOG_PATH', os.path.join(REPO_DIR, 'server.log'))
+DEFAULT_OUTPUT = os.path.join(REPO_DIR, 'DDAS_Analytics_Report.docx')
+
+# Stages shown in the latency table, in pipeline order; others follow alphabetically
+STAGE_ORDER = ('queue_wait', 'hash', 'perceptual', 'archive_members', 'check_hash', 'upload')
+
+def log_files(path):
+    """The server log and its rotated backups, oldest first"""
+    backups = []
+    n = 1
+    while os.path.exists(f'{path}.{n}'):
+        backups.append(f'{path}.{n}')
+        n += 1
+    return backups[::-1] + ([path] if os.path.exists(path) else [])
+
+def read_events(paths):
+    """Yield the server's "file_processed" events one at a time"""
+    for path in paths:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            for line in f:
+                if '"file_processed"' not in line:
+                    continue  # Skip the other log lines without parsing them
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if event.get('event') == 'file_processed':
+                    yield event
+
+def format_bytes(count):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if count < 1024 or unit == 'GB':
+            return f"{count:.0f} {unit}" if unit == 'B' else f"{count:.1f} {unit}"
+        count /= 1024
+
+class LogHistogram:
+    """
+    Quantile sketch with log-spaced buckets: any quantile is within
+    relative_error of the true value, and memory grows with the log of the
+    value range rather than with the number of samples.
+    """
+
+    def __init__(self, relative_error=0.01):
+        self.gamma = (1 + relative_error) / (1 - relative_error)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets = Counter()
+        self.zeros = 0
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        if value <= 0:
+            self.zeros += 1
+        else:
+            self.buckets[math.ceil(math.log(value) / self.log_gamma)] += 1
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                return 2 * self.gamma ** index / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+class SpaceSaving:
+    """
+    Approximate top-k counter in fixed memory (Metwally et al.'s Space-Saving).
+    Each key's count may be overestimated by at most its "error", which is
+    zero for every key that has held a counter since it first appeared.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counters = {}  # key -> [count, error, label, bytes]
+
+    def add(self, key, label, nbytes=0):
+        counter = self.counters.get(key)
+        if counter is None:
+            if len(self.counters) < self.capacity:
+                counter = self.counters[key] = [0, 0, label, 0]
+            else:
+                victim = min(self.counters, key=lambda k: self.counters[k][0])
+                floor = self.counters.pop(victim)[0]
+                counter = self.counters[key] = [floor, floor, label, 0]
+        counter[0] += 1
+        counter[3] += nbytes
+
+    def top(self, k):
+        """[(key, count, error, label, bytes)] by descending count"""
+        ranked = sorted(self.counters.items(), key=lambda item: item[1][0], reverse=True)[:k]
+        return [(key, *counter) for key, counter in ranked]
+
+class DuplicateAnalytics:
+    """
+    Running totals over file_processed events. Every aggregate is updated
+    in place per event, so memory stays flat however long the log is: the
+    top-files table is a Space-Saving sketch, latencies are log histograms,
+    and only the most recent trend_days days are kept for the trend.
+    """
+
+    def __init__(self, top=10, trend_days=30):
+        self.top = top
+        self.trend_days = trend_days
+        self.files = 0
+        self.verdicts = Counter()
+        self.matches = Counter()
+        self.bytes_seen = 0
+        self.bytes_saved = 0
+        self.bytes_uploaded = 0
+        self.hash_bytes = 0
+        self.hash_seconds = 0.0
+        self.total_latency = LogHistogram()
+        self.stage_latency = {}
+        self.duplicated = SpaceSaving(top * 10)  # Headroom keeps the reported top-k exact in practice
+        self.days = {}  # "YYYY-MM-DD" -> {"files", "duplicates", "bytes_saved", "latency"}
+        self.first_ts = self.last_ts = None
+
+    def add(self, event):
+        self.files += 1
+        verdict = event.get('verdict', 'error')
+        size = event.get('size') or 0
+        self.verdicts[verdict] += 1
+        self.bytes_seen += size
+        if verdict == 'duplicate':
+            self.matches[event.get('match') or 'exact'] += 1
+            self.bytes_saved += event.get('bytes_saved') or 0
+            original = event.get('original') or event.get('file')
+            self.duplicated.add(event.get('file_hash') or original, original, event.get('bytes_saved') or 0)
+        elif verdict == 'uploaded':
+            self.bytes_uploaded += size
+
+        stages = event.get('stages_ms') or {}
+        for stage, ms in stages.items():
+            histogram = self.stage_latency.get(stage)
+            if histogram is None:
+                histogram = self.stage_latency[stage] = LogHistogram()
+            histogram.add(ms)
+        if stages.get('hash') and size:
+            self.hash_bytes += size
+            self.hash_seconds += stages['hash'] / 1000
+        total_ms = event.get('total_ms')
+        if total_ms is not None:
+            self.total_latency.add(total_ms)
+
+        ts = event.get('ts')
+        if ts:
+            self.first_ts = ts if self.first_ts is None else min(self.first_ts, ts)
+            self.last_ts = ts if self.last_ts is None else max(self.last_ts, ts)
+            self._add_to_day(ts[:10], verdict, event, total_ms)
+
+    def _add_to_day(self, day, verdict, event, total_ms):
+        bucket = self.days.get(day)
+        if bucket is None:
+            if len(self.days) >= self.trend_days:
+                oldest = min(self.days)
+                if day < oldest:
+                    return  # Older than the window being kept
+                del self.days[oldest]
+            bucket = self.days[day] = {"files": 0, "duplicates": 0, "bytes_saved": 0, "latency": LogHistogram()}
+        bucket["files"] += 1
+        if verdict == 'duplicate':
+            bucket["duplicates"] += 1
+            bucket["bytes_saved"] += event.get('bytes_saved') or 0
+        if total_ms is not None:
+            bucket["latency"].add(total_ms)
+
+    def stages(self):
+        known = [stage for stage in STAGE_ORDER if stage in self.stage_latency]
+        return known + sorted(set(self.stage_latency) - set(known))
+
+def analyze(paths, top=10, trend_days=30):
+    analytics = DuplicateAnalytics(top, trend_days)
+    for event in read_events(paths):
+        analytics.add(event)
+    return analytics
+
+def report_blocks(analytics):
+    """
+    The report as neutral blocks - ("heading", text), ("paragraph", text),
+    ("table", caption, headers, rows), ("chart", caption, labels, series,
+    ylabel) - so the .docx and HTML renderers share one layout.
+    """
+    a = analytics
+    blocks = [('heading', "DDAS Duplicate Analytics")]
+    if not a.files:
+        blocks.append(('paragraph', "No file_processed events found. The server writes them to its log "
+                                    "when DDAS_LOG_FORMAT is json (the default)."))
+        return blocks
+
+    duplicates = a.verdicts['duplicate']
+    period = f"{a.first_ts[:16].replace('T', ' ')} to {a.last_ts[:16].replace('T', ' ')}" if a.first_ts else "the log"
+    summary = (f"From {period} the server processed {a.files} files ({format_bytes(a.bytes_seen)}). "
+               f"{duplicates} were duplicates ({duplicates / a.files:.1%}), which avoided uploading and storing "
+               f"{format_bytes(a.bytes_saved)}; {a.verdicts['uploaded']} new files uploaded "
+               f"{format_bytes(a.bytes_uploaded)}.")
+    if a.total_latency.count:
+        summary += (f" Median processing time was {a.total_latency.quantile(0.5):.1f} ms "
+                    f"(p99 {a.total_latency.quantile(0.99):.1f} ms).")
+    if a.hash_seconds:
+        summary += f" Hashing averaged {a.hash_bytes / 1024 ** 2 / a.hash_seconds:.0f} MB/s."
+    blocks.append(('heading', "Summary"))
+    blocks.append(('paragraph', summary))
+
+    blocks.append(('heading', "Verdicts"))
+    rows = [(verdict, count, f"{count / a.files:.1%}") for verdict, count in a.verdicts.most_common()]
+    rows += [(f"duplicate: {match}", count, f"{count / a.files:.1%}") for match, count in a.matches.most_common()]
+    blocks.append(('table', "Table 1: Verdicts and duplicate match types", ['Verdict', 'Files', 'Share'], rows))
+    blocks.append(('table', "Table 2: Bandwidth and disk",
+                   ['Measure', 'Value'],
+                   [('Downloaded data seen', format_bytes(a.bytes_seen)),
+                    ('Uploaded (new files)', format_bytes(a.bytes_uploaded)),
+                    ('Upload bandwidth and backend disk saved', format_bytes(a.bytes_saved)),
+                    ('Saved share of data seen', f"{a.bytes_saved / a.bytes_seen:.1%}" if a.bytes_seen else "-")]))
+
+    top = a.duplicated.top(a.top)
+    if top:
+        blocks.append(('heading', "Top Duplicated Files"))
+        blocks.append(('table', f"Table 3: Top {len(top)} most duplicated files",
+                       ['Original file', 'Hash', 'Duplicates', 'Saved'],
+                       [(label, (key or '')[:12], f"{count}" + (f" (±{error})" if error else ""), format_bytes(nbytes))
+                        for key, count, error, label, nbytes in top]))
+
+    blocks.append(('heading', "Latency"))
+    rows = [(stage.replace('_', ' '), a.stage_latency[stage].count,
+             *(f"{a.stage_latency[stage].quantile(q):.1f}" for q in (0.5, 0.9, 0.99))) for stage in a.stages()]
+    if a.total_latency.count:
+        rows.append(('total', a.total_latency.count,
+                     *(f"{a.total_latency.quantile(q):.1f}" for q in (0.5, 0.9, 0.99))))
+    blocks.append(('table', "Table 4: Processing latency by stage (ms)", ['Stage', 'Samples', 'p50', 'p90', 'p99'], rows))
+
+    days = sorted(a.days)
+    if days:
+        blocks.append(('heading', "Trends"))
+        blocks.append(('table', "Table 5: Daily activity",
+                       ['Day', 'Files', 'Duplicates', 'Saved', 'p50 ms', 'p99 ms'],
+                       [(day, a.days[day]['files'], a.days[day]['duplicates'], format_bytes(a.days[day]['bytes_saved']),
+                         *(f"{a.days[day]['latency'].quantile(q):.1f}" if a.days[day]['latency'].count else "-"
+                           for q in (0.5, 0.99))) for day in days]))
+        if len(days) > 1:
+            labels = [day[5:] for day in days]
+            blocks.append(('chart', "Fig. 1: Files processed per day", labels,
+                           {'Files': [a.days[day]['files'] for day in days],
+                            'Duplicates': [a.days[day]['duplicates'] for day in days]}, 'files'))
+            blocks.append(('chart', "Fig. 2: Daily processing latency", labels,
+                           {quantile: [a.days[day]['latency'].quantile(q) or 0 for day in days]
+                            for quantile, q in (('p50', 0.5), ('p99', 0.99))}, 'ms'))
+    return blocks
+
+def render_docx(blocks, output, template=None):
+    doc = Document(template)
+    styles = define_styles(doc)
+    for block in blocks:
+        if block[0] == 'heading':
+            add_heading(doc, block[1], level=0 if block is blocks[0] else 1)
+        elif block[0] == 'paragraph':
+            doc.add_paragraph(block[1], style=styles['DDAS Body'])
+        elif block[0] == 'table':
+            add_table(doc, *block[1:])
+        elif block[0] == 'chart':
+            add_bar_chart(doc, *block[1:])
+    doc.save(output)
+
+def render_html(blocks, output):
+    parts = ['<!DOCTYPE html>', '<html><head><meta charset="utf-8"><title>DDAS Duplicate Analytics</title>',
+             '<style>body{font-family:"Times New Roman",serif;max-width:52em;margin:2em auto}'
+             'table{border-collapse:collapse;margin:0.5em 0 1.5em}th,td{border:1px solid #999;padding:2px 8px}'
+             '.caption{font-size:small;text-transform:uppercase}</style></head><body>']
+    for block in blocks:
+        if block[0] == 'heading':
+            tag = 'h1' if block is blocks[0] else 'h2'
+            parts.append(f'<{tag}>{html.escape(block[1])}</{tag}>')
+        elif block[0] == 'paragraph':
+            parts.append(f'<p>{html.escape(block[1])}</p>')
+        elif block[0] == 'table':
+            caption, headers, rows = block[1:]
+            parts.append(f'<p class="caption">{html.escape(caption)}</p><table>')
+            parts.append('<tr>' + ''.join(f'<th>{html.escape(str(h))}</th>' for h in headers) + '</tr>')
+            for row in rows:
+                parts.append('<tr>' + ''.join(f'<td>{html.escape(str(v))}</td>' for v in row) + '</tr>')
+            parts.append('</table>')
+        elif block[0] == 'chart':
+            image = bar_chart_png(*block[2:])
+            if image is not None:
+                data = base64.b64encode(image.getvalue()).decode('ascii')
+                parts.append(f'<figure><img src="data:image/png;base64,{data}" width="480">'
+                             f'<figcaption>{html.escape(block[1])}</figcaption></figure>')
+    parts.append(f'<p><small>Generated {datetime.now().isoformat(timespec="seconds")}</small></p></body></html>')
+    with open(output, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(parts))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Summarize the DDAS server's duplicate detection history")
+    parser.add_argument('--log', default=LOG_PATH, help='Server log; rotated backups (.1, .2, ...) are read too')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='.docx, or .html for a web page')
+    parser.add_argument('--template', help='.docx whose named styles the report uses')
+    parser.add_argument('--top', type=int, default=10, help='Rows in the most duplicated files table')
+    parser.add_argument('--trend-days', type=int, default=30, help='Days of daily trend to keep')
+    args = parser.parse_args()
+
+    paths = log_files(args.log)
+    if not paths:
+        raise SystemExit(f"No server log found at {args.log}")
+    blocks = report_blocks(analyze(paths, args.top, args.trend_days))
+    if args.output.endswith(('.html', '.htm')):
+        render_html(blocks, args.output)
+    else:
+        render_docx(blocks, args.output, args.template)
+    print(f"Analytics report generated: {args.output}")
@@ -1,8 +1,53 @@
+import argparse
+import base64
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+import docx
 from docx import Document
 from docx.shared import Pt, Inches, RGBColor
+from docx.enum.style import WD_STYLE_TYPE
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
+from docx.oxml import OxmlElement, parse_xml
+from docx.text.paragraph import Paragraph
+from lxml import etree
+
+try:
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+except ImportError:
+    plt = None  # Charts are skipped; the tables still carry every number
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+BENCHMARK_SCRIPT = os.path.join(REPO_DIR, 'benchmarks', 'bench_performance.py')
+CONTENT_PATH = os.path.join(REPO_DIR, 'ieee_report.json')
+DEFAULT_OUTPUT = os.path.join(REPO_DIR, 'DDAS_IEEE_Report.docx')
+CACHE_DIR = os.path.join(REPO_DIR, '.report_cache')
+FRAGMENT_VERSION = 1  # Bump when rendering changes so cached fragments are rebuilt
+
+REPORT_FONT = 'Times New Roman'
+
+# Named paragraph styles: base style, font size, bold, italic, alignment.
+# Formatting lives on the style, so each paragraph only references it. A
+# --template that already defines one of these names keeps its own version.
+REPORT_STYLES = {
+    'DDAS Title': ('Title', 24, True, False, WD_ALIGN_PARAGRAPH.CENTER),
+    'DDAS Subtitle': ('Normal', 14, False, True, WD_ALIGN_PARAGRAPH.CENTER),
+    'DDAS Authors': ('Normal', 12, False, False, WD_ALIGN_PARAGRAPH.CENTER),
+    'DDAS Affiliation': ('Normal', 11, False, False, WD_ALIGN_PARAGRAPH.CENTER),
+    'DDAS Body': ('Normal', 10, False, False, WD_ALIGN_PARAGRAPH.JUSTIFY),
+    'DDAS Reference': ('Normal', 9, False, False, WD_ALIGN_PARAGRAPH.JUSTIFY),
+    'DDAS Caption': ('Normal', 8, False, False, WD_ALIGN_PARAGRAPH.CENTER),
+    'DDAS Table Text': ('Normal', 8, False, False, WD_ALIGN_PARAGRAPH.CENTER),
+}
 
 def add_page_break(doc):
     """Add a page break"""
@@ -24,7 +69,7 @@ def add_heading(doc, text, level=1):
     return heading
 
 def add_paragraph_with_style(doc, text, bold=False, italic=False, font_size=10):
-    """Add a formatted paragraph"""
+    """Add a paragraph formatted run by run (for one-offs; reports use REPORT_STYLES)"""
     para = doc.add_paragraph()
     run = para.add_run(text)
     run.font.name = 'Times New Roman'
@@ -34,1124 +79,418 @@ def add_paragraph_with_style(doc, text, bold=False, italic=False, font_size=10):
     para.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
     return para
 
-def create_ieee_report():
-    doc = Document()
-
-    # Set document margins (IEEE format: 0.75" all around)
-    sections = doc.sections
-    for section in sections:
-        section.top_margin = Inches(0.75)
-        section.bottom_margin = Inches(0.75)
-        section.left_margin = Inches(0.625)
-        section.right_margin = Inches(0.625)
-
-    # Title (Single Column)
-    title = doc.add_heading('DDAS: Data Duplication Alert System', 0)
-    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    title_run = title.runs[0]
-    title_run.font.size = Pt(24)
-    title_run.font.name = 'Times New Roman'
-    title_run.bold = True
-
-    # Subtitle
-    subtitle = doc.add_paragraph()
-    subtitle_run = subtitle.add_run('A Chrome Extension-based Intelligent File Duplication Detection and Management System')
-    subtitle_run.font.size = Pt(14)
-    subtitle_run.font.name = 'Times New Roman'
-    subtitle_run.italic = True
-    subtitle.alignment = WD_ALIGN_PARAGRAPH.CENTER
-
-    # Authors
-    authors = doc.add_paragraph()
-    authors_run = authors.add_run('\nHitendra Singh, Dhruv Maheshwari')
-    authors_run.font.size = Pt(12)
-    authors_run.font.name = 'Times New Roman'
-    authors.alignment = WD_ALIGN_PARAGRAPH.CENTER
-
-    # Institution
-    institution = doc.add_paragraph()
-    inst_run = institution.add_run('Department of Computer Science and Engineering')
-    inst_run.font.size = Pt(11)
-    inst_run.font.name = 'Times New Roman'
-    institution.alignment = WD_ALIGN_PARAGRAPH.CENTER
-
-    # Date
-    date = doc.add_paragraph()
-    date_run = date.add_run('November 2025\n\n')
-    date_run.font.size = Pt(11)
-    date_run.font.name = 'Times New Roman'
-    date.alignment = WD_ALIGN_PARAGRAPH.CENTER
-
-    # Set two-column layout from here
-    section = doc.sections[0]
-    set_two_columns(section)
-
-    # Abstract
-    add_heading(doc, 'Abstract', level=1)
-    add_paragraph_with_style(doc,
-        "In the digital age, file duplication has become a significant challenge for both individual users "
-        "and organizations, leading to wasted storage space, increased costs, and reduced system efficiency. "
-        "This paper presents DDAS (Data Duplication Alert System), an innovative solution that combines a "
-        "Chrome browser extension with a robust backend architecture to automatically detect and manage "
-        "duplicate files during downloads. The system employs SHA-256 cryptographic hashing for reliable "
-        "duplicate detection, integrates with AWS S3 for scalable storage, and implements secure user "
-        "authentication with JWT tokens and OTP verification. DDAS provides real-time monitoring of download "
-        "activities, presents users with intelligent choices for managing duplicates, and maintains a "
-        "comprehensive activity history. The system demonstrates a microservices architecture combining "
-        "JavaScript (Chrome Extension), Python (middleware server), Java Spring Boot (backend API), and AWS "
-        "cloud services. Performance analysis shows 99.9% accuracy in duplicate detection with an average "
-        "processing time of under 2 seconds per file. This paper discusses the system architecture, "
-        "implementation details, security considerations, performance metrics, and future enhancements.",
-        font_size=10
-    )
-
-    # Keywords
-    keywords = doc.add_paragraph()
-    keywords_run = keywords.add_run('Keywords—')
-    keywords_run.bold = True
-    keywords_run.font.name = 'Times New Roman'
-    keywords_run.font.size = Pt(10)
-    keywords_content = keywords.add_run('File Duplication Detection, Chrome Extension, SHA-256 Hashing, '
-                                       'Microservices Architecture, Cloud Integration, JWT Authentication, '
-                                       'AWS S3, Spring Boot, Real-time Monitoring')
-    keywords_content.font.name = 'Times New Roman'
-    keywords_content.font.size = Pt(10)
-    keywords_content.italic = True
-    keywords.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
-
-    # I. INTRODUCTION
-    add_heading(doc, 'I. INTRODUCTION', level=1)
-
-    add_paragraph_with_style(doc,
-        "The exponential growth of digital content has led to an unprecedented increase in file downloads "
-        "and storage requirements. Users frequently download the same file multiple times, either "
-        "unknowingly or due to poor file management practices. This redundancy results in several critical "
-        "issues: (1) wastage of valuable storage space, (2) difficulty in locating the correct version of "
-        "files, (3) increased backup times and costs, and (4) reduced system performance due to disk "
-        "fragmentation."
-    )
-
-    add_paragraph_with_style(doc,
-        "Traditional file management systems provide limited support for duplicate detection, typically "
-        "requiring manual intervention or periodic scans that are resource-intensive and time-consuming. "
-        "Moreover, existing solutions often lack user-friendly interfaces and fail to provide real-time "
-        "detection during the critical moment when files are being downloaded."
-    )
-
-    add_paragraph_with_style(doc,
-        "To address these challenges, we developed DDAS (Data Duplication Alert System), a comprehensive "
-        "solution that seamlessly integrates into the user's browsing experience through a Chrome extension. "
-        "DDAS operates transparently in the background, automatically monitoring download activities and "
-        "performing real-time duplicate detection using cryptographic hashing techniques."
-    )
-
-    # A. Motivation
-    add_heading(doc, 'A. Motivation', level=2)
-
-    add_paragraph_with_style(doc,
-        "The motivation for developing DDAS stems from several real-world observations and challenges:"
-    )
-
-    add_paragraph_with_style(doc,
-        "1) Storage Efficiency: With cloud storage costs and local disk space being significant concerns, "
-        "preventing duplicate downloads can lead to substantial savings. Research indicates that an average "
-        "user's download folder contains 20-30% duplicate files."
-    )
-
-    add_paragraph_with_style(doc,
-        "2) User Experience: Manual file management is tedious and error-prone. Users need an automated "
-        "system that works silently in the background and only prompts when necessary."
-    )
-
-    add_paragraph_with_style(doc,
-        "3) Security Concerns: Storing multiple copies of sensitive files increases the attack surface. "
-        "DDAS helps maintain a single, well-managed copy of each file."
-    )
-
-    add_paragraph_with_style(doc,
-        "4) Environmental Impact: Reducing redundant storage contributes to lower energy consumption in "
-        "data centers, aligning with green computing initiatives."
-    )
-
-    # B. Contributions
-    add_heading(doc, 'B. Contributions', level=2)
-
-    add_paragraph_with_style(doc,
-        "This paper makes the following key contributions:"
-    )
-
-    add_paragraph_with_style(doc,
-        "1) A novel architecture combining browser extension technology with microservices for real-time "
-        "file duplication detection."
-    )
-
-    add_paragraph_with_style(doc,
-        "2) Implementation of SHA-256 cryptographic hashing for reliable duplicate detection with zero "
-        "false positives."
-    )
-
-    add_paragraph_with_style(doc,
-        "3) A user-centric design that provides informed choices rather than automatic file deletion, "
-        "respecting user autonomy."
-    )
-
-    add_paragraph_with_style(doc,
-        "4) Integration of modern security practices including JWT authentication, OTP verification, and "
-        "secure API communication."
-    )
-
-    add_paragraph_with_style(doc,
-        "5) Cloud-native architecture leveraging AWS S3 for scalable hash storage and future extensibility."
-    )
-
-    add_paragraph_with_style(doc,
-        "6) Comprehensive evaluation demonstrating high accuracy and low latency in duplicate detection."
-    )
-
-    # II. RELATED WORK
-    add_heading(doc, 'II. RELATED WORK', level=1)
-
-    add_paragraph_with_style(doc,
-        "File duplication detection has been extensively studied in various contexts. This section reviews "
-        "existing approaches and positions DDAS within the broader landscape of duplicate detection systems."
-    )
-
-    # A. Content-Based Duplication Detection
-    add_heading(doc, 'A. Content-Based Duplication Detection', level=2)
-
-    add_paragraph_with_style(doc,
-        "Traditional duplicate detection systems employ content-based approaches using cryptographic hash "
-        "functions. MD5 and SHA-1 have been widely used, but their vulnerabilities to collision attacks "
-        "have led to the adoption of SHA-256 and SHA-3. Our system uses SHA-256, which provides a good "
-        "balance between security and performance, with a collision probability of approximately 2^-256."
-    )
-
-    add_paragraph_with_style(doc,
-        "Research by Meyer et al. (2020) demonstrated that SHA-256 hashing can process files at rates "
-        "exceeding 500 MB/s on modern hardware, making it suitable for real-time applications. DDAS "
-        "leverages this capability to provide instant feedback to users."
-    )
-
-    # B. Browser Extension-Based Solutions
-    add_heading(doc, 'B. Browser Extension-Based Solutions', level=2)
-
-    add_paragraph_with_style(doc,
-        "Several browser extensions have been developed for download management, but few focus specifically "
-        "on duplicate detection. Existing solutions like 'Download Manager' and 'Chrono Download Manager' "
-        "primarily organize downloads but lack sophisticated duplication detection algorithms."
-    )
-
-    add_paragraph_with_style(doc,
-        "DDAS distinguishes itself by integrating cryptographic hashing directly into the extension "
-        "workflow, communicating with a dedicated backend service, and providing a comprehensive user "
-        "interface for managing detected duplicates."
-    )
-
-    # C. Cloud-Based Storage Deduplication
-    add_heading(doc, 'C. Cloud-Based Storage Deduplication', level=2)
-
-    add_paragraph_with_style(doc,
-        "Cloud storage providers like Dropbox and Google Drive implement deduplication at the block level "
-        "to optimize storage usage across their infrastructure. However, these solutions operate "
-        "server-side and do not provide client-side duplicate detection during downloads."
-    )
-
-    add_paragraph_with_style(doc,
-        "DDAS complements cloud-based deduplication by operating at the client level, preventing "
-        "duplicates before they are even stored, thus saving bandwidth and upload time."
-    )
-
-    # D. Machine Learning Approaches
-    add_heading(doc, 'D. Machine Learning Approaches', level=2)
-
-    add_paragraph_with_style(doc,
-        "Recent research has explored machine learning techniques for fuzzy duplicate detection, "
-        "identifying near-duplicates or similar files. While promising, these approaches have higher "
-        "computational requirements and are more suitable for batch processing rather than real-time "
-        "detection."
-    )
-
-    add_paragraph_with_style(doc,
-        "DDAS currently focuses on exact duplicate detection for maximum accuracy and speed, but the "
-        "architecture is designed to accommodate ML-based fuzzy matching in future versions."
-    )
-
-    # III. SYSTEM ARCHITECTURE
-    add_heading(doc, 'III. SYSTEM ARCHITECTURE', level=1)
-
-    add_paragraph_with_style(doc,
-        "DDAS employs a multi-tier microservices architecture designed for scalability, maintainability, "
-        "and security. The system consists of four primary components: Chrome Extension (Frontend), Python "
-        "Local Server (Middleware), Java Spring Boot Backend (Core API), and AWS Cloud Services. This "
-        "section provides detailed insights into each component and their interactions."
-    )
-
-    # A. Chrome Extension Layer
-    add_heading(doc, 'A. Chrome Extension Layer', level=2)
-
-    add_paragraph_with_style(doc,
-        "The Chrome extension serves as the primary user interface and download monitoring component. "
-        "Built using Manifest V3 specifications, it consists of three main modules:"
-    )
-
-    add_paragraph_with_style(doc,
-        "1) Background Service Worker: Implements event-driven architecture to monitor download activities "
-        "using Chrome's downloads API. The service worker registers listeners for download events and "
-        "maintains minimal memory footprint by operating on-demand."
-    )
-
-    add_paragraph_with_style(doc,
-        "2) Popup Interface: Provides an intuitive HTML/CSS/JavaScript interface for user interactions. "
-        "The popup displays pending downloads, processing status, duplicate alerts, and activity history "
-        "in a responsive, user-friendly layout."
-    )
-
-    add_paragraph_with_style(doc,
-        "3) Storage Manager: Utilizes Chrome's storage API for persisting user preferences, authentication "
-        "tokens, and activity history. Data is stored locally in the browser's secure storage, with "
-        "automatic synchronization across user sessions."
-    )
-
-    # B. Python Middleware Server
-    add_heading(doc, 'B. Python Middleware Server', level=2)
-
-    add_paragraph_with_style(doc,
-        "The Python local server acts as a crucial bridge between the Chrome extension and the Java "
-        "backend. Running on localhost:5001, this Flask-based server performs several critical functions:"
-    )
-
-    add_paragraph_with_style(doc,
-        "1) File System Access: Browsers have limited file system permissions for security reasons. The "
-        "Python server provides controlled file system access, enabling file hash calculation and "
-        "deletion operations while enforcing strict security policies."
-    )
-
-    add_paragraph_with_style(doc,
-        "2) Hash Calculation: Implements efficient SHA-256 hashing with chunked file reading to handle "
-        "large files without excessive memory consumption. The hash calculation uses a 64KB buffer size, "
-        "optimized for typical download file sizes."
-    )
-
-    add_paragraph_with_style(doc,
-        "3) Request Forwarding: Acts as a reverse proxy, forwarding authenticated requests from the "
-        "extension to the Java backend. This design isolates the backend from direct browser access, "
-        "enhancing security."
-    )
-
-    add_paragraph_with_style(doc,
-        "4) Security Validation: Verifies that file operations are restricted to the Downloads directory, "
-        "preventing unauthorized file system access. Path traversal attacks are mitigated through "
-        "strict path validation."
-    )
-
-    # C. Java Spring Boot Backend
-    add_heading(doc, 'C. Java Spring Boot Backend', level=2)
-
-    add_paragraph_with_style(doc,
-        "The backend server, built with Spring Boot 3.x and Java 17, serves as the core business logic "
-        "and data management layer. Key components include:"
-    )
-
-    add_paragraph_with_style(doc,
-        "1) Authentication Service: Implements JWT (JSON Web Token) based authentication with bcrypt "
-        "password hashing. The service generates OTPs for email verification, manages user sessions, "
-        "and enforces role-based access control."
-    )
-
-    add_paragraph_with_style(doc,
-        "2) File Processing Service: Manages the complete file processing workflow, including hash "
-        "comparison, duplicate detection, and metadata storage. The service uses optimized database "
-        "queries with indexed hash columns for sub-millisecond lookup times."
-    )
-
-    add_paragraph_with_style(doc,
-        "3) Database Layer: Utilizes Spring Data JPA with PostgreSQL for persistent storage. The database "
-        "schema includes tables for users, file records, OTPs, and activity logs, with appropriate "
-        "foreign key relationships and indexes."
-    )
-
-    add_paragraph_with_style(doc,
-        "4) AWS Integration: The S3 service module handles file hash uploads to AWS S3 buckets, providing "
-        "redundant cloud storage and enabling future features like cross-device synchronization."
-    )
-
-    add_paragraph_with_style(doc,
-        "5) REST API Layer: Exposes RESTful endpoints secured with Spring Security. All endpoints require "
-        "authentication except for signup and login. CORS configuration allows controlled access from "
-        "the extension and local server."
-    )
-
-    # D. AWS Cloud Services
-    add_heading(doc, 'D. AWS Cloud Services', level=2)
-
-    add_paragraph_with_style(doc,
-        "Amazon Web Services integration provides scalability and reliability:"
-    )
-
-    add_paragraph_with_style(doc,
-        "1) S3 Storage: File hashes and metadata are stored in S3 buckets with versioning enabled. This "
-        "provides durability (99.999999999% according to AWS SLA) and enables future features like "
-        "backup and restore."
-    )
-
-    add_paragraph_with_style(doc,
-        "2) IAM Security: AWS Identity and Access Management policies ensure that only the backend "
-        "service can access S3 buckets, using temporary credentials and least-privilege principles."
-    )
-
-    add_paragraph_with_style(doc,
-        "3) Scalability: The architecture supports future integration with additional AWS services like "
-        "Lambda for serverless processing, CloudWatch for monitoring, and SES for email delivery."
-    )
-
-    # IV. IMPLEMENTATION DETAILS
-    add_heading(doc, 'IV. IMPLEMENTATION DETAILS', level=1)
-
-    add_paragraph_with_style(doc,
-        "This section provides in-depth implementation details of the DDAS system, including algorithms, "
-        "protocols, and technical design decisions."
-    )
-
-    # A. Download Monitoring Algorithm
-    add_heading(doc, 'A. Download Monitoring Algorithm', level=2)
-
-    add_paragraph_with_style(doc,
-        "The download monitoring system uses Chrome's downloads API to detect file download events. When "
-        "a download is initiated, the extension captures metadata including filename, URL, file size, "
-        "and destination path. The system implements a state machine with four states: PENDING, "
-        "PROCESSING, COMPLETED, and SKIPPED."
-    )
-
-    add_paragraph_with_style(doc,
-        "Download events are stored in Chrome's local storage with a unique identifier based on the "
-        "download ID and timestamp. The background service worker monitors download completion using "
-        "the onChanged event listener, automatically updating the state when a download finishes."
-    )
-
-    add_paragraph_with_style(doc,
-        "To handle concurrent downloads, the system maintains a queue structure with asynchronous "
-        "processing. Each download is processed independently, ensuring that slow hash calculations "
-        "don't block other operations."
-    )
-
-    # B. Cryptographic Hashing Implementation
-    add_heading(doc, 'B. Cryptographic Hashing Implementation', level=2)
-
-    add_paragraph_with_style(doc,
-        "SHA-256 hashing is performed by the Python middleware server using the hashlib library. The "
-        "implementation uses a streaming approach to handle files of arbitrary size:"
-    )
-
-    add_paragraph_with_style(doc,
-        "The file is read in 64KB chunks, each chunk is processed through the SHA-256 algorithm, and "
-        "the hash state is maintained across chunks. This approach ensures constant memory usage "
-        "regardless of file size. For a 1GB file, peak memory usage remains under 100MB."
-    )
-
-    add_paragraph_with_style(doc,
-        "Performance benchmarks show hash calculation times of approximately 0.5 seconds for a 100MB "
-        "file on a standard development machine (Intel i5, SSD storage). The algorithm is CPU-bound, "
-        "with modern processors' SHA extensions providing hardware acceleration when available."
-    )
-
-    # C. Duplicate Detection Logic
-    add_heading(doc, 'C. Duplicate Detection Logic', level=2)
-
-    add_paragraph_with_style(doc,
-        "The duplicate detection algorithm operates on the principle that identical files produce "
-        "identical SHA-256 hashes. The backend maintains a hash index using database B-tree structures "
-        "for O(log n) lookup complexity."
-    )
-
-    add_paragraph_with_style(doc,
-        "When a file is processed, its hash is compared against the database. If a match is found, the "
-        "system retrieves the original file's metadata including filename, upload date, and user "
-        "information. This metadata is returned to the user for informed decision-making."
-    )
-
-    add_paragraph_with_style(doc,
-        "The system implements hash collision handling, though with SHA-256's 256-bit output space, "
-        "collisions are astronomically improbable. In the unlikely event of a collision, the system "
-        "falls back to byte-by-byte comparison."
-    )
-
-    # D. User Authentication Flow
-    add_heading(doc, 'D. User Authentication Flow', level=2)
-
-    add_paragraph_with_style(doc,
-        "User authentication implements a multi-stage process ensuring security while maintaining "
-        "usability. The signup process begins with user registration, where passwords are hashed using "
-        "bcrypt with a work factor of 12, providing strong protection against brute-force attacks."
-    )
-
-    add_paragraph_with_style(doc,
-        "Upon registration, the system generates a 6-digit OTP valid for 10 minutes. In production, "
-        "this OTP is sent via email using AWS SES. The development version logs the OTP to the console "
-        "for testing purposes."
-    )
-
-    add_paragraph_with_style(doc,
-        "Email verification activates the user account and issues a JWT token. The JWT includes user ID, "
-        "username, and role claims, signed with HS256 algorithm. Tokens expire after 24 hours, requiring "
-        "re-authentication for continued access."
-    )
-
-    add_paragraph_with_style(doc,
-        "The extension stores JWT tokens in Chrome's secure storage, automatically including the token "
-        "in Authorization headers for all API requests. Token validation occurs on the backend for every "
-        "protected endpoint."
-    )
-
-    # E. File Management Operations
-    add_heading(doc, 'E. File Management Operations', level=2)
-
-    add_paragraph_with_style(doc,
-        "When a duplicate is detected, users are presented with two options: delete or keep. The delete "
-        "operation is handled by the Python server, which performs several security checks before "
-        "executing the deletion."
-    )
-
-    add_paragraph_with_style(doc,
-        "First, the server verifies that the file path is within the user's Downloads directory, "
-        "preventing malicious path traversal attacks. Second, it confirms file existence and checks "
-        "permissions. Only then does it execute os.remove() to delete the file."
-    )
-
-    add_paragraph_with_style(doc,
-        "All file operations are logged with timestamps, user identifiers, and action types. This audit "
-        "trail enables troubleshooting and provides accountability. The activity history is stored both "
-        "locally (last 20 items) and on the backend (complete history)."
-    )
-
-    # V. SECURITY ANALYSIS
-    add_heading(doc, 'V. SECURITY ANALYSIS', level=1)
-
-    add_paragraph_with_style(doc,
-        "Security is paramount in a system that handles user files and authentication. DDAS implements "
-        "multiple layers of security following defense-in-depth principles."
-    )
-
-    # A. Authentication and Authorization
-    add_heading(doc, 'A. Authentication and Authorization', level=2)
-
-    add_paragraph_with_style(doc,
-        "JWT-based authentication provides stateless, scalable security. Tokens are cryptographically "
-        "signed, preventing tampering. The backend validates token signatures, expiration, and user "
-        "status before granting access."
-    )
-
-    add_paragraph_with_style(doc,
-        "OTP email verification prevents automated account creation and confirms email ownership. The "
-        "6-digit format provides 1,000,000 possible combinations, and the 10-minute expiration limits "
-        "brute-force attack windows."
-    )
-
-    add_paragraph_with_style(doc,
-        "Passwords are hashed with bcrypt using salt rounds of 12, making rainbow table attacks "
-        "infeasible. The bcrypt algorithm is intentionally slow, limiting password guess rates to "
-        "protect against brute-force attacks."
-    )
-
-    # B. Data Privacy
-    add_heading(doc, 'B. Data Privacy', level=2)
-
-    add_paragraph_with_style(doc,
-        "DDAS is designed with privacy-by-design principles. The system never uploads actual file "
-        "contents to servers—only SHA-256 hashes and metadata. This ensures that sensitive file "
-        "contents remain on the user's device."
-    )
-
-    add_paragraph_with_style(doc,
-        "File hashes are one-way cryptographic functions, meaning the original file cannot be "
-        "reconstructed from the hash. Even if the database is compromised, attackers cannot access "
-        "file contents."
-    )
-
-    add_paragraph_with_style(doc,
-        "User data is stored with encryption at rest in AWS S3 and the database. Transmission security "
-        "is enforced through HTTPS for all API communications, preventing man-in-the-middle attacks."
-    )
-
-    # C. Input Validation
-    add_heading(doc, 'C. Input Validation', level=2)
-
-    add_paragraph_with_style(doc,
-        "All user inputs undergo strict validation on both client and server sides. The extension "
-        "performs client-side validation for immediate feedback, while the backend enforces validation "
-        "as the security boundary."
-    )
-
-    add_paragraph_with_style(doc,
-        "File paths are sanitized to prevent directory traversal attacks. The system validates that "
-        "paths contain only allowed characters and do not include '..' sequences. Regular expressions "
-        "enforce strict patterns for email addresses and usernames."
-    )
-
-    add_paragraph_with_style(doc,
-        "SQL injection is prevented through parameterized queries and JPA's built-in escaping. Cross-site "
-        "scripting (XSS) protection is implemented through content security policies in the extension "
-        "and output encoding in the API."
-    )
-
-    # D. CORS and Network Security
-    add_heading(doc, 'D. CORS and Network Security', level=2)
-
-    add_paragraph_with_style(doc,
-        "Cross-Origin Resource Sharing (CORS) is configured to allow requests only from authorized "
-        "origins: the Chrome extension and localhost:5001. This prevents malicious websites from "
-        "accessing the API."
-    )
-
-    add_paragraph_with_style(doc,
-        "The Python middleware server binds only to localhost, making it inaccessible from external "
-        "networks. This local-only approach prevents remote attacks while enabling browser integration."
-    )
-
-    add_paragraph_with_style(doc,
-        "API rate limiting is implemented to prevent abuse and denial-of-service attacks. Users are "
-        "limited to 100 requests per minute, sufficient for normal usage while blocking automated attacks."
-    )
-
-    # VI. PERFORMANCE EVALUATION
-    add_heading(doc, 'VI. PERFORMANCE EVALUATION', level=1)
-
-    add_paragraph_with_style(doc,
-        "Comprehensive performance testing was conducted to evaluate DDAS under various conditions. "
-        "Tests were performed on a development machine with Intel Core i5 processor, 16GB RAM, and "
-        "SSD storage."
-    )
-
-    # A. Hashing Performance
-    add_heading(doc, 'A. Hashing Performance', level=2)
-
-    add_paragraph_with_style(doc,
-        "Hash calculation performance is critical for user experience. Tests measured hash computation "
-        "time for files ranging from 1KB to 1GB. Results show linear scaling with file size, averaging "
-        "200 MB/s throughput."
-    )
-
-    add_paragraph_with_style(doc,
-        "For typical download sizes (1-50MB), hash calculation completes in under 1 second. Large files "
-        "(100MB+) complete within 5 seconds. The chunked reading approach maintains constant memory usage "
-        "of approximately 65MB regardless of file size."
-    )
-
-    add_paragraph_with_style(doc,
-        "Comparison with MD5 hashing shows SHA-256 is approximately 30% slower, but the security "
-        "benefits justify this trade-off. Hardware acceleration through CPU SHA extensions provides "
-        "2-3x speedup on compatible processors."
-    )
-
-    # B. Database Query Performance
-    add_heading(doc, 'B. Database Query Performance', level=2)
-
-    add_paragraph_with_style(doc,
-        "Database performance testing focused on hash lookup operations. With proper indexing on the "
-        "hash column, lookup queries execute in under 5 milliseconds even with 100,000 records in the "
-        "database."
-    )
-
-    add_paragraph_with_style(doc,
-        "The B-tree index structure provides O(log n) complexity, ensuring scalability. Tests with "
-        "1 million records showed lookup times under 10 milliseconds, demonstrating excellent "
-        "scalability characteristics."
-    )
-
-    add_paragraph_with_style(doc,
-        "Database connection pooling (HikariCP) maintains a pool of 10 connections, eliminating "
-        "connection overhead for concurrent requests. Under load testing with 50 concurrent users, "
-        "average response time remained under 500 milliseconds."
-    )
-
-    # C. End-to-End Processing Time
-    add_heading(doc, 'C. End-to-End Processing Time', level=2)
-
-    add_paragraph_with_style(doc,
-        "End-to-end processing time includes file hash calculation, API communication, database lookup, "
-        "and result presentation. For a typical 10MB file, the complete workflow executes in "
-        "approximately 1.5 seconds."
-    )
-
-    add_paragraph_with_style(doc,
-        "Breakdown of processing time: Hash calculation (60%), API communication (20%), Database query "
-        "(5%), UI rendering (15%). Network latency is minimal since all components run on localhost."
-    )
-
-    add_paragraph_with_style(doc,
-        "The system maintains responsiveness through asynchronous processing. Users can continue browsing "
-        "while files are processed in the background. Progress indicators provide real-time feedback "
-        "during processing."
-    )
-
-    # D. Memory and CPU Utilization
-    add_heading(doc, 'D. Memory and CPU Utilization', level=2)
-
-    add_paragraph_with_style(doc,
-        "Resource utilization testing measured system overhead. The Chrome extension's background "
-        "service worker consumes approximately 15MB RAM when idle, increasing to 80MB during active "
-        "processing. This is within acceptable limits for browser extensions."
-    )
-
-    add_paragraph_with_style(doc,
-        "The Python server uses 40MB base memory, with peaks of 150MB during large file processing. "
-        "The Java backend requires 200MB JVM heap space for normal operation, scaling to 500MB under "
-        "heavy load."
-    )
-
-    add_paragraph_with_style(doc,
-        "CPU utilization spikes to 50-70% during hash calculation, dropping to near-zero during idle "
-        "periods. The event-driven architecture ensures minimal resource consumption when no downloads "
-        "are active."
-    )
-
-    # VII. USER EXPERIENCE DESIGN
-    add_heading(doc, 'VII. USER EXPERIENCE DESIGN', level=1)
-
-    add_paragraph_with_style(doc,
-        "User experience is central to DDAS's design philosophy. The system prioritizes clarity, "
-        "simplicity, and user control throughout the interaction flow."
-    )
-
-    # A. Interface Design Principles
-    add_heading(doc, 'A. Interface Design Principles', level=2)
-
-    add_paragraph_with_style(doc,
-        "The popup interface follows material design principles with clear visual hierarchy. Color coding "
-        "provides immediate status recognition: green for success, yellow for pending, red for errors, "
-        "and blue for informational messages."
-    )
-
-    add_paragraph_with_style(doc,
-        "Icons enhance usability by providing visual cues for actions. The checkmark icon indicates "
-        "successful processing, trash can for deletions, folder for kept files, and skip symbol for "
-        "skipped items."
-    )
-
-    add_paragraph_with_style(doc,
-        "Typography uses system fonts for consistency with the user's operating system. Font sizes are "
-        "carefully chosen for readability in the compact popup window (320x600 pixels)."
-    )
-
-    # B. Interaction Patterns
-    add_heading(doc, 'B. Interaction Patterns', level=2)
-
-    add_paragraph_with_style(doc,
-        "User interactions follow predictable patterns. Primary actions use prominent buttons with "
-        "clear labels. Destructive actions (like delete) require explicit confirmation to prevent "
-        "accidental data loss."
-    )
-
-    add_paragraph_with_style(doc,
-        "The system provides immediate feedback for all user actions through toast notifications and "
-        "status updates. Loading states use animated spinners and progress indicators to communicate "
-        "ongoing operations."
-    )
-
-    add_paragraph_with_style(doc,
-        "Error messages are written in plain language, explaining what went wrong and how to fix it. "
-        "Technical jargon is avoided in user-facing messages, with detailed error codes logged for "
-        "debugging purposes."
-    )
-
-    # C. Accessibility Considerations
-    add_heading(doc, 'C. Accessibility Considerations', level=2)
-
-    add_paragraph_with_style(doc,
-        "The interface implements WCAG 2.1 Level AA accessibility guidelines. Color is never the only "
-        "indicator of state—icons and text labels accompany all color-coded elements."
-    )
-
-    add_paragraph_with_style(doc,
-        "Keyboard navigation is fully supported, allowing users to tab through interactive elements. "
-        "ARIA labels provide screen reader support, enabling visually impaired users to use the system."
-    )
-
-    add_paragraph_with_style(doc,
-        "Text contrast ratios meet accessibility standards, ensuring readability for users with visual "
-        "impairments. Font sizes are scalable, respecting user browser zoom settings."
-    )
-
-    # VIII. USE CASES AND SCENARIOS
-    add_heading(doc, 'VIII. USE CASES AND SCENARIOS', level=1)
-
-    add_paragraph_with_style(doc,
-        "DDAS addresses various real-world scenarios where duplicate file detection provides significant "
-        "value. This section presents typical use cases and user stories."
-    )
-
-    # A. Academic Research Scenario
-    add_heading(doc, 'A. Academic Research Scenario', level=2)
-
-    add_paragraph_with_style(doc,
-        "A graduate student downloads research papers and datasets frequently. Often, the same paper is "
-        "downloaded from different sources or at different times. DDAS automatically detects when a "
-        "previously downloaded paper is downloaded again, alerting the student and offering to delete "
-        "the duplicate. This saves disk space and helps maintain an organized research library."
-    )
-
-    add_paragraph_with_style(doc,
-        "In one month of usage, a typical research student might prevent 20-30 duplicate downloads, "
-        "saving 500MB-1GB of storage space and countless hours of manual file organization."
-    )
-
-    # B. Software Development Scenario
-    add_heading(doc, 'B. Software Development Scenario', level=2)
-
-    add_paragraph_with_style(doc,
-        "A software developer frequently downloads libraries, frameworks, and documentation. Version "
-        "updates often result in multiple copies of the same file. DDAS helps identify true duplicates "
-        "(identical files) versus different versions, preventing storage waste while maintaining "
-        "necessary version history."
-    )
-
-    add_paragraph_with_style(doc,
-        "The developer can choose to keep certain duplicates (like backup copies) while automatically "
-        "deleting others, maintaining full control over file management decisions."
-    )
-
-    # C. Media Management Scenario
-    add_heading(doc, 'C. Media Management Scenario', level=2)
-
-    add_paragraph_with_style(doc,
-        "A content creator downloads images, videos, and audio files for projects. Due to collaborative "
-        "workflows, the same media assets are often shared through different channels. DDAS prevents "
-        "duplicate storage, which is particularly valuable for large media files."
-    )
-
-    add_paragraph_with_style(doc,
-        "For a typical video file (500MB-2GB), detecting and preventing duplicates can save gigabytes "
-        "of storage space monthly, significantly impacting users with limited SSD capacity."
-    )
-
-    # D. Corporate Environment Scenario
-    add_heading(doc, 'D. Corporate Environment Scenario', level=2)
-
-    add_paragraph_with_style(doc,
-        "In enterprise settings, employees download documents, presentations, and reports multiple times "
-        "due to email attachments, shared drives, and version control systems. DDAS deployment across "
-        "an organization can lead to substantial storage savings and improved file organization."
-    )
-
-    add_paragraph_with_style(doc,
-        "The system's audit trail provides compliance documentation, tracking which files were processed "
-        "and what actions were taken, valuable for information governance policies."
-    )
-
-    # IX. COMPUTER NETWORKS CONCEPTS
-    add_heading(doc, 'IX. COMPUTER NETWORKS CONCEPTS', level=1)
-
-    add_paragraph_with_style(doc,
-        "DDAS extensively leverages computer networking concepts and protocols. This section analyzes "
-        "the networking technologies employed in the system architecture."
-    )
-
-    # A. Client-Server Architecture
-    add_heading(doc, 'A. Client-Server Architecture', level=2)
-
-    add_paragraph_with_style(doc,
-        "DDAS implements a classic multi-tier client-server architecture. The Chrome extension acts as "
-        "the client, making HTTP requests to servers (Python middleware and Java backend). This "
-        "architecture enables centralized data management, scalability, and separation of concerns."
-    )
-
-    add_paragraph_with_style(doc,
-        "The client-server model allows multiple users to share a common backend, enabling future "
-        "features like organization-wide duplicate detection and collaborative file management."
-    )
-
-    # B. HTTP/HTTPS Protocol
-    add_heading(doc, 'B. HTTP/HTTPS Protocol', level=2)
-
-    add_paragraph_with_style(doc,
-        "All system communications use HTTP/HTTPS protocol. The extension communicates with the Python "
-        "server via HTTP POST requests containing JSON payloads. The Python server forwards requests "
-        "to the Java backend using HTTPS for encryption."
-    )
-
-    add_paragraph_with_style(doc,
-        "RESTful API design principles are followed, with appropriate HTTP methods (GET, POST, DELETE) "
-        "and status codes (200 OK, 201 Created, 400 Bad Request, 401 Unauthorized, 500 Internal Error). "
-        "Response bodies use JSON format for structured data exchange."
-    )
-
-    # C. CORS (Cross-Origin Resource Sharing)
-    add_heading(doc, 'C. CORS (Cross-Origin Resource Sharing)', level=2)
-
-    add_paragraph_with_style(doc,
-        "CORS is a critical security mechanism in DDAS. The browser extension runs in a different origin "
-        "than the backend servers, requiring CORS headers to permit cross-origin requests."
-    )
-
-    add_paragraph_with_style(doc,
-        "The backend configures CORS to allow requests from specific origins (chrome-extension:// and "
-        "localhost:5001), with credentials and authorization headers permitted. This prevents unauthorized "
-        "websites from accessing the API while enabling legitimate client access."
-    )
-
-    # D. TCP/IP Stack
-    add_heading(doc, 'D. TCP/IP Stack', level=2)
-
-    add_paragraph_with_style(doc,
-        "HTTP operates atop the TCP/IP stack. TCP provides reliable, ordered delivery of data packets "
-        "between client and server. The three-way handshake establishes connections, and flow control "
-        "mechanisms ensure efficient data transfer."
-    )
-
-    add_paragraph_with_style(doc,
-        "Since all components run on localhost, communications use the loopback network interface "
-        "(127.0.0.1), which bypasses physical network hardware for maximum speed and security. Loopback "
-        "traffic never leaves the machine, preventing network-based attacks."
-    )
-
-    # E. DNS and Port Management
-    add_heading(doc, 'E. DNS and Port Management', level=2)
-
-    add_paragraph_with_style(doc,
-        "The system uses well-defined ports: 5001 for Python server and 8080 for Java backend. These "
-        "ports are registered with the operating system, allowing multiple applications to coexist "
-        "without conflicts."
-    )
-
-    add_paragraph_with_style(doc,
-        "Localhost (127.0.0.1) resolves through the hosts file, bypassing DNS lookups. This reduces "
-        "latency and eliminates dependency on external DNS servers."
-    )
-
-    # F. WebSocket and Real-time Communication
-    add_heading(doc, 'F. WebSocket and Real-time Communication', level=2)
-
-    add_paragraph_with_style(doc,
-        "While current implementation uses HTTP polling, the architecture supports future integration "
-        "of WebSocket for real-time bidirectional communication. This would enable push notifications "
-        "when processing completes, eliminating the need for clients to poll for status updates."
-    )
-
-    # G. Load Balancing and Scalability
-    add_heading(doc, 'G. Load Balancing and Scalability', level=2)
-
-    add_paragraph_with_style(doc,
-        "The microservices architecture facilitates horizontal scaling. Multiple backend instances can "
-        "run behind a load balancer (like Nginx or AWS ALB), distributing requests across servers. "
-        "Database replication ensures data availability and performance under high load."
-    )
-
-    # X. TESTING AND VALIDATION
-    add_heading(doc, 'X. TESTING AND VALIDATION', level=1)
-
-    add_paragraph_with_style(doc,
-        "Comprehensive testing ensures DDAS reliability and correctness. Multiple testing strategies "
-        "were employed throughout development."
-    )
-
-    # A. Unit Testing
-    add_heading(doc, 'A. Unit Testing', level=2)
-
-    add_paragraph_with_style(doc,
-        "Backend services include JUnit test suites with over 80% code coverage. Critical components "
-        "like hash calculation, duplicate detection, and authentication are thoroughly tested with "
-        "positive, negative, and edge cases."
-    )
-
-    add_paragraph_with_style(doc,
-        "Mock objects simulate external dependencies (database, S3, email service), enabling isolated "
-        "testing of business logic. Test-driven development practices ensure code quality and "
-        "maintainability."
-    )
-
-    # B. Integration Testing
-    add_heading(doc, 'B. Integration Testing', level=2)
-
-    add_paragraph_with_style(doc,
-        "Integration tests verify interactions between system components. Test scenarios include "
-        "complete workflows from download detection through duplicate processing and user action execution."
-    )
-
-    add_paragraph_with_style(doc,
-        "Automated test scripts simulate user interactions, downloading files and verifying correct "
-        "duplicate detection. Database transactions are tested for atomicity and consistency."
-    )
-
-    # C. User Acceptance Testing
-    add_heading(doc, 'C. User Acceptance Testing', level=2)
-
-    add_paragraph_with_style(doc,
-        "Beta testing with 20 users provided valuable feedback on usability and functionality. Users "
-        "reported high satisfaction with the automated detection and appreciated having control over "
-        "duplicate management decisions."
-    )
-
-    add_paragraph_with_style(doc,
-        "Feedback led to several improvements: clearer status messages, better error handling, and "
-        "enhanced activity history display. The skip functionality was added based on user requests "
-        "for handling sensitive files."
-    )
-
-    # XI. FUTURE ENHANCEMENTS
-    add_heading(doc, 'XI. FUTURE ENHANCEMENTS', level=1)
-
-    add_paragraph_with_style(doc,
-        "Several enhancements are planned to extend DDAS capabilities and improve user experience."
-    )
-
-    # A. Advanced Duplicate Detection
-    add_heading(doc, 'A. Advanced Duplicate Detection', level=2)
-
-    add_paragraph_with_style(doc,
-        "Future versions will implement fuzzy duplicate detection using perceptual hashing algorithms. "
-        "This enables identification of near-duplicates like resized images or re-encoded videos. "
-        "Machine learning models can be trained to recognize similar documents even with minor edits."
-    )
-
-    # B. Cloud Synchronization
-    add_heading(doc, 'B. Cloud Synchronization', level=2)
-
-    add_paragraph_with_style(doc,
-        "Cross-device synchronization would allow users to access their file history across multiple "
-        "computers. Cloud integration with Google Drive, Dropbox, and OneDrive would extend duplicate "
-        "detection to cloud storage platforms."
-    )
-
-    # C. Batch Processing
-    add_heading(doc, 'C. Batch Processing', level=2)
-
-    add_paragraph_with_style(doc,
-        "A batch processing mode would scan existing Downloads folders, identifying duplicates in already "
-        "downloaded files. This provides value for users adopting DDAS on systems with extensive "
-        "download histories."
-    )
-
-    # D. Analytics Dashboard
-    add_heading(doc, 'D. Analytics Dashboard', level=2)
-
-    add_paragraph_with_style(doc,
-        "An analytics dashboard would visualize storage saved, duplicate detection rates, and file "
-        "management trends. Insights like most frequently duplicated files could inform user behavior "
-        "and system optimization."
-    )
-
-    # E. Mobile Application
-    add_heading(doc, 'E. Mobile Application', level=2)
-
-    add_paragraph_with_style(doc,
-        "Companion mobile applications for iOS and Android would extend DDAS to mobile downloads. The "
-        "existing backend API can serve mobile clients with minimal modifications."
-    )
-
-    # F. Account Management Features
-    add_heading(doc, 'F. Account Management Features', level=2)
-
-    add_paragraph_with_style(doc,
-        "Enhanced account management including profile customization, usage statistics, and account "
-        "deletion functionality. Users should have complete control over their data with easy export "
-        "and deletion options complying with GDPR and similar regulations."
-    )
-
-    # XII. CONCLUSION
-    add_heading(doc, 'XII. CONCLUSION', level=1)
-
-    add_paragraph_with_style(doc,
-        "DDAS successfully addresses the file duplication problem through an innovative combination of "
-        "browser extension technology, microservices architecture, and cloud integration. The system "
-        "demonstrates that automatic duplicate detection can be both accurate and user-friendly when "
-        "designed with user control and privacy as primary concerns."
-    )
-
-    add_paragraph_with_style(doc,
-        "Performance evaluation shows DDAS achieves 99.9% accuracy with sub-2-second processing times "
-        "for typical files. The cryptographic hashing approach eliminates false positives while "
-        "maintaining user privacy by never uploading file contents."
-    )
-
-    add_paragraph_with_style(doc,
-        "The microservices architecture provides excellent separation of concerns, enabling independent "
-        "scaling and maintenance of system components. Security implementation follows industry best "
-        "practices with JWT authentication, encrypted communications, and comprehensive input validation."
-    )
-
-    add_paragraph_with_style(doc,
-        "User feedback confirms that DDAS delivers tangible value in reducing storage waste and improving "
-        "file organization. The system's non-intrusive operation and clear user interface contribute to "
-        "high user satisfaction."
-    )
-
-    add_paragraph_with_style(doc,
-        "Future enhancements will extend DDAS capabilities with fuzzy matching, cloud synchronization, "
-        "and mobile support. The modular architecture facilitates these additions without requiring "
-        "fundamental redesign."
-    )
-
-    add_paragraph_with_style(doc,
-        "In conclusion, DDAS demonstrates a practical, efficient solution to file duplication challenges, "
-        "combining modern web technologies with sound software engineering principles. The project serves "
-        "as a comprehensive example of full-stack development, integrating frontend, backend, middleware, "
-        "and cloud services into a cohesive, user-focused application."
-    )
-
-    # ACKNOWLEDGMENTS
-    add_heading(doc, 'ACKNOWLEDGMENTS', level=1)
-
-    add_paragraph_with_style(doc,
-        "We thank our project advisors and faculty members for their guidance throughout the development "
-        "of DDAS. Special appreciation to the beta testers who provided valuable feedback that shaped "
-        "the final system design. We also acknowledge the open-source community for the excellent tools "
-        "and libraries that made this project possible."
-    )
-
-    # REFERENCES
-    add_heading(doc, 'REFERENCES', level=1)
-
-    references = [
-        "[1] National Institute of Standards and Technology, \"Secure Hash Standard (SHS),\" FIPS PUB 180-4, August 2015.",
-        "[2] D. Jones and M. Roe, \"Cryptographic Hash-Function Basics: Definitions, Implications, and Separations for Preimage Resistance, Second-Preimage Resistance, and Collision Resistance,\" in Fast Software Encryption, 2004, pp. 371-388.",
-        "[3] Google Chrome Extensions Documentation, \"Manifest V3 Overview,\" https://developer.chrome.com/docs/extensions/mv3/, accessed November 2025.",
-        "[4] Spring Framework Team, \"Spring Boot Reference Documentation,\" version 3.0, 2023.",
-        "[5] Amazon Web Services, \"Amazon S3 Developer Guide,\" https://docs.aws.amazon.com/s3/, accessed November 2025.",
-        "[6] M. Jones, J. Bradley, and N. Sakimura, \"JSON Web Token (JWT),\" RFC 7519, May 2015.",
-        "[7] A. Barth, \"The Web Origin Concept,\" RFC 6454, December 2011.",
-        "[8] Flask Development Team, \"Flask Web Framework Documentation,\" version 2.3, 2023.",
-        "[9] N. Provos and D. Mazières, \"A Future-Adaptable Password Scheme,\" in Proceedings of USENIX Annual Technical Conference, 1999.",
-        "[10] P. Saint-Andre and J. Hodges, \"Representation and Verification of Domain-Based Application Service Identity within Internet Public Key Infrastructure Using X.509 (PKIX) Certificates in the Context of Transport Layer Security (TLS),\" RFC 6125, March 2011.",
-        "[11] R. Fielding et al., \"Hypertext Transfer Protocol (HTTP/1.1): Semantics and Content,\" RFC 7231, June 2014.",
-        "[12] A. van Kesteren, \"Cross-Origin Resource Sharing,\" W3C Recommendation, January 2014.",
-        "[13] E. Rescorla, \"The Transport Layer Security (TLS) Protocol Version 1.3,\" RFC 8446, August 2018.",
-        "[14] D. Meyer et al., \"Performance Analysis of Cryptographic Hash Functions Suitable for Use in Blockchain,\" in Proceedings of International Conference on Internet of Things, 2020.",
-        "[15] J. Postel, \"Internet Protocol,\" RFC 791, September 1981.",
-        "[16] PostgreSQL Global Development Group, \"PostgreSQL 15 Documentation,\" 2023.",
-        "[17] Chrome Platform Team, \"Chrome Downloads API,\" https://developer.chrome.com/docs/extensions/reference/downloads/, accessed November 2025.",
-        "[18] World Wide Web Consortium, \"Web Content Accessibility Guidelines (WCAG) 2.1,\" June 2018.",
-        "[19] European Parliament, \"General Data Protection Regulation (GDPR),\" Regulation (EU) 2016/679, April 2016.",
-        "[20] M. Bellare and P. Rogaway, \"Random Oracles are Practical: A Paradigm for Designing Efficient Protocols,\" in Proceedings of ACM Conference on Computer and Communications Security, 1993."
-    ]
-
-    for ref in references:
-        add_paragraph_with_style(doc, ref, font_size=9)
-
-    # AUTHOR BIOGRAPHIES
-    doc.add_page_break()
-    add_heading(doc, 'AUTHOR BIOGRAPHIES', level=1)
-
-    add_paragraph_with_style(doc,
-        "Hitendra Singh is a computer science student specializing in web technologies and cloud computing. "
-        "His research interests include browser extensions, microservices architecture, and security in "
-        "distributed systems. He has contributed to several open-source projects focused on developer tools "
-        "and productivity applications.",
-        font_size=10
-    )
-
-    add_paragraph_with_style(doc,
-        "Dhruv Maheshwari is a computer science student with expertise in backend development and database "
-        "systems. His interests include API design, authentication systems, and scalable cloud architectures. "
-        "He has experience in building enterprise-grade applications using Java Spring Boot and modern cloud "
-        "platforms.",
-        font_size=10
-    )
-
-    # Save the document
-    doc.save('/Users/hitendrasingh/Desktop/deployed-ddas/DDAS_IEEE_Report.docx')
-    print("IEEE format report generated successfully: DDAS_IEEE_Report.docx")
-    print(f"Total pages: Approximately 20+ pages")
+def define_styles(doc):
+    """Create the REPORT_STYLES missing from doc; returns name -> style"""
+    styles = {}
+    for name, (base, size, bold, italic, alignment) in REPORT_STYLES.items():
+        try:
+            style = doc.styles[name]
+        except KeyError:
+            style = doc.styles.add_style(name, WD_STYLE_TYPE.PARAGRAPH)
+            style.base_style = doc.styles[base]
+            style.font.name = REPORT_FONT
+            style.font.size = Pt(size)
+            style.font.bold = bold
+            style.font.italic = italic
+            style.paragraph_format.alignment = alignment
+        styles[name] = style
+    return styles
+
+def add_table(doc, caption, headers, rows):
+    """Add a table with an IEEE-style caption above it"""
+    # Styles are applied by id: assigning a style object or name makes
+    # python-docx scan every style in the document on each assignment.
+    doc.add_paragraph(caption.upper())._p.style = doc.styles['DDAS Caption'].style_id
+
+    cell_style_id = doc.styles['DDAS Table Text'].style_id
+    table = doc.add_table(rows=1, cols=len(headers))
+    table._tbl.tblStyle_val = doc.styles['Table Grid'].style_id
+    table.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    for row_index, values in enumerate([headers] + [list(row) for row in rows]):
+        cells = table.rows[0].cells if row_index == 0 else table.add_row().cells
+        for cell, value in zip(cells, values):
+            paragraph = cell.paragraphs[0]
+            paragraph._p.style = cell_style_id
+            run = paragraph.add_run(str(value))
+            if row_index == 0:
+                run.bold = True
+    doc.add_paragraph()
+    return table
+
+def bar_chart_png(labels, series, ylabel):
+    """Draw a grouped bar chart (series: name -> values) as PNG; None without matplotlib"""
+    if plt is None:
+        return None
+    fig, ax = plt.subplots(figsize=(3.4, 2.2), dpi=200)
+    width = 0.8 / len(series)
+    for i, (name, values) in enumerate(series.items()):
+        ax.bar([x + i * width for x in range(len(labels))], values, width, label=name)
+    ax.set_xticks([x + width * (len(series) - 1) / 2 for x in range(len(labels))])
+    ax.set_xticklabels(labels, fontsize=7)
+    ax.set_ylabel(ylabel, fontsize=7)
+    ax.tick_params(axis='y', labelsize=7)
+    if len(series) > 1:
+        ax.legend(fontsize=7)
+    fig.tight_layout()
+    image = BytesIO()
+    fig.savefig(image, format='png')
+    plt.close(fig)
+    image.seek(0)
+    return image
+
+def add_bar_chart(doc, caption, labels, series, ylabel):
+    """Add a grouped bar chart with a caption below; skipped without matplotlib"""
+    image = bar_chart_png(labels, series, ylabel)
+    if image is None:
+        return None
+    doc.add_picture(image, width=Inches(3.25))
+    doc.paragraphs[-1].alignment = WD_ALIGN_PARAGRAPH.CENTER
+    doc.add_paragraph(caption)._p.style = doc.styles['DDAS Caption'].style_id
+    return image
+
+def load_benchmarks(path):
+    """Read results written by benchmarks/bench_performance.py --output"""
+    with open(path) as f:
+        return json.load(f)
+
+def run_benchmarks():
+    """Run the performance harness now and return its results"""
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, 'performance.json')
+        subprocess.run([sys.executable, BENCHMARK_SCRIPT, '--output', output], check=True)
+        return load_benchmarks(output)
+
+def load_content(path):
+    """Read report content: JSON, or YAML when the name says so (needs PyYAML)"""
+    with open(path, encoding='utf-8') as f:
+        if path.endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError:
+                raise SystemExit("PyYAML is required for YAML report content (pip install pyyaml)")
+            return yaml.safe_load(f)
+        return json.load(f)
+
+def performance_context(perf):
+    """Flat names for the measured figures that "format" paragraphs interpolate"""
+    env = perf['environment']
+    hashing = perf['hashing']
+    rates = [row['mb_per_s'] for row in hashing]
+    upload = perf['process']['upload']['latency_ms']
+    duplicate = perf['process']['duplicate']['latency_ms']
+    memory = perf['memory']
+    return {
+        'date': env['generated_at'][:10],
+        'platform': env['platform'],
+        'processor': env['processor'],
+        'cpu_count': env['cpu_count'],
+        'python': env['python'],
+        'hash_runs': hashing[0]['runs'],
+        'hash_min_rate': min(rates),
+        'hash_max_rate': max(rates),
+        'hash_mean_rate': sum(rates) / len(rates),
+        'largest_size_mb': hashing[-1]['size_mb'],
+        'largest_seconds': hashing[-1]['median_s'],
+        'hash_chunk_kb': env['hash_chunk_kb'],
+        'hash_buffers': env['hash_buffers'],
+        'hash_heap_peak_kb': max(row['heap_peak_mb'] for row in hashing) * 1024,
+        'hash_cpu_percent': sum(row['cpu_percent'] for row in hashing) / len(hashing),
+        'requests': perf['process']['requests'],
+        'file_mb': perf['process']['file_mb'],
+        'upload_p50_ms': upload['p50'],
+        'upload_p99_ms': upload['p99'],
+        'upload_p50_s': upload['p50'] / 1000,
+        'duplicate_p50_ms': duplicate['p50'],
+        'duplicate_p50_s': duplicate['p50'] / 1000,
+        'rss_baseline_mb': memory['baseline_rss_mb'],
+        'rss_peak_mb': memory['peak_rss_mb'],
+        'heap_peak_mb': memory['python_heap_peak_mb'],
+    }
+
+def hashing_table(perf):
+    return (['File size (MB)', 'Median time (s)', 'Throughput (MB/s)'],
+            [(row['size_mb'], f"{row['median_s']:.3f}", f"{row['mb_per_s']:.0f}") for row in perf['hashing']])
+
+def latency_table(perf):
+    paths = (('New file', perf['process']['upload']), ('Duplicate', perf['process']['duplicate']))
+    return (['Path', 'Mean', 'p50', 'p90', 'p99', 'Req/s'],
+            [(name, *(f"{row['latency_ms'][key]:.1f}" for key in ('mean', 'p50', 'p90', 'p99')),
+              f"{row['requests_per_s']:.1f}") for name, row in paths])
+
+def stages_table(perf):
+    return (['Stage', 'p50', 'p99'],
+            [(name.replace('_', ' '), f"{row['p50']:.1f}", f"{row['p99']:.1f}")
+             for name, row in perf['process']['upload']['stages_ms'].items()])
+
+def memory_table(perf):
+    memory = perf['memory']
+    return (['Measure', 'Value'],
+            [('RSS after start-up', f"{memory['baseline_rss_mb']:.1f}"),
+             ('Peak RSS', f"{memory['peak_rss_mb']:.1f}"),
+             ('Peak heap growth in /process', f"{memory['python_heap_peak_mb']:.2f}")])
+
+def hashing_chart(perf):
+    return ([f"{row['size_mb']} MB" for row in perf['hashing']],
+            {'SHA-256': [row['mb_per_s'] for row in perf['hashing']]}, 'MB/s')
+
+def latency_chart(perf):
+    keys = ('p50', 'p90', 'p99')
+    return (list(keys),
+            {'New file': [perf['process']['upload']['latency_ms'][key] for key in keys],
+             'Duplicate': [perf['process']['duplicate']['latency_ms'][key] for key in keys]}, 'ms')
+
+TABLE_SOURCES = {'hashing': hashing_table, 'latency': latency_table, 'stages': stages_table, 'memory': memory_table}
+CHART_SOURCES = {'hashing': hashing_chart, 'latency': latency_chart}
+
+# Blocks that change section properties rather than adding body content;
+# they are replayed when a section comes from the fragment cache.
+SETUP_BLOCKS = {'two_columns'}
+
+def file_digest(path):
+    if path is None:
+        return None
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+class FragmentCache:
+    """
+    Rendered section XML keyed by a hash of everything the section's output
+    depends on. Fragments are kept in memory and, with a directory, on disk
+    so other worker processes and later runs can reuse them.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self.fragments = {}
+        self.hits = 0
+        self.misses = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.json')
+
+    def get(self, key):
+        fragment = self.fragments.get(key)
+        if fragment is None and self.directory:
+            try:
+                with open(self._path(key), encoding='utf-8') as f:
+                    fragment = self.fragments[key] = json.load(f)
+            except (OSError, ValueError):
+                fragment = None
+        if fragment is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return fragment
+
+    def put(self, key, fragment):
+        self.fragments[key] = fragment
+        if self.directory:
+            path = self._path(key)
+            tmp_path = f'{path}.{os.getpid()}.tmp'  # Workers may race on the same key
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(fragment, f)
+            os.replace(tmp_path, path)
+
+class ReportRenderer:
+    """
+    Renders content blocks (see ieee_report.json) into a document.
+    Every paragraph references a named style by id - resolved once here -
+    rather than carrying per-run font settings; only inline bold/italic stay
+    on runs. Paragraphs are inserted directly before the body's section
+    properties: Document.add_paragraph searches the body for them on every
+    call, which makes long reports quadratic.
+    """
+
+    def __init__(self, doc, perf, cache=None, template_digest=None):
+        self.doc = doc
+        self.perf = perf
+        self.cache = cache
+        self.template_digest = template_digest
+        self.context = performance_context(perf)
+        self.styles = {name: style.style_id for name, style in define_styles(doc).items()}
+        self.heading_styles = {level: doc.styles[f'Heading {level}'].style_id for level in (1, 2, 3)}
+        self._sect_pr = doc.element.body.sectPr  # Looking it up scans the whole body
+
+    def add_paragraph(self, text, style_id):
+        p = OxmlElement('w:p')
+        if self._sect_pr is not None:
+            self._sect_pr.addprevious(p)
+        else:
+            self.doc.element.body.append(p)
+        p.style = style_id
+        paragraph = Paragraph(p, self.doc._body)
+        if any(c in text for c in '\n\t\r'):
+            paragraph.add_run(text)  # python-docx turns these into breaks and tabs
+        elif text:
+            # Plain text goes straight into one w:t; add_run handles it a character at a time
+            r = OxmlElement('w:r')
+            t = OxmlElement('w:t')
+            t.text = text
+            if text != text.strip():
+                t.set(qn('xml:space'), 'preserve')
+            r.append(t)
+            p.append(r)
+        return paragraph
+
+    def render(self, content):
+        page = content.get('page', {})
+        for section in self.doc.sections:
+            for margin in ('top_margin', 'bottom_margin', 'left_margin', 'right_margin'):
+                if margin in page:
+                    setattr(section, margin, Inches(page[margin]))
+        for section in content['sections']:
+            self.render_section(section)
+
+    def render_section(self, section):
+        if self.cache is None:
+            return self.render_blocks(section['blocks'])
+        key = self.section_key(section)
+        fragment = self.cache.get(key)
+        if fragment is not None:
+            self.insert_fragment(fragment)
+            self.render_blocks([block for block in section['blocks'] if block['type'] in SETUP_BLOCKS])
+            return
+        body = self.doc.element.body
+        tail = 1 if self._sect_pr is not None else 0  # New content lands before the sectPr
+        start = len(body) - tail
+        self.render_blocks(section['blocks'])
+        self.cache.put(key, self.capture_fragment(body[start:len(body) - tail]))
+
+    def render_blocks(self, blocks):
+        for block in blocks:
+            getattr(self, 'render_' + block['type'])(block)
+
+    def section_key(self, section):
+        """Hash of what the section renders from: its blocks, plus the figures if it uses them"""
+        uses_perf = any(block.get('format') or block['type'] in ('table', 'chart') for block in section['blocks'])
+        inputs = [FRAGMENT_VERSION, docx.__version__, self.template_digest, plt is not None,
+                  section, self.perf if uses_perf else None]
+        return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def capture_fragment(self, elements):
+        """Serialize rendered body elements, with the images they reference"""
+        images = {}
+        for element in elements:
+            for blip in element.iter(qn('a:blip')):
+                rId = blip.get(qn('r:embed'))
+                images[rId] = base64.b64encode(self.doc.part.related_parts[rId].blob).decode('ascii')
+        return {"elements": [etree.tostring(element, encoding='unicode') for element in elements],
+                "images": images}
+
+    def insert_fragment(self, fragment):
+        rIds = {}
+        for old_rId, blob in fragment['images'].items():
+            rIds[old_rId], _ = self.doc.part.get_or_add_image(BytesIO(base64.b64decode(blob)))
+        for xml in fragment['elements']:
+            element = parse_xml(xml)
+            for blip in element.iter(qn('a:blip')):
+                blip.set(qn('r:embed'), rIds[blip.get(qn('r:embed'))])
+            for doc_pr in element.iter(qn('wp:docPr')):
+                doc_pr.set('id', str(self.doc.part.next_id))  # Drawing ids must stay unique per document
+            if self._sect_pr is not None:
+                self._sect_pr.addprevious(element)
+            else:
+                self.doc.element.body.append(element)
+
+    def text(self, block):
+        return block['text'].format_map(self.context) if block.get('format') else block['text']
+
+    def render_title(self, block):
+        self.add_paragraph(self.text(block), self.styles['DDAS Title'])
+
+    def render_heading(self, block):
+        self.add_paragraph(self.text(block), self.heading_styles[block.get('level', 1)])
+
+    def render_paragraph(self, block):
+        self.add_paragraph(self.text(block), self.styles[block.get('style', 'DDAS Body')])
+
+    def render_keywords(self, block):
+        para = self.add_paragraph('', self.styles['DDAS Body'])
+        para.add_run(block['label']).bold = True
+        para.add_run(self.text(block)).italic = True
+
+    def render_references(self, block):
+        style_id = self.styles['DDAS Reference']
+        for item in block['items']:
+            self.add_paragraph(item, style_id)
+
+    def render_table(self, block):
+        headers, rows = TABLE_SOURCES[block['source']](self.perf)
+        add_table(self.doc, block['caption'], headers, rows)
+
+    def render_chart(self, block):
+        labels, series, ylabel = CHART_SOURCES[block['source']](self.perf)
+        add_bar_chart(self.doc, block['caption'], labels, series, ylabel)
+
+    def render_two_columns(self, block):
+        set_two_columns(self.doc.sections[-1])
+
+    def render_page_break(self, block):
+        add_page_break(self.doc)
+
+def create_ieee_report(perf, content_path=CONTENT_PATH, template=None, output=DEFAULT_OUTPUT, cache=None):
+    """Render the report content against template (a .docx with named styles) and save it"""
+    doc = Document(template)
+    ReportRenderer(doc, perf, cache, file_digest(template)).render(load_content(content_path))
+    doc.save(output)
+    print(f"IEEE format report generated successfully: {output}")
     print("Format: IEEE 2-column layout")
+    return output
+
+_worker_cache = None
+
+def _init_worker(cache_dir):
+    global _worker_cache
+    _worker_cache = FragmentCache(cache_dir)
+
+def render_job(job):
+    """Render one batch entry in a worker; returns (output, cache hits, cache misses)"""
+    hits, misses = _worker_cache.hits, _worker_cache.misses
+    create_ieee_report(load_benchmarks(job['benchmarks']), job.get('content', CONTENT_PATH),
+                       job.get('template'), job['output'], _worker_cache)
+    return job['output'], _worker_cache.hits - hits, _worker_cache.misses - misses
+
+def create_reports_batch(jobs, workers=None, cache_dir=CACHE_DIR):
+    """
+    Render many reports in a process pool. jobs is a list of
+    {"output", "benchmarks", "content"?, "template"?}. Sections are cached by
+    content hash under cache_dir, so unchanged sections are copied in as XML
+    instead of being rebuilt - across reports and across runs.
+    """
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(cache_dir,)) as pool:
+        for output, hits, misses in pool.map(render_job, jobs):
+            results.append(output)
+            print(f"  {output}: {hits} sections reused, {misses} rendered")
+    return results
+
+def write_template(path):
+    """Save an empty document holding the report styles, to restyle in Word and pass as --template"""
+    doc = Document()
+    define_styles(doc)
+    doc.save(path)
+    print(f"Template written: {path}")
 
 if __name__ == '__main__':
-    create_ieee_report()
-
+    parser = argparse.ArgumentParser(description='Generate the DDAS IEEE report')
+    parser.add_argument('--benchmarks', metavar='JSON',
+                        help='Results from benchmarks/bench_performance.py --output (default: run it now)')
+    parser.add_argument('--content', default=CONTENT_PATH, help='Report content, JSON or YAML')
+    parser.add_argument('--template', help='.docx whose named styles the report is rendered against')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--write-template', metavar='DOCX', help='Write a starter template and exit')
+    parser.add_argument('--batch', metavar='JSON',
+                        help='Render every report listed in this file (see create_reports_batch)')
+    parser.add_argument('--workers', type=int, help='Batch worker processes (default: CPU count)')
+    parser.add_argument('--cache-dir', default=CACHE_DIR, help='Where batch mode keeps rendered sections')
+    args = parser.parse_args()
+    if args.write_template:
+        write_template(args.write_template)
+    elif args.batch:
+        with open(args.batch) as f:
+            create_reports_batch(json.load(f), args.workers, args.cache_dir)
+    else:
+        perf = load_benchmarks(args.benchmarks) if args.benchmarks else run_benchmarks()
+        create_ieee_report(perf, args.content, args.template, args.output)
@@ -3,39 +3,727 @@
 DDAS Local HTTP Server - Replaces native messaging host
 Runs on http://localhost:5000 to receive file processing requests from Chrome extension
 """
-from flask import Flask, request, jsonify
+import time
+STARTED_AT = time.monotonic()  # Taken before the heavy imports, for time-to-ready
+
+from flask import Flask, g, request, jsonify
 from flask_cors import CORS
 import os
 import hashlib
-import requests
+import atexit
+import base64
+import contextvars
+import functools
+import heapq
+import hmac
+import importlib.util
+import io
+import itertools
+import json
 import logging
+import mmap
+import queue
+import re
+import signal
+import sqlite3
+import stat
+import struct
+import sys
+import threading
+import uuid
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+lazy_import_lock = threading.RLock()
+lazy_modules = {}  # name -> module, filled by the first real import
+
+class LazyModule:
+    """
+    Stand-in for a module that is imported on first attribute access. The
+    import runs once, under a lock, so threads racing on a cold module all
+    see it fully initialized.
+    """
+    def __init__(self, name):
+        self.__dict__['_name'] = name
+
+    def _load(self):
+        module = lazy_modules.get(self._name)
+        if module is None:
+            with lazy_import_lock:
+                module = lazy_modules.get(self._name)
+                if module is None:
+                    module = lazy_modules[self._name] = importlib.import_module(self._name)
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        return f"<lazy module {self._name!r}>"
+
+def lazy_import(name):
+    """
+    Import a module whose body only runs on first attribute access, keeping
+    heavy imports off the startup path. Returns None if it is not installed.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    try:
+        spec = importlib.util.find_spec(name)
+    except ModuleNotFoundError:  # Parent package of a submodule is missing
+        return None
+    if spec is None:
+        return None
+    return LazyModule(name)
+
+requests = lazy_import('requests')  # First needed by the first backend call
+blake3 = lazy_import('blake3')  # Optional: multi-threaded fast hashing
+msgpack = lazy_import('msgpack')  # Optional: MessagePack responses
+gzip = lazy_import('gzip')  # Archive mode only
+mimetypes = lazy_import('mimetypes')  # Normalized and perceptual hashing only
+numpy = lazy_import('numpy')  # Optional: perceptual hashing
+PIL_Image = lazy_import('PIL.Image')  # Optional: perceptual hashing
+tarfile = lazy_import('tarfile')
+zipfile = lazy_import('zipfile')
 
 app = Flask(__name__)
-CORS(app)  # Enable CORS for Chrome extension requests
+# Enable CORS for Chrome extension requests; admin endpoints are not for browsers
+CORS(app, resources={r'^/(?!admin/)': {}})
+
+# Configuration layer. Each DDAS_* setting comes from the environment or from
+# a JSON config file (DDAS_CONFIG) keyed by the same names; the file wins, so
+# a value set at launch can still be retuned. Settings read with tunable()
+# can be changed without a restart: edit the file, then send SIGHUP or
+# POST /admin/reload.
+CONFIG_PATH = os.environ.get('DDAS_CONFIG',
+                             os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ddas_config.json'))
+SETTINGS = {}  # setting name -> (value read at startup, default)
+TUNABLES = {}  # setting name -> (parse, default); the module global is the name without DDAS_
+
+def read_config_file(path=CONFIG_PATH):
+    """
+    The config file's settings as strings, like environment values ({} when
+    there is no file). Raises OSError or ValueError for an unreadable file.
+    """
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        values = json.load(f)
+    if not isinstance(values, dict):
+        raise ValueError("the config file must hold a JSON object")
+    return {name: ('1' if value else '0') if isinstance(value, bool) else str(value)
+            for name, value in values.items() if value is not None}
+
+try:
+    config_file = read_config_file()
+except (OSError, ValueError) as e:
+    logging.warning("Ignoring config file %s: %s", CONFIG_PATH, e)
+    config_file = {}
+
+def setting(name, default=None):
+    """A DDAS_* setting: the config file's value, else the environment's, else default"""
+    value = config_file.get(name, os.environ.get(name, default))
+    SETTINGS[name] = (value, default)
+    return value
+
+def flag(value):
+    return value == '1'
+
+def tunable(name, parse, default):
+    """Read a setting that a reload may change later; the parsed value is returned"""
+    TUNABLES[name] = (parse, default)
+    return parse(setting(name, default))
 
 # Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s [SERVER] %(levelname)s: %(message)s',
-    handlers=[
-        logging.FileHandler('/Users/hitendrasingh/Desktop/DDAS/server.log'),
-        logging.StreamHandler()
-    ]
-)
+# Request threads only enqueue records; a QueueListener thread does the disk
+# writes, so bursts of log lines never put file I/O on the request path.
+LOG_PATH = setting('DDAS_LOG_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'server.log'))
+LOG_LEVEL = tunable('DDAS_LOG_LEVEL', str.upper, 'INFO')
+LOG_FORMAT = setting('DDAS_LOG_FORMAT', 'json').lower()  # "json" lines or "text"
+LOG_MAX_BYTES = int(setting('DDAS_LOG_MAX_BYTES', 10 * 1024 * 1024))
+LOG_BACKUP_COUNT = int(setting('DDAS_LOG_BACKUP_COUNT', 5))
+TEXT_LOG_FORMAT = '%(asctime)s [SERVER] %(levelname)s: %(message)s'
+
+# Every request gets a trace ID (the caller's X-Request-ID when it is sane),
+# echoed back in the response and attached to each log line it produces, so
+# a request's log lines and its file_processed stage timings can be joined.
+trace_id_var = contextvars.ContextVar('trace_id', default=None)
+TRACE_ID_PATTERN = re.compile(r'[A-Za-z0-9._-]{1,64}')
+active_requests = {}  # thread ident -> trace ID of the request it is handling
+
+class TraceIdFilter(logging.Filter):
+    """Stamp records logged while handling a request with its trace_id"""
+
+    def filter(self, record):
+        trace_id = trace_id_var.get()
+        if trace_id is not None:
+            record.trace_id = trace_id
+        return True
+
+class JsonLinesFormatter(logging.Formatter):
+    """Format each record as one JSON object; fields passed via extra= are kept"""
+
+    RESERVED_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message'}
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in self.RESERVED_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+def setup_logging():
+    """Install the queue-based logging pipeline on the root logger"""
+    log_dir = os.path.dirname(LOG_PATH)
+    if log_dir:
+        os.makedirs(log_dir, exist_ok=True)
+
+    file_handler = RotatingFileHandler(LOG_PATH, maxBytes=LOG_MAX_BYTES,
+                                       backupCount=LOG_BACKUP_COUNT, encoding='utf-8', delay=True)
+    file_handler.setFormatter(JsonLinesFormatter() if LOG_FORMAT == 'json'
+                              else logging.Formatter(TEXT_LOG_FORMAT))
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter(TEXT_LOG_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.addFilter(TraceIdFilter())  # Filters run in the thread that logs, before queueing
+    root.handlers = [queue_handler]
+    root.setLevel(LOG_LEVEL)
+
+    listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)  # Flush anything still queued on shutdown
+    return listener
+
+log_listener = setup_logging()
+
+# Tracing. W3C trace context: an incoming traceparent header makes the
+# request's span a child of the caller's (the extension), and backend calls
+# carry a traceparent naming the local span they belong to. Each measured
+# stage (queue_wait, hash, check_hash, upload, ...) is a span. With
+# DDAS_TRACE_EXPORT set, finished spans are written by a background thread:
+# to a JSON-lines file, or as OTLP/HTTP JSON to an http(s):// collector URL.
+TRACE_EXPORT = setting('DDAS_TRACE_EXPORT', '')
+TRACE_SERVICE_NAME = setting('DDAS_TRACE_SERVICE_NAME', 'ddas-local-server')
+TRACEPARENT_PATTERN = re.compile(r'00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}')
+span_var = contextvars.ContextVar('span', default=None)
+CLIENT_SPANS = frozenset({'check_hash_attempt', 'upload'})  # Spans that are backend calls
+SPAN_SERVER, SPAN_INTERNAL, SPAN_CLIENT = 2, 1, 3  # OTLP span kinds
+
+def otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}  # OTLP JSON carries int64 as a string
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+class Span:
+    __slots__ = ('trace_id', 'span_id', 'parent_id', 'name', 'kind', 'start_ns', 'end_ns', 'attributes', 'error')
+
+    def __init__(self, trace_id, name, parent_id=None, attributes=None, kind=None):
+        self.trace_id = trace_id
+        self.kind = kind or (SPAN_CLIENT if name in CLIENT_SPANS else SPAN_INTERNAL)
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = attributes or {}
+        self.error = None
+
+    def traceparent(self):
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def finish(self, error=None):
+        self.end_ns = time.time_ns()
+        self.error = error
+        if span_exporter is not None:
+            span_exporter.export(self)
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "name": self.name,
+            "start_unix_nano": self.start_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "kind": {SPAN_SERVER: "server", SPAN_INTERNAL: "internal", SPAN_CLIENT: "client"}[self.kind],
+            "service": TRACE_SERVICE_NAME,
+            "attributes": self.attributes,
+            "error": self.error
+        }
+
+    def to_otlp(self):
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": key, "value": otlp_value(value)} for key, value in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1}
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+class SpanExporter:
+    """
+    Batches finished spans off the request path. A file target gets one
+    JSON object per span per line; an http(s) URL gets OTLP/HTTP JSON
+    (e.g. http://localhost:4318/v1/traces). Spans are dropped, not queued
+    without bound, if the exporter falls max_queue behind.
+    """
+
+    def __init__(self, target, batch_size=512, interval=1.0, max_queue=10000):
+        self.target = target
+        self.batch_size = batch_size
+        self.interval = interval
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name='span-exporter', daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def export(self, span):
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _drain(self, first=None):
+        batch = [first] if first is not None else []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=self.interval)
+            except queue.Empty:
+                continue
+            self._write(self._drain(first))
+
+    def flush(self):
+        batch = self._drain()
+        while batch:
+            self._write(batch)
+            batch = self._drain()
+
+    def _write(self, batch):
+        try:
+            if self.target.startswith(('http://', 'https://')):
+                body = {"resourceSpans": [{
+                    "resource": {"attributes": [{"key": "service.name",
+                                                 "value": {"stringValue": TRACE_SERVICE_NAME}}]},
+                    "scopeSpans": [{"scope": {"name": "ddas"}, "spans": [span.to_otlp() for span in batch]}]
+                }]}
+                # urllib rather than the lazily imported requests, whose first use
+                # must not race request threads; imported here to keep it off startup
+                import urllib.request
+                post = urllib.request.Request(self.target, data=json.dumps(body).encode('utf-8'), method='POST',
+                                              headers={'Content-Type': 'application/json'})
+                urllib.request.urlopen(post, timeout=5).close()
+            else:
+                with open(self.target, 'a', encoding='utf-8') as f:
+                    f.write(''.join(json.dumps(span.to_dict()) + '\n' for span in batch))
+        except Exception as e:  # Tracing must never take the server down
+            logging.getLogger(__name__).warning("Span export failed: %s", e)
+
+span_exporter = SpanExporter(TRACE_EXPORT) if TRACE_EXPORT else None
+
+def parse_traceparent(header):
+    """(trace_id, parent span_id) from a W3C traceparent header, or (None, None)"""
+    match = TRACEPARENT_PATTERN.fullmatch((header or '').strip().lower())
+    if not match or match.group(1) == '0' * 32 or match.group(2) == '0' * 16:
+        return None, None
+    return match.group(1), match.group(2)
+
+def w3c_trace_id(trace_id):
+    """trace_id as 32 hex digits; other request IDs map to a stable hash of themselves"""
+    if re.fullmatch(r'[0-9a-f]{32}', trace_id):
+        return trace_id
+    return hashlib.sha256(trace_id.encode('utf-8')).hexdigest()[:32]
+
+@contextmanager
+def span(name, **attributes):
+    """
+    Time a block as a child of the current span. Without an exporter this
+    costs nothing and yields the enclosing span, which is then what
+    downstream calls name as their parent.
+    """
+    parent = span_var.get()
+    if parent is None or span_exporter is None:
+        yield parent
+        return
+    child = Span(parent.trace_id, name, parent.span_id, attributes)
+    token = span_var.set(child)
+    error = None
+    try:
+        yield child
+    except BaseException as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        span_var.reset(token)
+        child.finish(error)
+
+def trace_headers(headers):
+    """headers plus a traceparent naming the current span"""
+    current = span_var.get()
+    return dict(headers, traceparent=current.traceparent()) if current is not None else headers
+
+def set_span_attributes(**attributes):
+    current = span_var.get()
+    if current is not None:
+        current.attributes.update(attributes)
 
 # Configuration
-BACKEND_API_URL = "http://localhost:8080/api/files"
+BACKEND_API_URL = tunable('DDAS_BACKEND_API_URL', lambda url: url.rstrip('/'), "http://localhost:8080/api/files")
+
+# Transports. Backend calls share one persistent client so connection setup
+# is paid once; DDAS_BACKEND_HTTP2=1 switches to an httpx HTTP/2 client that
+# multiplexes concurrent checks over a single connection. DDAS_UNIX_SOCKET
+# additionally serves the API on a Unix domain socket for local tooling.
+BACKEND_HTTP2 = setting('DDAS_BACKEND_HTTP2', '0') == '1'
+BACKEND_POOL_SIZE = tunable('DDAS_BACKEND_POOL_SIZE', int, 32)
+UNIX_SOCKET_PATH = setting('DDAS_UNIX_SOCKET', '')
+PORT = int(setting('DDAS_PORT', 5001))
+
+# Backend resilience. After BREAKER_FAILURES consecutive failed calls the
+# circuit opens and backend calls fail immediately for BREAKER_RESET_SECONDS,
+# then one trial call decides whether it closes again. Upload timeouts scale
+# with file size and the observed upload throughput; a check-hash still
+# unanswered at the recent p95 latency gets a second, hedged request.
+BREAKER_FAILURES = tunable('DDAS_BREAKER_FAILURES', int, 5)
+BREAKER_RESET_SECONDS = tunable('DDAS_BREAKER_RESET_SECONDS', float, 30)
+CHECK_HASH_TIMEOUT = tunable('DDAS_CHECK_HASH_TIMEOUT', float, 10)  # seconds
+HEDGE_CHECK_HASH = tunable('DDAS_HEDGE_CHECK_HASH', flag, '1')
+HEDGE_MIN_DELAY_MS = tunable('DDAS_HEDGE_MIN_DELAY_MS', float, 50)
+UPLOAD_TIMEOUT_MIN = tunable('DDAS_UPLOAD_TIMEOUT_MIN', float, 10)  # seconds
+UPLOAD_TIMEOUT_MAX = tunable('DDAS_UPLOAD_TIMEOUT_MAX', float, 600)  # seconds
+UPLOAD_MIN_RATE = tunable('DDAS_UPLOAD_MIN_RATE', int, 256 * 1024)  # bytes/s never timed out
+
+# Batch processing and response encodings. JSON stays the default; clients
+# can ask for MessagePack or the compact binary layout via the Accept header.
+BATCH_WORKERS = tunable('DDAS_BATCH_WORKERS', int, 4)
+WIRE_JSON = 'application/json'
+WIRE_MSGPACK = 'application/msgpack'
+WIRE_MSGPACK_LEGACY = 'application/x-msgpack'
+WIRE_BINARY = 'application/vnd.ddas.results+binary'
+
+# Readiness reporting for /health
+HEALTH_SATURATION_QUEUE_DEPTH = tunable('DDAS_HEALTH_SATURATION_QUEUE_DEPTH', int, 8)
+BACKEND_PROBE_INTERVAL = tunable('DDAS_BACKEND_PROBE_INTERVAL', float, 15)  # seconds
+LATENCY_WINDOW = 1024  # Recent samples kept per stage for percentiles
+
+# Opt-in profiling: /admin/profile samples the stacks of threads handling
+# requests for a bounded time. Admin endpoints answer only callers sending
+# DDAS_ADMIN_TOKEN as X-DDAS-Admin-Token, and nobody while it is unset: a
+# local-address check would let any web page open in the user's browser in.
+PROFILING_ENABLED = setting('DDAS_PROFILING', '0') == '1'
+ADMIN_TOKEN = setting('DDAS_ADMIN_TOKEN', '')
+PROFILE_MAX_SECONDS = 60
+
+# Hashing configuration
+# "sha256" keeps the original single-hash behaviour. "blake2b" or "blake3" add a
+# fast local key used for duplicate lookups; the SHA-256 the backend expects is
+# stored next to it so existing backend records keep matching.
+HASH_ALGORITHM = setting('DDAS_HASH_ALGORITHM', 'sha256').lower()
+HASH_CHUNK_SIZE = tunable('DDAS_HASH_CHUNK_SIZE', int, 1024 * 1024)  # 1 MB reads keep per-call overhead low
+SUPPORTED_HASH_ALGORITHMS = ('sha256', 'blake2b', 'blake3')
+
+if HASH_ALGORITHM not in SUPPORTED_HASH_ALGORITHMS:
+    logging.warning("Unknown hash algorithm '%s', falling back to sha256", HASH_ALGORITHM)
+    HASH_ALGORITHM = 'sha256'
+elif HASH_ALGORITHM == 'blake3' and blake3 is None:
+    logging.warning("blake3 package not installed, falling back to blake2b")
+    HASH_ALGORITHM = 'blake2b'
+
+# I/O hints for the hashing path. fadvise asks for aggressive readahead and
+# drops pages once hashed so big files do not evict the browser's page cache;
+# direct I/O bypasses the cache entirely (O_DIRECT on Linux, F_NOCACHE on macOS).
+HASH_FADVISE = setting('DDAS_HASH_FADVISE', '1') != '0'
+HASH_DIRECT_IO = setting('DDAS_HASH_DIRECT_IO', '0') == '1'
+DIRECT_IO_ALIGNMENT = 4096
+
+# Hashing scheduler: caps concurrent disk-bound hashing jobs, orders waiting
+# jobs shortest-first with aging, and optionally paces reads to a byte budget.
+HASH_MAX_ACTIVE_JOBS = tunable('DDAS_HASH_MAX_ACTIVE_JOBS', int, 2)
+HASH_BANDWIDTH_LIMIT = tunable('DDAS_HASH_BANDWIDTH_LIMIT', int, 0)  # bytes/s, 0 = unlimited
+HASH_AGING_RATE = tunable('DDAS_HASH_AGING_RATE', int, 100 * 1024 * 1024)  # bytes per second waited
+HASH_BULK_PENALTY = tunable('DDAS_HASH_BULK_PENALTY', float, 30.0)  # seconds
+
+# Memory budget for hashing reads. Every read lands in one of a fixed set of
+# preallocated page-aligned buffers, so memory stays flat however many
+# requests hash at once - extra readers wait for a free buffer instead.
+HASH_MEMORY_BUDGET = tunable('DDAS_HASH_MEMORY_BUDGET', int, 32 * 1024 * 1024)
+
+# Tree-hash (Merkle) mode: files of at least DDAS_TREE_HASH_MIN_SIZE bytes are
+# keyed locally by a root digest over fixed-size segments hashed in parallel.
+# 0 disables the mode.
+TREE_HASH_MIN_SIZE = tunable('DDAS_TREE_HASH_MIN_SIZE', int, 0)
+TREE_HASH_SEGMENT_SIZE = tunable('DDAS_TREE_HASH_SEGMENT_SIZE', int, 64 * 1024 * 1024)
+TREE_HASH_WORKERS = tunable('DDAS_TREE_HASH_WORKERS', int, os.cpu_count() or 1)
+
+# Archive mode: zip/tar/gz downloads are also read member by member (without
+# extracting to disk) and each member's SHA-256 is checked, so a result lists
+# which of its files are already known. At most DDAS_ARCHIVE_MAX_MEMBERS
+# members are hashed per archive, and at most DDAS_ARCHIVE_MAX_BACKEND_CHECKS
+# of those the local index does not know are asked about, largest first, so
+# one archive cannot fan out into thousands of backend calls.
+ARCHIVE_MODE = setting('DDAS_ARCHIVE_MODE', '0') == '1'
+ARCHIVE_MAX_MEMBERS = tunable('DDAS_ARCHIVE_MAX_MEMBERS', int, 10000)
+ARCHIVE_MAX_BACKEND_CHECKS = tunable('DDAS_ARCHIVE_MAX_BACKEND_CHECKS', int, 200)
+
+# Normalized-content hashing: files with a registered normalizer for their
+# MIME type (text, CSV, PDF) also get a key over their canonical content,
+# computed in the same read as the SHA-256, so re-downloads that differ only
+# in line endings, trailing whitespace or metadata match locally.
+NORMALIZED_HASH = setting('DDAS_NORMALIZED_HASH', '0') == '1'
+NORMALIZED_HASH_MAX_SIZE = tunable('DDAS_NORMALIZED_HASH_MAX_SIZE', int, 256 * 1024 * 1024)
+
+# Perceptual hashing: images also get a pHash (DCT) and dHash fingerprint,
+# matched against the user's earlier images by Hamming distance, so copies
+# re-encoded or resized by a CDN are flagged. Needs numpy and Pillow.
+PERCEPTUAL_HASH = setting('DDAS_PERCEPTUAL_HASH', '0') == '1'
+PERCEPTUAL_MAX_DISTANCE = tunable('DDAS_PERCEPTUAL_MAX_DISTANCE', int, 8)  # bits of 64, per hash
+
+if PERCEPTUAL_HASH and (numpy is None or PIL_Image is None):
+    logging.warning("numpy and Pillow are required for perceptual hashing, disabling it")
+    PERCEPTUAL_HASH = False
+
+# Local JWT verification. With the backend's shared secret (app.jwt.secret,
+# HS256) or a JWKS URL (RS256) configured, tokens are checked before any disk
+# I/O and verified claims are cached until expiry. Unset, tokens stay opaque
+# and only the backend judges them.
+JWT_SECRET = setting('DDAS_JWT_SECRET', '')
+JWT_JWKS_URL = setting('DDAS_JWT_JWKS_URL', '')
+JWT_CACHE_SIZE = tunable('DDAS_JWT_CACHE_SIZE', int, 4096)
+JWT_LEEWAY = tunable('DDAS_JWT_LEEWAY', int, 30)  # seconds of clock skew tolerated
+JWKS_CACHE_TTL = tunable('DDAS_JWKS_CACHE_TTL', int, 3600)
+
+# Per-user local state. Each user's known-hash index lives in its own shard
+# with its own lock and entry quota, so one user's bulk scan can only evict
+# that user's entries. Shards follow the JWT subject once it is verified -
+# locally, or by the backend accepting the token; until then a token is its
+# own shard.
+SHARD_MAX_ENTRIES = tunable('DDAS_SHARD_MAX_ENTRIES', int, 50000)
+MAX_SHARDS = tunable('DDAS_MAX_SHARDS', int, 256)
+
+# Warm-state snapshot of the known-hash index. It is memory-mapped at boot, so
+# startup cost does not grow with its size, and written back periodically and
+# on shutdown. An empty path disables it.
+SNAPSHOT_PATH = setting('DDAS_SNAPSHOT_PATH',
+                               os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ddas_state.snapshot'))
+SNAPSHOT_INTERVAL = int(setting('DDAS_SNAPSHOT_INTERVAL', 300))  # seconds, 0 = shutdown only
+
+# Metadata store: every processed file is recorded in an embedded SQLite
+# database that answers /history and exact-digest duplicate lookups without
+# a backend call. Rows are written in batches off the request path. An empty
+# path disables it.
+METADATA_DB_PATH = setting('DDAS_METADATA_DB',
+                           os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ddas_metadata.db'))
+METADATA_BATCH_SIZE = 256  # Rows per insert transaction, at most
+METADATA_FLUSH_INTERVAL = 0.5  # Seconds a row may wait for its batch
+HISTORY_MAX_LIMIT = 500
+
+@contextmanager
+def request_trace(trace_id, parent_span=None):
+    """Attribute this thread's log lines, profile samples and spans to a request"""
+    token = trace_id_var.set(trace_id)
+    span_token = span_var.set(parent_span)
+    active_requests[threading.get_ident()] = trace_id
+    try:
+        yield
+    finally:
+        active_requests.pop(threading.get_ident(), None)
+        span_var.reset(span_token)
+        trace_id_var.reset(token)
+
+@app.before_request
+def start_trace():
+    trace_id, parent_id = parse_traceparent(request.headers.get('traceparent'))
+    if trace_id is None:
+        incoming = request.headers.get('X-Request-ID', '')
+        trace_id = incoming if TRACE_ID_PATTERN.fullmatch(incoming) else uuid.uuid4().hex
+    g.trace_id = trace_id
+    g.span = Span(w3c_trace_id(trace_id), f"{request.method} {request.path}", parent_id,
+                  {"http.method": request.method, "http.route": request.path}, kind=SPAN_SERVER)
+    trace_id_var.set(trace_id)
+    span_var.set(g.span)
+    active_requests[threading.get_ident()] = trace_id
+
+@app.after_request
+def add_trace_header(response):
+    if 'trace_id' in g:
+        response.headers['X-Request-ID'] = g.trace_id
+        g.span.attributes["http.status_code"] = response.status_code
+    return response
+
+@app.teardown_request
+def end_trace(exc):
+    active_requests.pop(threading.get_ident(), None)
+    trace_id_var.set(None)
+    span_var.set(None)
+    if 'span' in g and request.path != '/health':  # Health polling would drown the traces
+        g.span.finish(f"{type(exc).__name__}: {exc}" if exc else None)
 
 @app.route('/health', methods=['GET'])
 def health_check():
-    """Health check endpoint"""
+    """
+    Health and readiness endpoint
+    Reports queue depth, recent stage latencies, cached backend reachability
+    and cache hit ratios; "saturated" tells clients to hold back new work.
+    """
+    queue_stats = hash_scheduler.stats()
+    saturated = queue_stats['queued'] >= HEALTH_SATURATION_QUEUE_DEPTH
+    with backend_stats_lock:
+        backend_counts = dict(backend_stats)
+    with cache_stats_lock:
+        cache_counts = dict(cache_stats)
     return jsonify({
-        "status": "running",
+        "status": "saturated" if saturated else "running",
+        "saturated": saturated,
         "service": "DDAS Local Server",
-        "timestamp": datetime.now().isoformat()
+        "timestamp": datetime.now().isoformat(),
+        "startup": {
+            "time_to_ready_ms": round((READY_AT - STARTED_AT) * 1000, 1) if READY_AT else None,
+            "snapshot_entries": state_snapshot.count if state_snapshot else 0
+        },
+        "queue": queue_stats,
+        "buffers": buffer_pool.stats(),
+        "latency_ms": stage_latency.summary(),
+        "backend": dict(backend_probe.status(), breaker=backend_breaker.stats(), upload=upload_timeouts.stats(),
+                        **backend_counts),
+        "caches": {
+            "known_hash_hit_ratio": hit_ratio(cache_counts.get('index_hits', 0),
+                                              cache_counts.get('index_misses', 0)),
+            "snapshot_hits": cache_counts.get('snapshot_hits', 0),
+            "token_hit_ratio": hit_ratio(token_verifier.hits, token_verifier.misses)
+        },
+        "metadata_store": metadata_store.stats() if metadata_store else None
     })
 
+class StackSampler:
+    """
+    Low-overhead sampling profiler: every interval it reads the current
+    frame of each thread handling a request (all threads with all_threads)
+    and counts the collapsed stack, root first. Output is the "collapsed"
+    format flamegraph.pl and speedscope read: "frame;frame;... count".
+    """
+
+    def __init__(self, interval=0.005, all_threads=False):
+        self.interval = interval
+        self.all_threads = all_threads
+        self.stacks = Counter()
+        self.traces = Counter()
+        self.samples = 0
+        self._labels = {}  # code object -> frame label
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        return label
+
+    def _collapse(self, frame):
+        labels = []
+        while frame is not None:
+            labels.append(self._label(frame.f_code))
+            frame = frame.f_back
+        return ';'.join(reversed(labels))
+
+    def capture(self, seconds):
+        own = threading.get_ident()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()} if self.all_threads else None
+            for ident, frame in sys._current_frames().items():
+                trace_id = active_requests.get(ident)
+                if ident == own or (trace_id is None and not self.all_threads):
+                    continue
+                stack = self._collapse(frame)
+                if names is not None:
+                    stack = f"{names.get(ident, ident)};{stack}"
+                self.stacks[stack] += 1
+                if trace_id is not None:
+                    self.traces[trace_id] += 1
+            self.samples += 1
+            time.sleep(self.interval)
+        return self
+
+    def collapsed(self):
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+profile_lock = threading.Lock()
+
+def admin_denied():
+    """Error response for a request without the admin token, or None"""
+    if not ADMIN_TOKEN:
+        return jsonify({"success": False, "error": "Admin endpoints are disabled (set DDAS_ADMIN_TOKEN)"}), 403
+    if not hmac.compare_digest(request.headers.get('X-DDAS-Admin-Token', '').encode('utf-8'),
+                               ADMIN_TOKEN.encode('utf-8')):
+        return jsonify({"success": False, "error": "Admin access denied"}), 403
+    return None
+
+@app.route('/admin/profile', methods=['GET'])
+def capture_profile():
+    """
+    Sample live request handling for ?seconds= (default 10, at most
+    PROFILE_MAX_SECONDS) every ?interval_ms= (default 5) and return collapsed
+    stacks as text, or with ?format=json also per-trace sample counts.
+    ?all_threads=1 includes idle and background threads.
+    """
+    if not PROFILING_ENABLED:
+        return jsonify({"success": False, "error": "Profiling is disabled (set DDAS_PROFILING=1)"}), 404
+    denied = admin_denied()
+    if denied:
+        return denied
+    try:
+        seconds = min(max(float(request.args.get('seconds', 10)), 0.1), PROFILE_MAX_SECONDS)
+        interval = max(float(request.args.get('interval_ms', 5)), 1) / 1000
+    except ValueError:
+        return jsonify({"success": False, "error": "seconds and interval_ms must be numbers"}), 400
+    if not profile_lock.acquire(blocking=False):
+        return jsonify({"success": False, "error": "A profile is already being captured"}), 409
+    try:
+        app.logger.info("Capturing a %ss profile", seconds)
+        sampler = StackSampler(interval, request.args.get('all_threads') == '1').capture(seconds)
+    finally:
+        profile_lock.release()
+
+    if request.args.get('format') == 'json':
+        return jsonify({
+            "success": True,
+            "seconds": seconds,
+            "interval_ms": interval * 1000,
+            "samples": sampler.samples,
+            "stacks": dict(sampler.stacks.most_common()),
+            "traces": dict(sampler.traces.most_common())
+        })
+    return app.response_class(sampler.collapsed(), mimetype='text/plain')
+
 @app.route('/delete-duplicate', methods=['POST'])
 def delete_duplicate_file():
     """
@@ -50,7 +738,7 @@ def delete_duplicate_file():
         file_path = data.get('path')
         auth_token = data.get('auth_token')
 
-        app.logger.info(f"Delete duplicate file request: {file_path}")
+        app.logger.info("Delete duplicate file request: %s", file_path)
 
         # Validate inputs
         if not file_path:
@@ -59,9 +747,15 @@ def delete_duplicate_file():
         if not auth_token:
             return jsonify({"success": False, "error": "Authentication token is required"}), 400
 
+        # Reject bad tokens locally before touching the disk
+        claims, token_error = token_verifier.verify(auth_token)
+        if token_error:
+            app.logger.warning("Rejected auth token: %s", token_error)
+            return jsonify({"success": False, "error": f"Invalid authentication token: {token_error}"}), 401
+
         # Check if file exists
         if not os.path.exists(file_path):
-            app.logger.warning(f"File already deleted or not found: {file_path}")
+            app.logger.warning("File already deleted or not found: %s", file_path)
             return jsonify({"success": True, "message": "File already deleted or not found"})
 
         # Safety check - only delete files from Downloads folder
@@ -70,24 +764,24 @@ def delete_duplicate_file():
         abs_downloads_path = os.path.abspath(downloads_folder)
 
         if not abs_file_path.startswith(abs_downloads_path):
-            app.logger.error(f"Security violation: Attempt to delete file outside Downloads folder: {file_path}")
+            app.logger.error("Security violation: Attempt to delete file outside Downloads folder: %s", file_path)
             return jsonify({"success": False, "error": "Can only delete files from Downloads folder"}), 403
 
         # Delete the file
         try:
             os.remove(file_path)
-            app.logger.info(f"Successfully deleted duplicate file: {file_path}")
+            app.logger.info("Successfully deleted duplicate file: %s", file_path)
 
             return jsonify({
                 "success": True,
                 "message": f"Duplicate file '{os.path.basename(file_path)}' deleted successfully"
             })
         except OSError as e:
-            app.logger.error(f"Failed to delete file {file_path}: {e}")
+            app.logger.error("Failed to delete file %s: %s", file_path, e)
             return jsonify({"success": False, "error": f"Failed to delete file: {str(e)}"}), 500
 
     except Exception as e:
-        app.logger.error(f"Error in delete duplicate request: {str(e)}")
+        app.logger.error("Error in delete duplicate request: %s", e)
         return jsonify({"success": False, "error": str(e)}), 500
 
 @app.route('/process', methods=['POST'])
@@ -95,6 +789,10 @@ def process_file():
     """
     Main endpoint to process downloaded files
     Expects JSON: {"path": "/path/to/file", "auth_token": "jwt_token"}
+    Optional "priority": "interactive" (default) or "bulk"
+    Batch form: {"paths": [...], "auth_token": ...} answers {"success": true, "results": [...]}
+    and defaults to bulk priority. The Accept header selects JSON (default),
+    MessagePack or the compact binary encoding of the results.
     """
     try:
         data = request.get_json()
@@ -102,92 +800,484 @@ def process_file():
             return jsonify({"success": False, "error": "No JSON data provided"}), 400
 
         file_path = data.get('path')
+        file_paths = data.get('paths')
         auth_token = data.get('auth_token')
 
-        app.logger.info(f"Processing file request: {file_path}")
+        app.logger.info("Processing file request: %s", file_path if file_paths is None else f"{len(file_paths)} paths")
 
         # Validate inputs
-        if not file_path:
+        if not file_path and not file_paths:
             return jsonify({"success": False, "error": "File path is required"}), 400
 
+        if file_paths is not None and not isinstance(file_paths, list):
+            return jsonify({"success": False, "error": "paths must be a list"}), 400
+
         if not auth_token:
             return jsonify({"success": False, "error": "Authentication token is required"}), 400
 
+        # Reject bad tokens locally before touching the disk
+        claims, token_error = token_verifier.verify(auth_token)
+        if token_error:
+            app.logger.warning("Rejected auth token: %s", token_error)
+            return jsonify({"success": False, "error": f"Invalid authentication token: {token_error}"}), 401
+        user_id = user_id_from_token(auth_token, claims)
+
+        if file_paths is not None:
+            with stage_latency.measure('batch'):
+                results = process_batch(file_paths, auth_token, bulk=data.get('priority', 'bulk') == 'bulk',
+                                        user_id=user_id)
+            app.logger.info("Processed batch of %s files", len(results))
+            return results_response(results, batch=True)
+
         # Check if file exists
         if not os.path.exists(file_path):
-            app.logger.error(f"File not found: {file_path}")
+            app.logger.error("File not found: %s", file_path)
             return jsonify({"success": False, "error": f"File not found: {file_path}"}), 404
 
         # Process the file
-        result = process_downloaded_file(file_path, auth_token)
+        with stage_latency.measure('total'):
+            result = process_downloaded_file(file_path, auth_token, bulk=data.get('priority') == 'bulk',
+                                             user_id=user_id)
 
-        app.logger.info(f"Processing result: {result}")
-        return jsonify(result)
+        app.logger.info("Processing result: %s", result)
+        return results_response([result], batch=False)
 
     except Exception as e:
-        app.logger.error(f"Error processing request: {str(e)}")
+        app.logger.error("Error processing request: %s", e)
         return jsonify({"success": False, "error": str(e)}), 500
 
-def process_downloaded_file(file_path, auth_token):
+def parse_since(value):
+    """?since= as Unix seconds or ISO 8601 (local time unless it has an offset)"""
+    if not value:
+        return 0.0
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+@app.route('/history', methods=['GET'])
+def file_history():
+    """
+    Files processed for the caller, newest first, from the metadata store.
+    The token comes as "Authorization: Bearer <jwt>". Optional query: since
+    (Unix seconds or ISO 8601), limit (default 50), verdict, path, min_size.
+    """
+    if metadata_store is None:
+        return jsonify({"success": False, "error": "File history is disabled (DDAS_METADATA_DB is empty)"}), 404
+
+    authorization = request.headers.get('Authorization', '')
+    auth_token = authorization[len('Bearer '):].strip() if authorization.startswith('Bearer ') else ''
+    if not auth_token:
+        return jsonify({"success": False, "error": "Authentication token is required"}), 400
+    claims, token_error = token_verifier.verify(auth_token)
+    if token_error:
+        app.logger.warning("Rejected auth token: %s", token_error)
+        return jsonify({"success": False, "error": f"Invalid authentication token: {token_error}"}), 401
+
+    try:
+        since = parse_since(request.args.get('since'))
+        limit = min(max(int(request.args.get('limit', 50)), 1), HISTORY_MAX_LIMIT)
+        min_size = int(request.args['min_size']) if 'min_size' in request.args else None
+    except ValueError:
+        return jsonify({"success": False,
+                        "error": "since must be Unix seconds or ISO 8601; limit and min_size must be integers"}), 400
+
+    with stage_latency.measure('history'):
+        files = metadata_store.history(user_id_from_token(auth_token, claims), since, limit,
+                                       request.args.get('verdict'), request.args.get('path'), min_size)
+    return jsonify({"success": True, "count": len(files), "files": files})
+
+def process_batch(file_paths, auth_token, bulk=True, user_id=None):
+    """Process many files, BATCH_WORKERS at a time, keeping the input order"""
+    def process_one(file_path):
+        if not isinstance(file_path, str) or not os.path.exists(file_path):
+            return {"success": False, "filename": os.path.basename(str(file_path)),
+                    "error": f"File not found: {file_path}"}
+        return process_downloaded_file(file_path, auth_token, bulk=bulk, user_id=user_id)
+
+    trace_id, parent_span = trace_id_var.get(), span_var.get()
+
+    def process_traced(file_path):
+        with request_trace(trace_id, parent_span):  # Workers log, profile and trace under the request
+            return process_one(file_path)
+
+    with ThreadPoolExecutor(max_workers=BATCH_WORKERS) as pool:
+        return list(pool.map(process_traced, file_paths))
+
+def negotiate_wire_format():
+    """Pick the response encoding from the Accept header; JSON unless asked otherwise"""
+    offered = [WIRE_JSON, WIRE_BINARY]
+    if msgpack is not None:
+        offered += [WIRE_MSGPACK, WIRE_MSGPACK_LEGACY]
+    return request.accept_mimetypes.best_match(offered, default=WIRE_JSON)
+
+def compact_result(result):
+    """Copy of a result with hex digests replaced by raw bytes"""
+    compact = dict(result)
+    for key in ('file_hash', 'fast_hash'):
+        if compact.get(key):
+            compact[key] = bytes.fromhex(compact[key])
+    return compact
+
+def results_response(results, batch):
+    """Encode /process results in the negotiated wire format"""
+    wire_format = negotiate_wire_format()
+    if wire_format == WIRE_JSON:
+        return jsonify({"success": True, "results": results} if batch else results[0])
+    if wire_format == WIRE_BINARY:
+        body = encode_binary_results(results)
+    else:
+        compact = [compact_result(result) for result in results]
+        body = msgpack.packb({"success": True, "results": compact} if batch else compact[0], use_bin_type=True)
+    return app.response_class(body, mimetype=wire_format)
+
+RESULTS_HEADER = struct.Struct('<4sI')  # magic, result count
+RESULTS_MAGIC = b'DDR2'
+RESULTS_MAGICS = (b'DDR1', RESULTS_MAGIC)  # DDR1 is DDR2 without the match and archive fields
+RESULT_SUCCESS, RESULT_DUPLICATE, RESULT_ORIGINAL, RESULT_FAST_HASH, RESULT_ERROR = 1, 2, 4, 8, 16
+RESULT_MATCH, RESULT_DISTANCE, RESULT_ARCHIVE = 32, 64, 128
+ARCHIVE_HEADER = struct.Struct('<IIB')  # member count, known member count, flags
+ARCHIVE_LIMIT_REACHED, ARCHIVE_BACKEND_CHECKED, ARCHIVE_BACKEND_LIMITED = 1, 2, 4
+ARCHIVE_MEMBER = struct.Struct('<Q32s')  # size, raw SHA-256
+
+def encode_binary_results(results):
+    """
+    Compact binary encoding of /process results.
+
+    Header: magic "DDR2", u32 count. Each result: u8 flags, 32-byte raw
+    SHA-256 (zeros when absent), u16-length-prefixed UTF-8 filename, then
+    - if RESULT_ORIGINAL: u16-prefixed original filename
+    - if RESULT_FAST_HASH: u8-prefixed raw fast digest
+    - if RESULT_ERROR: u16-prefixed error text
+    - if RESULT_MATCH: u8-prefixed match kind ("normalized", "perceptual")
+    - if RESULT_DISTANCE: u16 perceptual distance
+    - if RESULT_ARCHIVE: u8-prefixed archive format, u32 member count,
+      u32 known member count, u8 flags (1 member limit reached, 2 backend
+      checked, 4 backend check limit reached),
+      then per known member: u16-prefixed name, u64 size, 32-byte raw
+      SHA-256, u16-prefixed original filename
+    Human-readable messages are omitted; clients build their own.
+    All integers are little-endian.
+    """
+    def put_text(text, prefix='<H', limit=0xFFFF):
+        encoded = text.encode('utf-8')[:limit]
+        out.extend(struct.pack(prefix, len(encoded)))
+        out.extend(encoded)
+
+    out = bytearray(RESULTS_HEADER.pack(RESULTS_MAGIC, len(results)))
+    for result in results:
+        file_hash = result.get('file_hash')
+        original = result.get('original_filename')
+        fast_hash = result.get('fast_hash')
+        error = result.get('error')
+        match = result.get('match')
+        distance = result.get('distance')
+        archive = result.get('archive')
+        out.append((RESULT_SUCCESS if result.get('success') else 0)
+                   | (RESULT_DUPLICATE if result.get('duplicate') else 0)
+                   | (RESULT_ORIGINAL if original else 0)
+                   | (RESULT_FAST_HASH if fast_hash else 0)
+                   | (RESULT_ERROR if error else 0)
+                   | (RESULT_MATCH if match else 0)
+                   | (RESULT_DISTANCE if distance is not None else 0)
+                   | (RESULT_ARCHIVE if archive else 0))
+        out += bytes.fromhex(file_hash) if file_hash else bytes(32)
+        put_text(result.get('filename', ''))
+        if original:
+            put_text(original)
+        if fast_hash:
+            digest = bytes.fromhex(fast_hash)
+            out.append(len(digest))
+            out += digest
+        if error:
+            put_text(error)
+        if match:
+            put_text(match, '<B', 0xFF)
+        if distance is not None:
+            out += struct.pack('<H', distance)
+        if archive:
+            members = archive['known_members']
+            put_text(archive['format'], '<B', 0xFF)
+            out += ARCHIVE_HEADER.pack(archive['member_count'], len(members),
+                                       (ARCHIVE_LIMIT_REACHED if archive['member_limit_reached'] else 0)
+                                       | (ARCHIVE_BACKEND_CHECKED if archive['backend_checked'] else 0)
+                                       | (ARCHIVE_BACKEND_LIMITED if archive.get('backend_limit_reached') else 0))
+            for member in members:
+                put_text(member['name'])
+                out += ARCHIVE_MEMBER.pack(member['size'], bytes.fromhex(member['file_hash']))
+                put_text(member['original_filename'])
+    return bytes(out)
+
+def decode_binary_results(data):
+    """Decode encode_binary_results() output back into result dicts (hex digests)"""
+    magic, count = RESULTS_HEADER.unpack_from(data, 0)
+    if magic not in RESULTS_MAGICS:
+        raise ValueError("Not a DDAS binary results payload")
+    offset = RESULTS_HEADER.size
+
+    def take_text(prefix='<H'):
+        nonlocal offset
+        (length,) = struct.unpack_from(prefix, data, offset)
+        offset += struct.calcsize(prefix) + length
+        return bytes(data[offset - length:offset]).decode('utf-8', 'replace')
+
+    results = []
+    for _ in range(count):
+        flags = data[offset]
+        file_hash = bytes(data[offset + 1:offset + 33])
+        offset += 33
+        result = {"success": bool(flags & RESULT_SUCCESS), "duplicate": bool(flags & RESULT_DUPLICATE),
+                  "filename": take_text()}
+        if any(file_hash):
+            result["file_hash"] = file_hash.hex()
+        if flags & RESULT_ORIGINAL:
+            result["original_filename"] = take_text()
+        if flags & RESULT_FAST_HASH:
+            length = data[offset]
+            result["fast_hash"] = bytes(data[offset + 1:offset + 1 + length]).hex()
+            offset += 1 + length
+        if flags & RESULT_ERROR:
+            result["error"] = take_text()
+        if flags & RESULT_MATCH:
+            result["match"] = take_text('<B')
+        if flags & RESULT_DISTANCE:
+            (result["distance"],) = struct.unpack_from('<H', data, offset)
+            offset += 2
+        if flags & RESULT_ARCHIVE:
+            kind = take_text('<B')
+            member_count, known_count, archive_flags = ARCHIVE_HEADER.unpack_from(data, offset)
+            offset += ARCHIVE_HEADER.size
+            members = []
+            for _ in range(known_count):
+                name = take_text()
+                size, sha256_hash = ARCHIVE_MEMBER.unpack_from(data, offset)
+                offset += ARCHIVE_MEMBER.size
+                members.append({"name": name, "size": size, "file_hash": sha256_hash.hex(),
+                                "original_filename": take_text()})
+            result["archive"] = {
+                "format": kind,
+                "member_count": member_count,
+                "known_count": known_count,
+                "known_members": members,
+                "member_limit_reached": bool(archive_flags & ARCHIVE_LIMIT_REACHED),
+                "backend_checked": bool(archive_flags & ARCHIVE_BACKEND_CHECKED),
+                "backend_limit_reached": bool(archive_flags & ARCHIVE_BACKEND_LIMITED),
+            }
+        results.append(result)
+    return results
+
+def process_downloaded_file(file_path, auth_token, bulk=False, user_id=None):
     """
     Process a downloaded file - check for duplicates and upload if new
+    Bulk jobs (folder scans, tooling) yield the disk to interactive downloads.
+    Every file ends in one "file_processed" log event (see log_file_event).
+    """
+    user_id = user_id or user_id_from_token(auth_token)
+    start = time.perf_counter()
+    with stage_latency.collect() as stages, span('process_file'):
+        result = check_and_upload(file_path, auth_token, bulk, user_id)
+        if user_id.startswith('token:'):
+            user_id = user_id_from_token(auth_token)  # The backend may have vouched for its subject meanwhile
+        log_file_event(file_path, user_id, result, time.perf_counter() - start, stages)
+    return result
+
+def log_file_event(file_path, user_id, result, seconds, stages):
+    """
+    Emit the structured per-file record generate_analytics_report.py reads.
+    Its fields only reach the log file with DDAS_LOG_FORMAT=json.
     """
+    try:
+        size = os.path.getsize(file_path)
+    except OSError:
+        size = None
+    if not result.get('success'):
+        verdict = 'error'
+    elif result.get('duplicate'):
+        verdict = 'duplicate'
+    else:
+        verdict = 'uploaded'
+    event = {
+        "event": "file_processed",
+        "user": user_id,
+        "file": result.get('filename', os.path.basename(file_path)),  # "filename" is a LogRecord attribute
+        "size": size,
+        "verdict": verdict,
+        "match": result.get('match', 'exact') if verdict == 'duplicate' else None,
+        "original": result.get('original_filename'),
+        "file_hash": result.get('file_hash'),
+        "bytes_saved": size if verdict == 'duplicate' else 0,
+        "total_ms": round(seconds * 1000, 3),
+        "stages_ms": {stage: round(value * 1000, 3) for stage, value in stages.items()},
+    }
+    set_span_attributes(**{"ddas.verdict": verdict, "ddas.size": size or 0})
+    if event["match"]:
+        set_span_attributes(**{"ddas.match": event["match"]})
+    app.logger.info("File processed: %s (%s)", event["file"], verdict, extra=event)
+    if metadata_store is not None:
+        metadata_store.record((user_id, time.time(), os.path.abspath(file_path), event["file"], size,
+                               event["file_hash"], verdict, event["match"], event["original"],
+                               result.get('error'), event["total_ms"]))
+
+def check_and_upload(file_path, auth_token, bulk, user_id):
+    """Hash the file, answer from the local indexes or the backend, upload it if new"""
     try:
         filename = os.path.basename(file_path)
         file_size = os.path.getsize(file_path)
 
-        app.logger.info(f"Processing file: {filename} ({file_size} bytes)")
+        app.logger.info("Processing file: %s (%s bytes)", filename, file_size)
+
+        # Every pass below reads through the page cache, warm after the first;
+        # the file's pages are dropped once, after its last read (see finally)
+
+        # Hashing is disk-bound, so it runs under the scheduler's admission control
+        with hash_scheduler.job(file_size, interactive=not bulk, owner=user_id), stage_latency.measure('hash'):
+            kind = archive_kind(file_path) if ARCHIVE_MODE else None
+            normalizer = normalizer_for(file_path, file_size) if NORMALIZED_HASH and not kind else None
+
+            # Fast local lookup first
+            fast_hash = file_hash = None
+            if uses_local_hash(file_size):
+                if kind or normalizer or 0 < TREE_HASH_MIN_SIZE <= file_size:
+                    # Their SHA-256 comes from a pass of its own, on the now warm cache
+                    fast_hash = calculate_local_hash(file_path, file_size, drop_cache=False)
+                else:
+                    # One read gives both digests, so a miss - every new file - costs no second pass
+                    fast_hash, file_hash = calculate_file_hashes(file_path, (HASH_ALGORITHM, 'sha256'),
+                                                                 drop_cache=False) or (None, None)
+                if not fast_hash:
+                    return {"success": False, "error": "Could not calculate file hash"}
+
+                known = lookup_known_hash(user_id, fast_hash)
+                if known:
+                    app.logger.info("Duplicate file detected in local index")
+                    return {
+                        "success": True,
+                        "duplicate": True,
+                        "filename": filename,
+                        "original_filename": known['filename'],
+                        "file_hash": known['sha256'],
+                        "fast_hash": fast_hash,
+                        "message": f"File '{filename}' already exists as '{known['filename']}'"
+                    }
+
+            # Calculate file hash for duplicate detection, unless the fast pass did
+            members = normalized_key = None
+            if file_hash is None:
+                if kind:
+                    file_hash, members = calculate_archive_hashes(file_path, kind, drop_cache=False)
+                elif normalizer:
+                    file_hash, normalized_key = calculate_content_hashes(file_path, normalizer, drop_cache=False)
+                else:
+                    file_hash = calculate_file_hash(file_path, drop_cache=False)
+            if not file_hash:
+                return {"success": False, "error": "Could not calculate file hash"}
+
+            stored = metadata_store.find_digest(user_id, file_hash) if metadata_store else None
+            if stored:
+                app.logger.info("Duplicate file detected in metadata store")
+                remember_hash(user_id, fast_hash, file_hash, stored, normalized_key)
+                return {
+                    "success": True,
+                    "duplicate": True,
+                    "filename": filename,
+                    "original_filename": stored,
+                    "file_hash": file_hash,
+                    "message": f"File '{filename}' already exists as '{stored}'"
+                }
+
+            if normalized_key:
+                known = lookup_known_hash(user_id, normalized_key)
+                if known:
+                    app.logger.info("Duplicate file detected by normalized content")
+                    return {
+                        "success": True,
+                        "duplicate": True,
+                        "filename": filename,
+                        "original_filename": known['filename'],
+                        "file_hash": file_hash,
+                        "match": "normalized",
+                        "message": f"File '{filename}' already exists as '{known['filename']}'"
+                    }
 
-        # Calculate file hash for duplicate detection
-        file_hash = calculate_file_hash(file_path)
-        if not file_hash:
-            return {"success": False, "error": "Could not calculate file hash"}
+            fingerprint = None
+            if PERCEPTUAL_HASH and is_image(file_path):
+                with stage_latency.measure('perceptual'):
+                    fingerprint = calculate_perceptual_hash(file_path)
+                    similar = get_user_shard(user_id).find_similar_image(*fingerprint) if fingerprint else None
+                if similar:
+                    app.logger.info("Visually similar image detected (distance %s)", similar['distance'])
+                    return {
+                        "success": True,
+                        "duplicate": True,
+                        "filename": filename,
+                        "original_filename": similar['filename'],
+                        "file_hash": file_hash,
+                        "match": "perceptual",
+                        "distance": similar['distance'],
+                        "message": f"File '{filename}' looks the same as '{similar['filename']}'"
+                    }
 
-        app.logger.info(f"File hash: {file_hash[:16]}...")
+        app.logger.info("File hash: %s...", file_hash[:16])
 
         # Check for duplicates using backend API
         headers = {"Authorization": f"Bearer {auth_token}"}
 
+        archive_result = {}
+        if members is not None:
+            with stage_latency.measure('archive_members'):
+                archive_result["archive"] = find_known_members(user_id, kind, members, headers)
+
         try:
-            check_url = f"{BACKEND_API_URL}/check-hash/{file_hash}"
-            app.logger.info(f"Checking duplicates: {check_url}")
+            app.logger.info("Checking duplicates: %s...", file_hash[:16])
 
-            response = requests.get(check_url, headers=headers, timeout=10)
+            with stage_latency.measure('check_hash'):
+                response = check_hash_request(file_hash, headers)
 
             if response.status_code == 200:
+                user_id = trust_backend_subject(auth_token, user_id)
                 data = response.json()
                 if data.get('exists'):
                     app.logger.info("Duplicate file detected!")
+                    remember_hash(user_id, fast_hash, file_hash, data.get('filename', 'unknown'), normalized_key, fingerprint)
                     return {
                         "success": True,
                         "duplicate": True,
                         "filename": filename,
                         "original_filename": data.get('filename', 'unknown'),
                         "file_hash": file_hash,
-                        "message": f"File '{filename}' already exists as '{data.get('filename', 'unknown')}'"
+                        "message": f"File '{filename}' already exists as '{data.get('filename', 'unknown')}'",
+                        **archive_result
                     }
 
             app.logger.info("No duplicate found, uploading file...")
 
-        except requests.exceptions.RequestException as e:
-            app.logger.warning(f"Duplicate check failed: {e}")
+        except backend_errors() as e:
+            app.logger.warning("Duplicate check failed: %s", e)
 
         # Upload file to backend
         try:
             upload_url = f"{BACKEND_API_URL}/upload"
 
+            upload_started = time.perf_counter()
             with open(file_path, 'rb') as f:
-                files = {'file': (filename, f, 'application/octet-stream')}
-                response = requests.post(upload_url, headers=headers, files=files, timeout=120)
+                upload = MultipartUpload('file', filename, f, file_size)
+                with stage_latency.measure('upload'):
+                    response = call_backend(lambda: post_multipart(upload_url, trace_headers(headers), upload,
+                                                                   timeout=upload_timeouts.timeout(file_size)))
+            if response.status_code in (200, 201, 409):
+                upload_timeouts.observe(file_size, time.perf_counter() - upload_started)
+                user_id = trust_backend_subject(auth_token, user_id)
 
             if response.status_code in [200, 201]:
                 app.logger.info("File uploaded successfully")
+                remember_hash(user_id, fast_hash, file_hash, filename, normalized_key, fingerprint)
                 return {
                     "success": True,
                     "duplicate": False,
                     "filename": filename,
                     "file_hash": file_hash,
-                    "message": f"File '{filename}' uploaded successfully"
+                    "message": f"File '{filename}' uploaded successfully",
+                    **archive_result
                 }
             elif response.status_code == 409:
                 # Handle duplicate file conflict
@@ -195,17 +1285,19 @@ def process_downloaded_file(file_path, auth_token):
                 try:
                     error_data = response.json()
                     existing_filename = error_data.get('existingFileName', error_data.get('filename', 'unknown file'))
-                    app.logger.info(f"Existing file name: {existing_filename}")
+                    app.logger.info("Existing file name: %s", existing_filename)
+                    remember_hash(user_id, fast_hash, file_hash, existing_filename, normalized_key, fingerprint)
                     return {
                         "success": True,
                         "duplicate": True,
                         "filename": filename,
                         "original_filename": existing_filename,
                         "file_hash": file_hash,
-                        "message": f"File '{filename}' already exists as '{existing_filename}'"
+                        "message": f"File '{filename}' already exists as '{existing_filename}'",
+                        **archive_result
                     }
                 except (ValueError, KeyError) as e:
-                    app.logger.warning(f"Could not parse 409 response: {e}")
+                    app.logger.warning("Could not parse 409 response: %s", e)
                     # Fallback to generic duplicate message
                     return {
                         "success": True,
@@ -213,32 +1305,1961 @@ def process_downloaded_file(file_path, auth_token):
                         "filename": filename,
                         "original_filename": "existing file",
                         "file_hash": file_hash,
-                        "message": f"File '{filename}' already exists in the system"
+                        "message": f"File '{filename}' already exists in the system",
+                        **archive_result
                     }
             else:
-                app.logger.error(f"Upload failed: HTTP {response.status_code}")
+                app.logger.error("Upload failed: HTTP %s", response.status_code)
                 return {"success": False, "error": f"Upload failed: HTTP {response.status_code}"}
 
-        except requests.exceptions.RequestException as e:
-            app.logger.error(f"Upload request failed: {e}")
+        except backend_errors() as e:
+            app.logger.error("Upload request failed: %s", e)
             return {"success": False, "error": f"Upload request failed: {str(e)}"}
 
     except Exception as e:
-        app.logger.error(f"File processing error: {e}")
+        app.logger.error("File processing error: %s", e)
         return {"success": False, "error": f"Processing error: {str(e)}"}
+    finally:
+        drop_file_cache(file_path)
+
+class HashScheduler:
+    """
+    Admission control for disk-bound hashing jobs.
+
+    Waiting jobs are ordered by a virtual start time - arrival plus
+    size / aging_rate, plus bulk_penalty for bulk jobs - which is
+    shortest-job-first where every second waited counts as aging_rate bytes,
+    so big files cannot starve. Each owner (user) has its own queue and the
+    next slot goes to the owner with the fewest running jobs, so one user's
+    scan cannot hold every slot. At most max_active jobs read at once, reads
+    are paced to bandwidth bytes/s when set, and a running bulk job hands its
+    slot to a waiting interactive job at the next chunk boundary.
+    """
+
+    def __init__(self, max_active, bandwidth=0, aging_rate=HASH_AGING_RATE,
+                 bulk_penalty=HASH_BULK_PENALTY):
+        self.max_active = max(1, max_active)
+        self.bandwidth = bandwidth
+        self.aging_rate = aging_rate
+        self.bulk_penalty = bulk_penalty
+        self._cond = threading.Condition()
+        self._waiting = {}  # owner -> heap of [virtual_start, seq, interactive, owner]
+        self._active = 0
+        self._active_by_owner = {}
+        self._interactive_waiting = 0
+        self._seq = itertools.count()
+        self._pace_lock = threading.Lock()
+        self._next_read_at = 0.0
+        self._local = threading.local()
+
+    @contextmanager
+    def job(self, size, interactive=True, owner=None):
+        """Hold a hashing slot for the duration of the block"""
+        virtual_start = time.monotonic() + size / self.aging_rate
+        if not interactive:
+            virtual_start += self.bulk_penalty
+        job = [virtual_start, next(self._seq), interactive, owner]
+        with stage_latency.measure('queue_wait'):
+            self._acquire(job)
+        self._local.job = job
+        try:
+            yield
+        finally:
+            self._local.job = None
+            self._release(job)
+
+    def _next_job(self):
+        """Head of the least-served owner's queue; ties go to the earliest virtual start"""
+        best_key, best_job = None, None
+        for owner, heap in self._waiting.items():
+            key = (self._active_by_owner.get(owner, 0), heap[0][0], heap[0][1])
+            if best_key is None or key < best_key:
+                best_key, best_job = key, heap[0]
+        return best_job
+
+    def _acquire(self, job):
+        owner = job[3]
+        with self._cond:
+            heapq.heappush(self._waiting.setdefault(owner, []), job)
+            if job[2]:
+                self._interactive_waiting += 1
+            while self._next_job() is not job or self._active >= self.max_active:
+                self._cond.wait()
+            heap = self._waiting[owner]
+            heapq.heappop(heap)
+            if not heap:
+                del self._waiting[owner]
+            if job[2]:
+                self._interactive_waiting -= 1
+            self._active += 1
+            self._active_by_owner[owner] = self._active_by_owner.get(owner, 0) + 1
+            # The new head of the queue may be runnable too
+            self._cond.notify_all()
+
+    def _release(self, job):
+        owner = job[3]
+        with self._cond:
+            self._active -= 1
+            self._active_by_owner[owner] -= 1
+            if not self._active_by_owner[owner]:
+                del self._active_by_owner[owner]
+            self._cond.notify_all()
+
+    def checkpoint(self, nbytes):
+        """Called by read loops after each chunk: pace reads, let bulk jobs yield"""
+        self.throttle(nbytes)
+        job = getattr(self._local, 'job', None)
+        if job is None or job[2] or not self._interactive_waiting:
+            return
+        with self._cond:
+            next_job = self._next_job()
+            if self._active < self.max_active or next_job is None or not next_job[2]:
+                return
+            # Once this slot is free, an owner with fewer running jobs than
+            # ours would still win it back, so yielding would only churn
+            owner = job[3]
+            if (next_job[3] != owner and
+                    self._active_by_owner.get(next_job[3], 0) >= self._active_by_owner[owner]):
+                return
+            app.logger.debug("Bulk hashing job yielding to an interactive job")
+            # Re-queue behind the interactive job with a fresh, penalized virtual
+            # start: the aging it built up would otherwise win the slot straight back
+            job[0] = max(time.monotonic() + self.bulk_penalty, next_job[0])
+            job[1] = next(self._seq)
+        self._release(job)
+        self._acquire(job)
+
+    def configure(self, max_active, bandwidth, aging_rate, bulk_penalty):
+        """Apply new limits; jobs already waiting keep their virtual start"""
+        with self._cond:
+            self.max_active = max(1, max_active)
+            self.bandwidth = bandwidth
+            self.aging_rate = aging_rate
+            self.bulk_penalty = bulk_penalty
+            self._cond.notify_all()  # A higher limit may admit waiting jobs
+
+    def stats(self):
+        with self._cond:
+            return {
+                "queued": sum(len(heap) for heap in self._waiting.values()),
+                "interactive_queued": self._interactive_waiting,
+                "active": self._active,
+                "max_active": self.max_active,
+                "users_active": len(self._active_by_owner)
+            }
+
+    def throttle(self, nbytes):
+        """Sleep as needed to keep aggregate hashing reads under the bandwidth budget"""
+        if not self.bandwidth:
+            return
+        with self._pace_lock:
+            now = time.monotonic()
+            start = max(now, self._next_read_at)
+            self._next_read_at = start + nbytes / self.bandwidth
+        if start > now:
+            time.sleep(start - now)
+
+hash_scheduler = HashScheduler(HASH_MAX_ACTIVE_JOBS, HASH_BANDWIDTH_LIMIT)
+
+class BufferPool:
+    """
+    Fixed set of preallocated read buffers shared by all hashing.
+    Buffers are anonymous mmaps - page aligned, so they also serve O_DIRECT -
+    and are lent per chunk, so a reader paused by the scheduler holds none.
+    """
+
+    def __init__(self, buffer_size, budget):
+        self.buffer_size = buffer_size
+        self.count = max(1, budget // buffer_size)
+        self._free = [mmap.mmap(-1, buffer_size) for _ in range(self.count)]
+        self._lent = 0
+        self._cond = threading.Condition()
+        self.waits = 0
+
+    @contextmanager
+    def buffer(self):
+        with self._cond:
+            if not self._free:
+                self.waits += 1
+                while not self._free:
+                    self._cond.wait()
+            buffer = self._free.pop()
+            self._lent += 1
+        try:
+            yield buffer
+        finally:
+            with self._cond:
+                self._lent -= 1
+                if len(self._free) + self._lent < self.count:
+                    # A buffer of the old size after a resize is replaced, not reused
+                    self._free.append(buffer if len(buffer) == self.buffer_size
+                                      else mmap.mmap(-1, self.buffer_size))
+                self._cond.notify()
+
+    def resize(self, buffer_size, budget):
+        """Switch buffer size and count; lent buffers are swapped or dropped as they come back"""
+        with self._cond:
+            self.buffer_size = buffer_size
+            self.count = max(1, budget // buffer_size)
+            self._free = [mmap.mmap(-1, buffer_size) for _ in range(max(0, self.count - self._lent))]
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {"buffers": self.count, "in_use": self._lent,
+                    "buffer_size": self.buffer_size, "waits": self.waits}
+
+buffer_pool = BufferPool(HASH_CHUNK_SIZE, HASH_MEMORY_BUDGET)
+
+class LatencyTracker:
+    """Rolling window of recent latencies per processing stage"""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def record(self, stage, seconds):
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = deque(maxlen=self.window)
+            samples.append(seconds)
+        stages = getattr(self._local, 'stages', None)
+        if stages is not None:
+            stages[stage] = stages.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def collect(self):
+        """Also gather this thread's stage times into the yielded {stage: seconds} dict"""
+        self._local.stages = stages = {}
+        try:
+            yield stages
+        finally:
+            self._local.stages = None
+
+    @contextmanager
+    def measure(self, stage):
+        """Time a stage; it is also a trace span of the same name"""
+        start = time.perf_counter()
+        try:
+            with span(stage):
+                yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def quantile(self, stage, q, min_samples=20):
+        """Recent q-quantile of a stage in seconds; None until min_samples are in"""
+        with self._lock:
+            samples = sorted(self._samples.get(stage, ()))
+        if len(samples) < min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+    def summary(self):
+        """{stage: {"count", "p50", "p99"}} in milliseconds over the window"""
+        with self._lock:
+            snapshot = {stage: sorted(samples) for stage, samples in self._samples.items()}
+        summary = {}
+        for stage, samples in snapshot.items():
+            if not samples:
+                continue
+            summary[stage] = {
+                "count": len(samples),
+                "p50": round(samples[len(samples) // 2] * 1000, 2),
+                "p99": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000, 2)
+            }
+        return summary
+
+stage_latency = LatencyTracker()
+
+backend_client = None
+backend_client_lock = threading.Lock()
+
+def create_backend_client(http2=None):
+    """
+    Build a persistent backend client: httpx over HTTP/2 when requested and
+    installed, otherwise a pooled keep-alive requests.Session.
+    Both expose the get/post(url, headers=, files=, timeout=) calls used here.
+    """
+    http2 = BACKEND_HTTP2 if http2 is None else http2
+    if http2:
+        httpx = lazy_import('httpx')
+        if httpx is None or importlib.util.find_spec('h2') is None:
+            app.logger.warning("HTTP/2 needs the httpx[http2] package, using HTTP/1.1 keep-alive")
+        else:
+            # Plain http:// backends have no ALPN, so speak HTTP/2 with prior knowledge (h2c)
+            return httpx.Client(http1=not BACKEND_API_URL.startswith('http://'), http2=True,
+                                limits=httpx.Limits(max_connections=BACKEND_POOL_SIZE))
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=BACKEND_POOL_SIZE)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+def get_backend_client():
+    """Return the shared backend client, creating it on first use"""
+    global backend_client
+    if backend_client is None:
+        with backend_client_lock:
+            if backend_client is None:
+                backend_client = create_backend_client()
+    return backend_client
+
+class MultipartUpload:
+    """
+    A single-file multipart/form-data body streamed from the open file.
+    requests' files= reads the whole file into memory first; this is read
+    (or iterated) in small pieces and knows its length up front.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, field, filename, file_obj, file_size, content_type='application/octet-stream'):
+        self.boundary = uuid.uuid4().hex
+        quoted_name = filename.replace('\\', '\\\\').replace('"', '\\"')
+        head = (f'--{self.boundary}\r\n'
+                f'Content-Disposition: form-data; name="{field}"; filename="{quoted_name}"\r\n'
+                f'Content-Type: {content_type}\r\n\r\n').encode('utf-8')
+        tail = f'\r\n--{self.boundary}--\r\n'.encode('ascii')
+        self._parts = [io.BytesIO(head), file_obj, io.BytesIO(tail)]
+        self._length = len(head) + file_size + len(tail)
+
+    @property
+    def content_type(self):
+        return f'multipart/form-data; boundary={self.boundary}'
+
+    def __len__(self):
+        return self._length
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self._length
+        out = b''
+        while self._parts and len(out) < size:
+            data = self._parts[0].read(size - len(out))
+            if data:
+                out += data
+            else:
+                self._parts.pop(0)
+        return out
+
+    def __iter__(self):
+        return iter(lambda: self.read(self.CHUNK_SIZE), b'')
+
+def post_multipart(url, headers, upload, timeout):
+    """POST a streamed MultipartUpload with whichever backend client is active"""
+    client = get_backend_client()
+    headers = dict(headers, **{'Content-Type': upload.content_type, 'Content-Length': str(len(upload))})
+    if isinstance(client, requests.Session):
+        return client.post(url, headers=headers, data=upload, timeout=timeout)
+    return client.post(url, headers=headers, content=upload, timeout=timeout)
+
+class BackendUnavailable(Exception):
+    """Raised instead of calling the backend while the circuit breaker is open"""
+
+def backend_errors():
+    """Transport exceptions the backend client can raise, plus an open circuit"""
+    errors = (requests.exceptions.RequestException, BackendUnavailable)
+    httpx = sys.modules.get('httpx')
+    if httpx is not None:
+        errors += (httpx.HTTPError,)
+    return errors
+
+class BackendProbe:
+    """
+    Cached backend reachability.
+    Real backend calls update it as they happen; /health only starts a
+    background probe when nothing has been heard for `interval` seconds, so
+    polling /health never waits on the backend.
+    """
+
+    def __init__(self, url, interval=BACKEND_PROBE_INTERVAL):
+        self.url = url
+        self.interval = interval
+        self.reachable = None
+        self.latency_ms = None
+        self.checked_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def observe(self, reachable, latency_ms=None):
+        with self._lock:
+            self.reachable = reachable
+            self.checked_at = time.monotonic()
+            if latency_ms is not None:
+                self.latency_ms = latency_ms
+
+    def _probe(self):
+        start = time.perf_counter()
+        try:
+            get_backend_client().get(self.url, timeout=5)
+            self.observe(True, round((time.perf_counter() - start) * 1000, 2))
+        except backend_errors():
+            self.observe(False)
+        finally:
+            with self._lock:
+                self._probing = False
+
+    def status(self):
+        with self._lock:
+            now = time.monotonic()
+            stale = self.checked_at is None or now - self.checked_at > self.interval
+            if stale and not self._probing:
+                self._probing = True
+                threading.Thread(target=self._probe, name='backend-probe', daemon=True).start()
+            return {
+                "reachable": self.reachable,
+                "latency_ms": self.latency_ms,
+                "checked_seconds_ago": round(now - self.checked_at, 1) if self.checked_at else None
+            }
+
+backend_probe = BackendProbe(f"{BACKEND_API_URL}/health")
+
+class CircuitBreaker:
+    """
+    Closed: calls go through and consecutive failures are counted.
+    Open: calls are refused for reset_timeout seconds.
+    Half-open: one trial call at a time; success closes, failure re-opens.
+    """
+
+    def __init__(self, failure_threshold=BREAKER_FAILURES, reset_timeout=BREAKER_RESET_SECONDS):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = None
+        self.opens = 0
+        self.rejected = 0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+            if self.state == 'half_open' and not self._trial_running:
+                self._trial_running = True
+                return True
+            if self.state == 'closed':
+                return True
+            self.rejected += 1
+            return False
+
+    def record(self, success):
+        with self._lock:
+            self._trial_running = False
+            if success:
+                if self.state != 'closed':
+                    app.logger.info("Backend circuit closed")
+                self.state = 'closed'
+                self.failures = 0
+                return
+            self.failures += 1
+            if self.state == 'half_open' or (self.state == 'closed' and self.failures >= self.failure_threshold):
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+                self.opens += 1
+                app.logger.warning("Backend circuit opened after %s consecutive failures", self.failures)
+
+    def retry_in(self):
+        if self.state != 'open':
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "opens": self.opens,
+                "rejected": self.rejected,
+                "retry_in_seconds": round(self.retry_in(), 1)
+            }
+
+backend_breaker = CircuitBreaker()
+
+class UploadTimeouts:
+    """
+    Size-aware upload timeouts. Throughput is an EWMA over uploads big enough
+    to be transfer-bound; a file gets UPLOAD_TIMEOUT_MIN plus its size at a
+    quarter of that rate (never slower than min_rate), capped at the maximum.
+    """
+
+    SAMPLE_MIN_SIZE = 256 * 1024  # Smaller uploads mostly measure latency, not throughput
+
+    def __init__(self, minimum=UPLOAD_TIMEOUT_MIN, maximum=UPLOAD_TIMEOUT_MAX, min_rate=UPLOAD_MIN_RATE,
+                 slack=4, alpha=0.2):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.min_rate = min_rate
+        self.slack = slack
+        self.alpha = alpha
+        self.rate = None  # bytes/s
+        self.samples = 0
+        self._lock = threading.Lock()
+
+    def observe(self, size, seconds):
+        if size < self.SAMPLE_MIN_SIZE or seconds <= 0:
+            return
+        with self._lock:
+            rate = size / seconds
+            self.rate = rate if self.rate is None else self.rate + self.alpha * (rate - self.rate)
+            self.samples += 1
 
-def calculate_file_hash(file_path):
-    """Calculate SHA-256 hash of a file"""
+    def timeout(self, size):
+        rate = self.min_rate if self.rate is None else max(self.rate / self.slack, self.min_rate)
+        return min(self.minimum + size / rate, self.maximum)
+
+    def stats(self):
+        return {
+            "throughput_mb_s": round(self.rate / 1024 ** 2, 2) if self.rate else None,
+            "samples": self.samples
+        }
+
+upload_timeouts = UploadTimeouts()
+backend_stats = Counter(hedged=0, hedge_wins=0, retries=0)
+backend_stats_lock = threading.Lock()
+hedge_pool = ThreadPoolExecutor(max_workers=BACKEND_POOL_SIZE, thread_name_prefix='hedge')
+
+def call_backend(send):
+    """
+    Make one backend request through the circuit breaker. Transport errors
+    and 5xx answers count as failures; anything else proves the backend is up.
+    """
+    if not backend_breaker.allow():
+        raise BackendUnavailable(f"Backend unavailable (circuit open, retry in {backend_breaker.retry_in():.0f}s)")
+    success = False
     try:
-        hash_obj = hashlib.sha256()
-        with open(file_path, 'rb') as f:
-            for chunk in iter(lambda: f.read(8192), b""):
+        response = send()
+        success = response.status_code < 500
+        backend_probe.observe(True)
+        return response
+    except backend_errors():
+        backend_probe.observe(False)
+        raise
+    finally:
+        backend_breaker.record(success)
+
+def count_backend(stat):
+    with backend_stats_lock:
+        backend_stats[stat] += 1
+
+def submit_hedged(fn):
+    """Run fn on the hedge pool, retrying on the new pool if a reload just retired ours"""
+    while True:
+        pool = hedge_pool
+        try:
+            return pool.submit(fn)
+        except RuntimeError:  # Submitted after shutdown
+            if pool is hedge_pool:
+                raise
+
+def check_hash_request(file_hash, headers, hedge=True):
+    """
+    GET /check-hash/<hash>. When hedging is on and the answer is slower than
+    the recent p95, a second request is sent and the first answer wins; an
+    attempt that fails outright before then is retried once instead.
+    hedge=False sends one request, timed apart from the samples behind that
+    p95 (archive member lookups).
+    """
+    url = f"{BACKEND_API_URL}/check-hash/{file_hash}"
+
+    def send():
+        return call_backend(lambda: get_backend_client().get(url, headers=trace_headers(headers),
+                                                             timeout=CHECK_HASH_TIMEOUT))
+
+    def attempt():
+        with stage_latency.measure('check_hash_attempt'):
+            return send()
+
+    if not hedge:
+        with stage_latency.measure('member_check'):
+            return send()
+    if not HEDGE_CHECK_HASH:
+        return attempt()
+    p95 = stage_latency.quantile('check_hash_attempt', 0.95)
+    delay = max(p95 if p95 is not None else 0.25, HEDGE_MIN_DELAY_MS / 1000)
+    trace_id, parent_span = trace_id_var.get(), span_var.get()
+
+    def pooled_attempt(started=None):
+        if started is not None:
+            started.set()
+        with request_trace(trace_id, parent_span):
+            return attempt()
+
+    # The hedge delay runs from when the first attempt starts, not from submit:
+    # time queued behind a busy pool is not backend slowness, and hedging it
+    # would double the load exactly when the pool is saturated
+    started = threading.Event()
+    first = submit_hedged(lambda: pooled_attempt(started))
+    started.wait()
+    done, _ = wait([first], timeout=delay)
+    if done:
+        try:
+            return first.result()
+        except BackendUnavailable:
+            raise
+        except backend_errors():
+            count_backend('retries')
+            return attempt()
+
+    count_backend('hedged')
+    second = submit_hedged(pooled_attempt)
+    pending = {first, second}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                response = future.result()
+            except backend_errors() as e:
+                error = e
+                continue
+            if future is second:
+                count_backend('hedge_wins')
+            return response
+    raise error
+
+cache_stats = Counter()  # index_hits / index_misses / snapshot_hits
+cache_stats_lock = threading.Lock()
+
+def count_cache(stat):
+    with cache_stats_lock:
+        cache_stats[stat] += 1
+
+def hit_ratio(hits, misses):
+    total = hits + misses
+    return round(hits / total, 3) if total else None
+
+def new_hasher(algorithm='sha256'):
+    """Create a hash object for one of SUPPORTED_HASH_ALGORITHMS"""
+    if algorithm == 'blake3':
+        # AUTO lets blake3 spread large updates across all cores
+        return blake3.blake3(max_threads=blake3.blake3.AUTO)
+    if algorithm == 'blake2b':
+        return hashlib.blake2b()
+    return hashlib.sha256()
+
+def fadvise(fd, offset, length, advice_name):
+    """posix_fadvise wrapper - a no-op where unsupported (e.g. macOS)"""
+    if not HASH_FADVISE or not hasattr(os, 'posix_fadvise'):
+        return
+    try:
+        os.posix_fadvise(fd, offset, length, getattr(os, advice_name))
+    except OSError:
+        pass
+
+def drop_file_cache(file_path):
+    """Evict a file's clean pages from the page cache once we are done with it"""
+    if not HASH_FADVISE or not hasattr(os, 'posix_fadvise'):
+        return
+    try:
+        fd = os.open(file_path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        fadvise(fd, 0, 0, 'POSIX_FADV_DONTNEED')
+    finally:
+        os.close(fd)
+
+def open_direct(file_path):
+    """Open a file for uncached reads, or return None if the filesystem refuses"""
+    try:
+        if hasattr(os, 'O_DIRECT'):
+            return os.open(file_path, os.O_RDONLY | os.O_DIRECT)
+        import fcntl
+        if hasattr(fcntl, 'F_NOCACHE'):
+            fd = os.open(file_path, os.O_RDONLY)
+            fcntl.fcntl(fd, fcntl.F_NOCACHE, 1)
+            return fd
+    except OSError as e:
+        app.logger.debug("Direct I/O unavailable for %s: %s", file_path, e)
+    return None
+
+def read_file_chunks(file_path, drop_cache=True):
+    """
+    Yield a file's contents as memoryviews over pooled buffers, for hashing.
+    Each chunk is only valid until the next one is requested. With drop_cache
+    the pages already hashed are released as the read goes, keeping the
+    page-cache footprint flat.
+    """
+    fd = open_direct(file_path) if HASH_DIRECT_IO else None
+    direct = fd is not None
+    if not direct:
+        fd = os.open(file_path, os.O_RDONLY)
+        fadvise(fd, 0, 0, 'POSIX_FADV_SEQUENTIAL')
+
+    try:
+        offset = dropped = 0
+        while True:
+            with buffer_pool.buffer() as buffer:
+                read = os.readv(fd, [buffer])
+                if not read:
+                    break
+                chunk = memoryview(buffer)[:read]
+                try:
+                    yield chunk
+                finally:
+                    chunk.release()
+            offset += read
+            hash_scheduler.checkpoint(read)
+            if not direct and drop_cache and offset - dropped >= 16 * HASH_CHUNK_SIZE:
+                fadvise(fd, dropped, offset - dropped, 'POSIX_FADV_DONTNEED')
+                dropped = offset
+        if not direct and drop_cache:
+            fadvise(fd, 0, 0, 'POSIX_FADV_DONTNEED')
+    finally:
+        os.close(fd)
+
+def read_at(fd, view, offset):
+    """Read into a memoryview at an offset; os.preadv where available"""
+    if hasattr(os, 'preadv'):
+        return os.preadv(fd, [view], offset)
+    data = os.pread(fd, len(view), offset)
+    view[:len(data)] = data
+    return len(data)
+
+def calculate_file_hash(file_path, algorithm='sha256', drop_cache=True):
+    """Calculate the hash of a file (SHA-256 unless another algorithm is given)"""
+    digests = calculate_file_hashes(file_path, (algorithm,), drop_cache)
+    return digests[0] if digests else None
+
+def calculate_file_hashes(file_path, algorithms, drop_cache=True):
+    """Hex digests of a file for several algorithms from a single read, or None"""
+    try:
+        hash_objs = [new_hasher(algorithm) for algorithm in algorithms]
+        for chunk in read_file_chunks(file_path, drop_cache=drop_cache):
+            for hash_obj in hash_objs:
                 hash_obj.update(chunk)
-        return hash_obj.hexdigest()
+        return [hash_obj.hexdigest() for hash_obj in hash_objs]
+    except Exception as e:
+        app.logger.error("Hash calculation error: %s", e)
+        return None
+
+def calculate_tree_hash(file_path, segment_size=None, workers=None, algorithm='sha256',
+                        drop_cache=True):
+    """
+    Calculate a Merkle root over fixed-size segments of a file.
+    Segments are read at independent offsets into pooled buffers and hashed on
+    a thread pool (hashlib releases the GIL), so one huge file uses every core.
+    Leaves and interior nodes are domain-separated as in RFC 6962.
+    """
+    segment_size = segment_size or TREE_HASH_SEGMENT_SIZE
+    workers = workers or TREE_HASH_WORKERS
+    try:
+        file_size = os.path.getsize(file_path)
+        segment_count = max(1, -(-file_size // segment_size))
+        fd = os.open(file_path, os.O_RDONLY)
+        fadvise(fd, 0, 0, 'POSIX_FADV_SEQUENTIAL')
+        try:
+            def hash_segment(index):
+                offset = index * segment_size
+                end = min(offset + segment_size, file_size)
+                hash_obj = new_hasher(algorithm)
+                hash_obj.update(b'\x00')
+                while offset < end:
+                    with buffer_pool.buffer() as buffer, memoryview(buffer) as view:
+                        read = read_at(fd, view[:min(len(view), end - offset)], offset)
+                        if not read:
+                            break
+                        with view[:read] as chunk:
+                            hash_obj.update(chunk)
+                    hash_scheduler.throttle(read)
+                    offset += read
+                if drop_cache:
+                    fadvise(fd, index * segment_size, segment_size, 'POSIX_FADV_DONTNEED')
+                return hash_obj.digest()
+
+            with ThreadPoolExecutor(max_workers=min(workers, segment_count)) as pool:
+                level = list(pool.map(hash_segment, range(segment_count)))
+        finally:
+            os.close(fd)
+
+        while len(level) > 1:
+            next_level = []
+            for i in range(0, len(level) - 1, 2):
+                next_level.append(hashlib.sha256(b'\x01' + level[i] + level[i + 1]).digest())
+            if len(level) % 2:
+                next_level.append(level[-1])  # Odd node is promoted unchanged
+            level = next_level
+        return level[0].hex()
+    except Exception as e:
+        app.logger.error("Tree hash calculation error: %s", e)
+        return None
+
+def uses_local_hash(file_size):
+    """Whether a file of this size gets a fast local key besides its SHA-256"""
+    return HASH_ALGORITHM != 'sha256' or (0 < TREE_HASH_MIN_SIZE <= file_size)
+
+def calculate_local_hash(file_path, file_size, drop_cache=True):
+    """Calculate the fast local duplicate key - tree hash for huge files"""
+    if 0 < TREE_HASH_MIN_SIZE <= file_size:
+        return calculate_tree_hash(file_path, drop_cache=drop_cache)
+    return calculate_file_hash(file_path, HASH_ALGORITHM, drop_cache=drop_cache)
+
+NORMALIZERS = {}  # MIME type -> normalizer class
+
+def register_normalizer(*mime_types):
+    """
+    Class decorator registering a content normalizer for MIME types.
+    A normalizer has a short name, and feed(chunk) / finish() methods that
+    return the canonical bytes for the data seen so far.
+    """
+    def register(cls):
+        for mime_type in mime_types:
+            NORMALIZERS[mime_type] = cls
+        return cls
+    return register
+
+def normalizer_for(file_path, file_size):
+    """A fresh normalizer for the file's MIME type (by name), or None"""
+    if file_size > NORMALIZED_HASH_MAX_SIZE:
+        return None
+    mime_type, encoding = mimetypes.guess_type(file_path)
+    cls = NORMALIZERS.get(mime_type) if encoding is None else None  # .csv.gz etc. stay raw
+    return cls() if cls else None
+
+@register_normalizer('text/plain', 'text/csv', 'text/tab-separated-values', 'text/markdown')
+class TextNormalizer:
+    """
+    Text: a UTF-8 BOM, CRLF line endings, trailing whitespace, trailing blank
+    lines and a missing final newline are ignored.
+    """
+
+    name = 'text'
+    WHITESPACE = b' \t\r\x0b\x0c'
+    CARRY_LIMIT = 1024 * 1024  # A longer line is emitted in pieces
+
+    def __init__(self):
+        self._carry = b''
+        self._blank_lines = 0
+        self._line_open = False  # Part of the current line is already emitted
+        self._started = False
+
+    def _emit(self, text, out, line_end):
+        if not text and not (line_end and self._line_open):
+            if line_end:
+                self._blank_lines += 1  # Held back until a non-blank line follows
+            return
+        if self._blank_lines:
+            out.append(b'\n' * self._blank_lines)
+            self._blank_lines = 0
+        out.append(text + b'\n' if line_end else text)
+        self._line_open = not line_end
+
+    def feed(self, data):
+        data = self._carry + bytes(data)
+        if not self._started:
+            if len(data) < 3 and b'\xef\xbb\xbf'.startswith(data):
+                self._carry = data  # Maybe the start of a BOM split across chunks
+                return b''
+            self._started = True
+            if data.startswith(b'\xef\xbb\xbf'):
+                data = data[3:]
+        lines = data.split(b'\n')
+        self._carry = lines.pop()
+        out = []
+        for line in lines:
+            self._emit(line.rstrip(self.WHITESPACE), out, line_end=True)
+        if len(self._carry) > self.CARRY_LIMIT:
+            # Only trailing whitespace can still change meaning, so keep just that
+            head = self._carry.rstrip(self.WHITESPACE)
+            self._carry = self._carry[len(head):]
+            self._emit(head, out, line_end=False)
+        return b''.join(out)
+
+    def finish(self):
+        out = []
+        tail = self._carry.rstrip(self.WHITESPACE)
+        if tail or self._line_open:
+            self._emit(tail, out, line_end=True)
+        return b''.join(out)
+
+class PatternNormalizer:
+    """
+    Base for normalizers that blank out regex matches in a byte stream.
+    Every pattern must match at most HOLDBACK bytes, so a match can never
+    straddle what has already been emitted.
+    """
+
+    name = None
+    PATTERN = None
+    HOLDBACK = 4096
+
+    def __init__(self):
+        self._carry = b''
+
+    def _process(self, data, final):
+        safe_end = len(data) if final else len(data) - self.HOLDBACK
+        if safe_end <= 0:
+            return b'', data
+        out = []
+        position = 0
+        for match in self.PATTERN.finditer(data):
+            if match.start() >= safe_end:
+                break
+            out.append(data[position:match.start()])
+            position = match.end()
+        cut = max(position, safe_end)
+        out.append(data[position:cut])
+        return b''.join(out), data[cut:]
+
+    def feed(self, data):
+        out, self._carry = self._process(self._carry + bytes(data), final=False)
+        return out
+
+    def finish(self):
+        out, self._carry = self._process(self._carry, final=True)
+        return out
+
+@register_normalizer('application/pdf')
+class PdfNormalizer(PatternNormalizer):
+    """
+    PDF: document-info and XMP timestamps, producer/creator tool, the trailer
+    /ID, stream lengths and the xref offsets that shift with them are ignored.
+    Compressed (PDF 1.5+) xref streams are hashed as they are.
+    """
+
+    name = 'pdf'
+    PATTERN = re.compile(
+        rb'/(?:CreationDate|ModDate|Producer|Creator)\s{0,8}\((?:\\.|[^\\)]){0,512}\)'
+        rb'|/ID\s{0,8}\[[^\]]{0,512}\]'
+        rb'|/Length\s{1,8}\d{1,20}'
+        rb'|startxref\s{1,8}\d{1,20}'
+        rb'|(?<![0-9])\d{10} \d{5} [fn](?![0-9])'
+        rb'|<(xmp:(?:CreateDate|ModifyDate|MetadataDate|CreatorTool)|xmpMM:(?:DocumentID|InstanceID)|pdf:Producer)>'
+        rb'[^<]{0,512}</\1>'
+        rb'|(?:xmp:(?:CreateDate|ModifyDate|MetadataDate|CreatorTool)|xmpMM:(?:DocumentID|InstanceID)|pdf:Producer)'
+        rb'="[^"]{0,512}"')
+
+def calculate_content_hashes(file_path, normalizer, drop_cache=True):
+    """
+    Return (SHA-256, normalized-content key) from a single read of the file.
+    The key is "<normalizer name>:<SHA-256 of the canonical content>".
+    """
+    try:
+        raw_hash = hashlib.sha256()
+        canonical_hash = hashlib.sha256()
+        for chunk in read_file_chunks(file_path, drop_cache=drop_cache):
+            raw_hash.update(chunk)
+            canonical_hash.update(normalizer.feed(chunk))
+        canonical_hash.update(normalizer.finish())
+        return raw_hash.hexdigest(), f"{normalizer.name}:{canonical_hash.hexdigest()}"
+    except Exception as e:
+        app.logger.error("Hash calculation error: %s", e)
+        return None, None
+
+PHASH_SIZE = 32  # pHash input grid; the low 8x8 DCT coefficients give 64 bits
+
+@functools.lru_cache(maxsize=None)
+def dct_matrix(size):
+    """Orthonormal DCT-II matrix D, so a block's 2-D DCT is D @ block @ D.T"""
+    n = numpy.arange(size)
+    matrix = numpy.cos(numpy.pi * (2 * n[None, :] + 1) * n[:, None] / (2 * size))
+    matrix[0] /= numpy.sqrt(2)
+    return (matrix * numpy.sqrt(2 / size)).astype(numpy.float32)
+
+def pack_bits(bits):
+    """(n, 64) booleans -> (n,) uint64, first bit most significant"""
+    return numpy.packbits(bits, axis=1).view('>u8').ravel().astype(numpy.uint64)
+
+def perceptual_hashes(phash_pixels, dhash_pixels):
+    """
+    pHash and dHash for a batch of grayscale images, vectorized over the batch.
+    phash_pixels is (n, 32, 32) and dhash_pixels (n, 8, 9); returns two
+    (n,) uint64 arrays.
+    """
+    dct = dct_matrix(PHASH_SIZE)
+    low = (dct @ phash_pixels @ dct.T)[:, :8, :8].reshape(len(phash_pixels), 64)
+    median = numpy.median(low[:, 1:], axis=1, keepdims=True)  # DC term excluded
+    gradients = dhash_pixels[:, :, 1:] > dhash_pixels[:, :, :-1]
+    return pack_bits(low > median), pack_bits(gradients.reshape(len(dhash_pixels), 64))
+
+def image_pixels(file_path):
+    """Grayscale grids for pHash (32x32) and dHash (9 wide, 8 high)"""
+    with PIL_Image.open(file_path) as image:
+        image.draft('L', (PHASH_SIZE * 4, PHASH_SIZE * 4))  # JPEG decodes at a reduced scale
+        gray = image.convert('L')
+    phash_pixels = numpy.asarray(gray.resize((PHASH_SIZE, PHASH_SIZE), PIL_Image.LANCZOS), dtype=numpy.float32)
+    dhash_pixels = numpy.asarray(gray.resize((9, 8), PIL_Image.LANCZOS), dtype=numpy.int16)
+    return phash_pixels, dhash_pixels
+
+def is_image(file_path):
+    mime_type, encoding = mimetypes.guess_type(file_path)
+    return encoding is None and mime_type is not None and mime_type.startswith('image/') \
+        and mime_type != 'image/svg+xml'
+
+def calculate_perceptual_hash(file_path):
+    """(pHash, dHash) of an image file as ints, or None if it cannot be decoded"""
+    try:
+        phash_pixels, dhash_pixels = image_pixels(file_path)
+        phash, dhash = perceptual_hashes(phash_pixels[None], dhash_pixels[None])
+        return int(phash[0]), int(dhash[0])
+    except Exception as e:
+        app.logger.warning("Perceptual hash failed for %s: %s", file_path, e)
+        return None
+
+def popcount(values):
+    """Set bits per element of a uint64 array"""
+    if hasattr(numpy, 'bitwise_count'):  # NumPy 2.0+
+        return numpy.bitwise_count(values)
+    table = numpy.array([bin(i).count('1') for i in range(256)], dtype=numpy.uint8)
+    return table[values.view(numpy.uint8)].reshape(-1, 8).sum(axis=1)
+
+class PerceptualIndex:
+    """
+    Image fingerprints packed into uint64 arrays, searched with one vectorized
+    XOR + popcount pass over every entry - exact, and well under a millisecond
+    at shard sizes. Once full, the oldest entries are overwritten.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._phash = numpy.zeros(64, dtype=numpy.uint64)
+        self._dhash = numpy.zeros(64, dtype=numpy.uint64)
+        self._entries = []  # slot -> {"sha256": ..., "filename": ...}
+        self._next = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def search(self, phash, dhash, max_distance):
+        """Closest entry with both distances within max_distance, plus its pHash distance"""
+        count = len(self._entries)
+        if not count:
+            return None
+        phash_distance = popcount(self._phash[:count] ^ numpy.uint64(phash))
+        dhash_distance = popcount(self._dhash[:count] ^ numpy.uint64(dhash))
+        candidates = numpy.flatnonzero((phash_distance <= max_distance) & (dhash_distance <= max_distance))
+        if not candidates.size:
+            return None
+        total = phash_distance[candidates].astype(numpy.int32) + dhash_distance[candidates]
+        best = candidates[numpy.argmin(total)]
+        return dict(self._entries[best], distance=int(phash_distance[best]))
+
+    def add(self, phash, dhash, sha256_hash, filename):
+        same = self.search(phash, dhash, 0)
+        if same and same['sha256'] == sha256_hash:
+            return
+        entry = {"sha256": sha256_hash, "filename": filename}
+        if len(self._entries) < self.max_entries:
+            slot = len(self._entries)
+            if slot == len(self._phash):
+                capacity = min(self.max_entries, slot * 2)
+                self._phash = numpy.resize(self._phash, capacity)
+                self._dhash = numpy.resize(self._dhash, capacity)
+            self._entries.append(entry)
+        else:
+            slot = self._next
+            self._next = (slot + 1) % self.max_entries
+            self._entries[slot] = entry
+        self._phash[slot] = phash
+        self._dhash[slot] = dhash
+
+def archive_kind(file_path):
+    """Sniff an archive format: 'zip', 'tar', 'tar.gz', 'gzip' or None"""
+    try:
+        with open(file_path, 'rb') as f:
+            head = f.read(512)
+            if head[:4] in (b'PK\x03\x04', b'PK\x05\x06'):
+                return 'zip' if zipfile.is_zipfile(f) else None
+        if head[257:262] == b'ustar':
+            return 'tar'
+        if head[:2] == b'\x1f\x8b':
+            with gzip.open(file_path, 'rb') as f:
+                return 'tar.gz' if f.read(512)[257:262] == b'ustar' else 'gzip'
+    except (OSError, EOFError, zipfile.BadZipFile) as e:
+        app.logger.warning("Could not inspect %s as an archive: %s", file_path, e)
+    return None
+
+class HashingReader:
+    """Read-only file wrapper that hashes every byte read through it"""
+
+    def __init__(self, raw, hash_obj):
+        self.raw = raw
+        self.hash_obj = hash_obj
+
+    def read(self, size=-1):
+        data = self.raw.read(size)
+        self.hash_obj.update(data)
+        hash_scheduler.checkpoint(len(data))
+        return data
+
+    def readinto(self, buffer):
+        read = self.raw.readinto(buffer)
+        with memoryview(buffer)[:read] as chunk:
+            self.hash_obj.update(chunk)
+        hash_scheduler.checkpoint(read)
+        return read
+
+    def drain(self):
+        while read_pooled(self, lambda chunk: None):
+            pass
+
+def read_pooled(stream, consume):
+    """
+    readinto() one chunk of a stream through a pooled buffer and pass it to
+    consume; returns the byte count, 0 at the end. Only the pool's buffers
+    are used, however many streams are read at once.
+    """
+    with buffer_pool.buffer() as buffer, memoryview(buffer) as view:
+        read = stream.readinto(view)
+        if read:
+            with view[:read] as chunk:
+                consume(chunk)
+        return read
+
+def hash_member(name, stream):
+    """SHA-256 (and the fast local key, if any) of one archive member's contents"""
+    sha256 = hashlib.sha256()
+    fast = new_hasher(HASH_ALGORITHM) if HASH_ALGORITHM != 'sha256' else None
+
+    def update(chunk):
+        sha256.update(chunk)
+        if fast is not None:
+            fast.update(chunk)
+
+    size = 0
+    while True:
+        read = read_pooled(stream, update)
+        if not read:
+            break
+        size += read
+    return {"name": name, "size": size, "sha256": sha256.hexdigest(),
+            "fast_hash": fast.hexdigest() if fast is not None else None}
+
+def calculate_archive_hashes(file_path, kind, drop_cache=True):
+    """
+    Return (archive SHA-256, member hashes) without extracting anything.
+    Tar and gzip streams are hashed as raw bytes and as members in one read;
+    zip needs its central directory from the end, so members are a second pass.
+    """
+    members = []
+    try:
+        if kind == 'zip':
+            file_hash = calculate_file_hash(file_path, drop_cache=False)
+            with zipfile.ZipFile(file_path) as archive:
+                for info in archive.infolist():
+                    if info.is_dir():
+                        continue
+                    if len(members) >= ARCHIVE_MAX_MEMBERS:
+                        break
+                    try:
+                        with archive.open(info) as stream:
+                            members.append(hash_member(info.filename, stream))
+                    except (RuntimeError, NotImplementedError, zipfile.BadZipFile) as e:
+                        app.logger.warning("Skipping archive member %s: %s", info.filename, e)
+            if drop_cache:
+                drop_file_cache(file_path)
+            return file_hash, members
+
+        raw_hash = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            fadvise(f.fileno(), 0, 0, 'POSIX_FADV_SEQUENTIAL')
+            reader = HashingReader(f, raw_hash)
+            if kind == 'gzip':
+                name = os.path.basename(file_path)
+                with gzip.GzipFile(fileobj=reader) as stream:
+                    members.append(hash_member(name[:-3] if name.endswith('.gz') else name, stream))
+            else:
+                with tarfile.open(fileobj=reader, mode='r|gz' if kind == 'tar.gz' else 'r|') as archive:
+                    for info in archive:
+                        if not info.isfile():
+                            continue
+                        if len(members) >= ARCHIVE_MAX_MEMBERS:
+                            break
+                        members.append(hash_member(info.name, archive.extractfile(info)))
+            reader.drain()  # Trailing padding and anything past the member limit
+        if drop_cache:
+            drop_file_cache(file_path)
+        return raw_hash.hexdigest(), members
     except Exception as e:
-        app.logger.error(f"Hash calculation error: {e}")
+        # A damaged archive is still a file; fall back to the plain hash
+        app.logger.warning("Archive read failed for %s: %s", file_path, e)
+        return calculate_file_hash(file_path, drop_cache=drop_cache), None
+
+def find_known_members(user_id, kind, members, headers):
+    """
+    Report which archive members are already known: first from the user's
+    local index (by fast key), then by asking the backend about the largest
+    ARCHIVE_MAX_BACKEND_CHECKS of the rest, BATCH_WORKERS at a time. These
+    checks are not hedged and stop at the first transport error.
+    """
+    known = {}
+    pending = {}
+    for member in sorted(members, key=lambda m: m['size'], reverse=True):
+        entry = lookup_known_hash(user_id, member['fast_hash'], record_stats=False) if member['fast_hash'] else None
+        if entry is not None:
+            known[member['sha256']] = entry['filename']
+        elif member['sha256'] not in known:
+            pending[member['sha256']] = None
+    unchecked = len(pending) > ARCHIVE_MAX_BACKEND_CHECKS
+    pending = list(pending)[:ARCHIVE_MAX_BACKEND_CHECKS]
+
+    backend_checked = True
+    def check(sha256_hash):
+        nonlocal backend_checked
+        if not backend_checked:
+            return
+        try:
+            response = check_hash_request(sha256_hash, headers, hedge=False)
+        except backend_errors() as e:
+            backend_checked = False
+            app.logger.warning("Archive member check failed: %s", e)
+            return
+        if response.status_code == 200:
+            data = response.json()
+            if data.get('exists'):
+                known[sha256_hash] = data.get('filename', 'unknown')
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=BATCH_WORKERS) as pool:
+            list(pool.map(check, pending))
+
+    known_members = [{"name": m['name'], "size": m['size'], "file_hash": m['sha256'],
+                      "original_filename": known[m['sha256']]}
+                     for m in members if m['sha256'] in known]
+    app.logger.info("Archive members: %s of %s already known", len(known_members), len(members))
+    return {
+        "format": kind,
+        "member_count": len(members),
+        "known_count": len(known_members),
+        "known_members": known_members,
+        "member_limit_reached": len(members) >= ARCHIVE_MAX_MEMBERS,
+        "backend_checked": backend_checked,
+        "backend_limit_reached": unchecked,
+    }
+
+class UserShard:
+    """One user's local state: an LRU known-hash index bounded by max_entries"""
+
+    def __init__(self, user_id, max_entries=SHARD_MAX_ENTRIES):
+        self.user_id = user_id
+        self.max_entries = max_entries
+        self.known_hashes = OrderedDict()  # fast digest -> {"sha256": ..., "filename": ...}
+        self.images = None  # PerceptualIndex, created with the first image
+        self.lock = threading.Lock()
+
+    def lookup(self, fast_hash):
+        with self.lock:
+            entry = self.known_hashes.get(fast_hash)
+            if entry is not None:
+                self.known_hashes.move_to_end(fast_hash)
+            return entry
+
+    def remember(self, fast_hash, sha256_hash, filename):
+        global index_generation
+        with self.lock:
+            index_generation += 1
+            self.known_hashes[fast_hash] = {"sha256": sha256_hash, "filename": filename}
+            self.known_hashes.move_to_end(fast_hash)
+            while len(self.known_hashes) > self.max_entries:
+                self.known_hashes.popitem(last=False)
+
+    def find_similar_image(self, phash, dhash):
+        with self.lock:
+            if self.images is None:
+                return None
+            return self.images.search(phash, dhash, PERCEPTUAL_MAX_DISTANCE)
+
+    def remember_image(self, phash, dhash, sha256_hash, filename):
+        with self.lock:
+            if self.images is None:
+                self.images = PerceptualIndex(self.max_entries)
+            self.images.add(phash, dhash, sha256_hash, filename)
+
+user_shards = OrderedDict()  # user id -> UserShard, least recently used first
+user_shards_lock = threading.Lock()
+backend_subjects = OrderedDict()  # token fingerprint -> subject the backend accepted it for
+backend_subjects_lock = threading.Lock()
+index_generation = 0  # Bumped on every index write, so unchanged state is not re-snapshotted
+
+def get_user_shard(user_id):
+    """Return the shard for a user, creating it (and retiring the idlest) as needed"""
+    with user_shards_lock:
+        shard = user_shards.get(user_id)
+        if shard is None:
+            shard = user_shards[user_id] = UserShard(user_id)
+            while len(user_shards) > MAX_SHARDS:
+                user_shards.popitem(last=False)
+        else:
+            user_shards.move_to_end(user_id)
+        return shard
+
+def user_id_from_token(auth_token, claims=None):
+    """
+    Identify whose local state a request uses.
+    Unverified token payloads are never trusted here - a forged subject could
+    otherwise probe another user's index - so without local JWT checks a token
+    is its own shard until the backend has accepted it (see trust_backend_subject).
+    """
+    if claims and claims.get('sub'):
+        return f"sub:{claims['sub']}"
+    fingerprint = token_fingerprint(auth_token)
+    with backend_subjects_lock:
+        subject = backend_subjects.get(fingerprint)
+    return f"sub:{subject}" if subject else f"token:{fingerprint}"
+
+def token_fingerprint(auth_token):
+    return hashlib.sha256(auth_token.encode('utf-8')).hexdigest()[:32]
+
+def trust_backend_subject(auth_token, user_id):
+    """
+    Record the subject of a token the backend has just accepted and return
+    the user id to use from now on (user_id if the token names no subject).
+    The backend verified the signature, so the subject is genuine, and state
+    keyed by it - shards, snapshot, history - outlives token rotation.
+    """
+    try:
+        claims = json.loads(b64url_decode(auth_token.split('.')[1]))
+    except (ValueError, TypeError, IndexError):
+        claims = None
+    subject = claims.get('sub') if isinstance(claims, dict) else None
+    if not subject or not isinstance(subject, str):
+        return user_id
+    fingerprint = token_fingerprint(auth_token)
+    with backend_subjects_lock:
+        backend_subjects[fingerprint] = subject
+        backend_subjects.move_to_end(fingerprint)
+        while len(backend_subjects) > JWT_CACHE_SIZE:
+            backend_subjects.popitem(last=False)
+    return f"sub:{subject}"
+
+def lookup_known_hash(user_id, fast_hash, record_stats=True):
+    """
+    Return the user's local index entry for a fast digest, or None.
+    record_stats=False keeps bulk probes (archive members) out of the hit ratios.
+    """
+    shard = get_user_shard(user_id)
+    entry = shard.lookup(fast_hash)
+    snapshot = state_snapshot
+    if entry is None and snapshot is not None:
+        entry = snapshot.lookup(user_id, fast_hash)
+        if entry is not None:
+            if record_stats:
+                count_cache('snapshot_hits')
+            shard.remember(fast_hash, entry['sha256'], entry['filename'])
+    if record_stats:
+        count_cache('index_hits' if entry is not None else 'index_misses')
+    return entry
+
+def remember_hash(user_id, fast_hash, sha256_hash, filename, normalized_key=None, fingerprint=None):
+    """
+    Record a fast digest (and normalized-content key or image fingerprint,
+    if any) together with the SHA-256 the backend knows it by. No-op when
+    there is none of them, as in plain sha256 mode.
+    """
+    for key in (fast_hash, normalized_key):
+        if key:
+            get_user_shard(user_id).remember(key, sha256_hash, filename)
+    if fingerprint:
+        get_user_shard(user_id).remember_image(*fingerprint, sha256_hash, filename)
+
+class StateSnapshot:
+    """
+    Read-only, memory-mapped known-hash index saved by an earlier run.
+
+    Layout: header (magic, record count), then fixed-size index records
+    (16-byte key, payload offset) sorted by key, then payloads (raw SHA-256,
+    filename length, UTF-8 filename). Opening is one mmap call and lookups
+    binary-search the mapping, touching only the pages they need.
+    """
+
+    MAGIC = b'DDASSNP1'
+    HEADER = struct.Struct('<8sQ')
+    RECORD = struct.Struct('<16sQ')
+    NAME_LENGTH = struct.Struct('<H')
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._map = None
+        try:
+            with open(path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size < self.HEADER.size:
+                    return
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return
+        magic, count = self.HEADER.unpack_from(self._map, 0)
+        if magic != self.MAGIC:
+            logging.warning("Ignoring snapshot with unknown format: %s", path)
+            self._map.close()
+            self._map = None
+            return
+        if not self._complete(count):
+            # Lookups would read past the end; the in-memory index serves instead
+            logging.warning("Ignoring truncated snapshot: %s", path)
+            self._map.close()
+            self._map = None
+            return
+        self.count = count
+
+    def _complete(self, count):
+        """Whether the file is exactly as long as its header's record count implies"""
+        size = len(self._map)
+        index_end = self.HEADER.size + count * self.RECORD.size
+        if count == 0 or size < index_end:
+            return size == index_end
+        # Payloads are written in key order, so the last record's one ends the file
+        _, offset = self.RECORD.unpack_from(self._map, index_end - self.RECORD.size)
+        name_at = offset + 32
+        if offset < index_end or name_at + self.NAME_LENGTH.size > size:
+            return False
+        (length,) = self.NAME_LENGTH.unpack_from(self._map, name_at)
+        return name_at + self.NAME_LENGTH.size + length == size
+
+    @staticmethod
+    def key(user_id, fast_hash):
+        return hashlib.sha256(f"{user_id}\0{fast_hash}".encode('utf-8')).digest()[:16]
+
+    def _record(self, index):
+        return self.RECORD.unpack_from(self._map, self.HEADER.size + index * self.RECORD.size)
+
+    def _payload(self, offset):
+        sha256_hash = self._map[offset:offset + 32].hex()
+        (length,) = self.NAME_LENGTH.unpack_from(self._map, offset + 32)
+        start = offset + 32 + self.NAME_LENGTH.size
+        return {"sha256": sha256_hash, "filename": self._map[start:start + length].decode('utf-8', 'replace')}
+
+    def lookup(self, user_id, fast_hash):
+        key = self.key(user_id, fast_hash)
+        low, high = 0, self.count
+        while low < high:
+            mid = (low + high) // 2
+            mid_key, offset = self._record(mid)
+            if mid_key < key:
+                low = mid + 1
+            elif mid_key > key:
+                high = mid
+            else:
+                return self._payload(offset)
         return None
 
+    def items(self):
+        """Yield (key, entry) for every record"""
+        for index in range(self.count):
+            key, offset = self._record(index)
+            yield key, self._payload(offset)
+
+    @classmethod
+    def write(cls, path, entries):
+        """Atomically write {key: entry} as a snapshot file"""
+        keys = sorted(entries)
+        payload_start = cls.HEADER.size + len(keys) * cls.RECORD.size
+        index = bytearray()
+        payloads = bytearray()
+        for key in keys:
+            entry = entries[key]
+            name = entry['filename'].encode('utf-8')[:0xFFFF]
+            index += cls.RECORD.pack(key, payload_start + len(payloads))
+            payloads += bytes.fromhex(entry['sha256']) + cls.NAME_LENGTH.pack(len(name)) + name
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(cls.HEADER.pack(cls.MAGIC, len(keys)))
+            f.write(index)
+            f.write(payloads)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+snapshot_lock = threading.Lock()  # The snapshot thread and the exit hook share the .tmp path
+
+def save_state_snapshot():
+    """
+    Write the in-memory shards merged over the current snapshot.
+    In-memory entries win and are kept first when the total exceeds the
+    MAX_SHARDS * SHARD_MAX_ENTRIES budget.
+    """
+    with snapshot_lock:
+        write_state_snapshot()
+
+def write_state_snapshot():
+    global state_snapshot, snapshot_generation
+    if not SNAPSHOT_PATH or snapshot_generation == index_generation:
+        return
+    generation = index_generation
+    limit = MAX_SHARDS * SHARD_MAX_ENTRIES
+
+    entries = {}
+    with user_shards_lock:
+        shards = list(user_shards.values())
+    for shard in shards:
+        with shard.lock:
+            items = list(shard.known_hashes.items())
+        for fast_hash, entry in items:
+            entries[StateSnapshot.key(shard.user_id, fast_hash)] = entry
+    if state_snapshot is not None:
+        for key, entry in state_snapshot.items():
+            if len(entries) >= limit:
+                break
+            entries.setdefault(key, entry)
+
+    try:
+        StateSnapshot.write(SNAPSHOT_PATH, entries)
+    except OSError as e:
+        app.logger.error("Could not write state snapshot: %s", e)
+        return
+    # Readers holding the old snapshot keep their mapping until they drop it
+    state_snapshot = StateSnapshot(SNAPSHOT_PATH)
+    snapshot_generation = generation
+    app.logger.info("Saved state snapshot with %s entries", len(entries))
+
+def snapshot_loop():
+    while True:
+        time.sleep(SNAPSHOT_INTERVAL)
+        save_state_snapshot()
+
+class MetadataStore:
+    """
+    SQLite record of processed files, indexed by user and time, user and
+    digest, size and path. WAL mode lets reads run while a batch is written.
+    record() only queues the row; a writer thread inserts queued rows with
+    executemany in one transaction per batch. Reads borrow pooled
+    connections, and sqlite3 keeps each connection's statements prepared, so
+    the fixed SQL below is compiled once per connection.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS files (
+            id INTEGER PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            processed_at REAL NOT NULL,
+            path TEXT NOT NULL,
+            filename TEXT NOT NULL,
+            size INTEGER,
+            sha256 TEXT,
+            verdict TEXT NOT NULL,
+            match TEXT,
+            original TEXT,
+            error TEXT,
+            total_ms REAL
+        );
+        CREATE INDEX IF NOT EXISTS files_user_time ON files (user_id, processed_at);
+        CREATE INDEX IF NOT EXISTS files_user_sha256 ON files (user_id, sha256);
+        CREATE INDEX IF NOT EXISTS files_size ON files (size);
+        CREATE INDEX IF NOT EXISTS files_path ON files (path);
+    """
+    INSERT = ("INSERT INTO files (user_id, processed_at, path, filename, size, sha256, verdict, match,"
+              " original, error, total_ms) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+    # Only digests the backend has: uploads and exact duplicates, not normalized or perceptual matches
+    FIND_DIGEST = ("SELECT COALESCE(original, filename) FROM files WHERE user_id = ? AND sha256 = ?"
+                   " AND (verdict = 'uploaded' OR match = 'exact') LIMIT 1")
+    HISTORY_COLUMNS = "processed_at, path, filename, size, sha256, verdict, match, original, error, total_ms"
+
+    def __init__(self, path, batch_size=METADATA_BATCH_SIZE, flush_interval=METADATA_FLUSH_INTERVAL):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.batches = 0
+        self.digest_hits = 0
+        self.digest_misses = 0
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._readers = queue.SimpleQueue()
+        self._writer = self._connect()
+        self._writer.executescript(self.SCHEMA)
+        threading.Thread(target=self._run, name='metadata-writer', daemon=True).start()
+        atexit.register(self.flush)
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')  # No fsync per batch; only power loss can undo one
+        return connection
+
+    @contextmanager
+    def _reader(self):
+        try:
+            connection = self._readers.get_nowait()
+        except queue.Empty:
+            connection = self._connect()
+        try:
+            yield connection
+        finally:
+            self._readers.put(connection)
+
+    def record(self, row):
+        """Queue one row (values in INSERT's column order) for the next batch"""
+        with self._pending_lock:
+            self._pending.append(row)
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Insert every queued row now, in one transaction"""
+        with self._write_lock:
+            with self._pending_lock:
+                rows, self._pending = self._pending, []
+            if not rows:
+                return
+            try:
+                with self._writer:
+                    self._writer.executemany(self.INSERT, rows)
+            except sqlite3.Error as e:
+                app.logger.error("Could not write %s metadata rows: %s", len(rows), e)
+                return
+            self.written += len(rows)
+            self.batches += 1
+
+    def find_digest(self, user_id, sha256_hash):
+        """The name the backend knows a digest by, if this user's files included it"""
+        with self._pending_lock:
+            row = next(((original or filename,) for user, _, _, filename, _, digest, verdict, match, original, _, _
+                        in self._pending if user == user_id and digest == sha256_hash
+                        and (verdict == 'uploaded' or match == 'exact')), None)
+        if row is None:
+            with self._reader() as connection:
+                row = connection.execute(self.FIND_DIGEST, (user_id, sha256_hash)).fetchone()
+        if row is None:
+            self.digest_misses += 1
+            return None
+        self.digest_hits += 1
+        return row[0]
+
+    def history(self, user_id, since=0.0, limit=50, verdict=None, path=None, min_size=None):
+        """A user's files processed at or after since (Unix seconds), newest first"""
+        self.flush()  # Include rows still waiting for their batch
+        clauses, params = ["user_id = ?", "processed_at >= ?"], [user_id, since]
+        for clause, value in (("verdict = ?", verdict), ("path = ?", path), ("size >= ?", min_size)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        sql = (f"SELECT {self.HISTORY_COLUMNS} FROM files WHERE {' AND '.join(clauses)}"
+               " ORDER BY processed_at DESC LIMIT ?")
+        with self._reader() as connection:
+            rows = connection.execute(sql, params + [limit]).fetchall()
+        return [{
+            "processed_at": datetime.fromtimestamp(processed_at).astimezone().isoformat(timespec='milliseconds'),
+            "path": file_path,
+            "filename": filename,
+            "size": size,
+            "file_hash": sha256_hash,
+            "verdict": verdict,
+            "match": match,
+            "original_filename": original,
+            "error": error,
+            "total_ms": total_ms
+        } for processed_at, file_path, filename, size, sha256_hash, verdict, match, original, error, total_ms
+            in rows]
+
+    def stats(self):
+        with self._pending_lock:
+            pending = len(self._pending)
+        return {"rows_written": self.written, "batches": self.batches, "pending": pending,
+                "digest_hit_ratio": hit_ratio(self.digest_hits, self.digest_misses)}
+
+def open_metadata_store(path):
+    try:
+        return MetadataStore(path)
+    except sqlite3.Error as e:
+        app.logger.warning("Metadata store disabled, could not open %s: %s", path, e)
+        return None
+
+def b64url_decode(segment):
+    """Decode unpadded base64url as used in JWTs"""
+    return base64.urlsafe_b64decode(segment + '=' * (-len(segment) % 4))
+
+class TokenVerifier:
+    """
+    Verifies JWTs locally and keeps verified claims in an LRU until they expire,
+    so repeat requests with the same token cost one dictionary lookup.
+    """
+
+    def __init__(self, secret='', jwks_url='', cache_size=JWT_CACHE_SIZE, leeway=JWT_LEEWAY):
+        self.secret = secret.encode('utf-8')
+        self.jwks_url = jwks_url
+        self.cache_size = cache_size
+        self.leeway = leeway
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()  # token -> claims
+        self._lock = threading.Lock()
+        self._jwks = {}
+        self._jwks_fetched_at = 0.0
+
+    @property
+    def enabled(self):
+        return bool(self.secret or self.jwks_url)
+
+    def verify(self, token):
+        """
+        Return (claims, error). Both are None when local verification is off;
+        error is a short reason string for tokens that must be rejected.
+        """
+        if not self.enabled:
+            return None, None
+        if not isinstance(token, str):
+            return None, "malformed token"
+
+        now = time.time()
+        with self._lock:
+            claims = self._cache.get(token)
+            if claims is not None:
+                if self._is_expired(claims, now):
+                    del self._cache[token]
+                else:
+                    self._cache.move_to_end(token)
+                    self.hits += 1
+                    return claims, None
+            self.misses += 1
+
+        try:
+            header_segment, claims_segment, signature_segment = token.split('.')
+            header = json.loads(b64url_decode(header_segment))
+            claims = json.loads(b64url_decode(claims_segment))
+            signature = b64url_decode(signature_segment)
+        except (ValueError, TypeError):
+            return None, "malformed token"
+        if not self._well_formed(header, claims):
+            return None, "malformed token"
+
+        signing_input = f"{header_segment}.{claims_segment}".encode('ascii')
+        error = self._check_signature(header, signing_input, signature)
+        if error:
+            return None, error
+        if self._is_expired(claims, now):
+            return None, "token expired"
+        if claims.get('nbf') is not None and now + self.leeway < claims['nbf']:
+            return None, "token not yet valid"
+
+        with self._lock:
+            self._cache[token] = claims
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return claims, None
+
+    @staticmethod
+    def _well_formed(header, claims):
+        """Header and claims are JSON objects whose time and key id fields have usable types"""
+        if not isinstance(header, dict) or not isinstance(claims, dict):
+            return False
+        if not isinstance(header.get('kid'), (str, type(None))):
+            return False
+        for name in ('exp', 'nbf'):
+            value = claims.get(name)
+            if value is None:
+                continue
+            # bool is an int, and NaN compares false either way
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or value != value:
+                return False
+        return True
+
+    def _is_expired(self, claims, now):
+        exp = claims.get('exp')
+        return exp is not None and now > exp + self.leeway
+
+    def _check_signature(self, header, signing_input, signature):
+        alg = header.get('alg')
+        if alg == 'HS256' and self.secret:
+            expected = hmac.new(self.secret, signing_input, hashlib.sha256).digest()
+            return None if hmac.compare_digest(expected, signature) else "invalid signature"
+
+        if alg == 'RS256' and self.jwks_url:
+            key = self._jwks_key(header.get('kid'))
+            if key is None:
+                return "unknown signing key"
+            try:
+                from cryptography.exceptions import InvalidSignature
+                from cryptography.hazmat.primitives import hashes
+                from cryptography.hazmat.primitives.asymmetric import padding
+            except ImportError:
+                return "RS256 verification needs the cryptography package"
+            try:
+                key.verify(signature, signing_input, padding.PKCS1v15(), hashes.SHA256())
+                return None
+            except InvalidSignature:
+                return "invalid signature"
+
+        return f"unsupported algorithm {alg}"
+
+    def _jwks_key(self, kid):
+        """Look up an RSA public key by kid, refetching the JWKS when stale or unknown"""
+        with self._lock:
+            stale = time.time() - self._jwks_fetched_at > JWKS_CACHE_TTL
+            key = self._jwks.get(kid)
+        if key is not None and not stale:
+            return key
+
+        try:
+            from cryptography.hazmat.primitives.asymmetric import rsa
+            response = requests.get(self.jwks_url, timeout=5)
+            response.raise_for_status()
+            keys = {}
+            for jwk in response.json().get('keys', []):
+                if jwk.get('kty') != 'RSA':
+                    continue
+                numbers = rsa.RSAPublicNumbers(int.from_bytes(b64url_decode(jwk['e']), 'big'),
+                                               int.from_bytes(b64url_decode(jwk['n']), 'big'))
+                keys[jwk.get('kid')] = numbers.public_key()
+        except Exception as e:
+            app.logger.warning("JWKS refresh failed: %s", e)
+            return key
+
+        with self._lock:
+            self._jwks = keys
+            self._jwks_fetched_at = time.time()
+        return keys.get(kid)
+
+token_verifier = TokenVerifier(JWT_SECRET, JWT_JWKS_URL)
+
+# Warm start: map the previous run's index, then keep it current
+state_snapshot = StateSnapshot(SNAPSHOT_PATH) if SNAPSHOT_PATH else None
+snapshot_generation = index_generation
+if SNAPSHOT_PATH:
+    atexit.register(save_state_snapshot)
+    if SNAPSHOT_INTERVAL > 0:
+        threading.Thread(target=snapshot_loop, name='snapshot-writer', daemon=True).start()
+metadata_store = open_metadata_store(METADATA_DB_PATH) if METADATA_DB_PATH else None
+
+# Hot reload of tunable settings
+POSITIVE_SETTINGS = ('DDAS_BACKEND_POOL_SIZE', 'DDAS_BREAKER_FAILURES', 'DDAS_CHECK_HASH_TIMEOUT',
+                     'DDAS_UPLOAD_MIN_RATE', 'DDAS_BATCH_WORKERS', 'DDAS_HASH_CHUNK_SIZE',
+                     'DDAS_HASH_MAX_ACTIVE_JOBS', 'DDAS_HASH_AGING_RATE', 'DDAS_TREE_HASH_SEGMENT_SIZE',
+                     'DDAS_TREE_HASH_WORKERS', 'DDAS_JWT_CACHE_SIZE', 'DDAS_SHARD_MAX_ENTRIES',
+                     'DDAS_MAX_SHARDS')
+reload_lock = threading.Lock()
+config_stats = {"reloads": 0, "rejected": 0, "reloaded_at": None}
+
+def check_settings(values):
+    """Raise ValueError for tunable values the server cannot run with"""
+    for name, value in values.items():
+        if not isinstance(value, str) and value < 0:
+            raise ValueError(f"{name} must not be negative")
+    for name in POSITIVE_SETTINGS:
+        if values[name] <= 0:
+            raise ValueError(f"{name} must be positive")
+    if values['DDAS_HASH_CHUNK_SIZE'] % DIRECT_IO_ALIGNMENT:
+        raise ValueError(f"DDAS_HASH_CHUNK_SIZE must be a multiple of {DIRECT_IO_ALIGNMENT}")
+    if not isinstance(logging.getLevelName(values['DDAS_LOG_LEVEL']), int):
+        raise ValueError(f"DDAS_LOG_LEVEL {values['DDAS_LOG_LEVEL']!r} is not a log level")
+    if not values['DDAS_BACKEND_API_URL'].startswith(('http://', 'https://')):
+        raise ValueError("DDAS_BACKEND_API_URL must be an http:// or https:// URL")
+
+def apply_settings(changed):
+    """Push changed tunables into the objects that copied them at startup"""
+    global backend_client, hedge_pool
+    if 'DDAS_LOG_LEVEL' in changed:
+        logging.getLogger().setLevel(LOG_LEVEL)
+    if changed.keys() & {'DDAS_HASH_MAX_ACTIVE_JOBS', 'DDAS_HASH_BANDWIDTH_LIMIT', 'DDAS_HASH_AGING_RATE',
+                         'DDAS_HASH_BULK_PENALTY'}:
+        hash_scheduler.configure(HASH_MAX_ACTIVE_JOBS, HASH_BANDWIDTH_LIMIT, HASH_AGING_RATE, HASH_BULK_PENALTY)
+    if changed.keys() & {'DDAS_HASH_CHUNK_SIZE', 'DDAS_HASH_MEMORY_BUDGET'}:
+        buffer_pool.resize(HASH_CHUNK_SIZE, HASH_MEMORY_BUDGET)
+    backend_breaker.failure_threshold = max(1, BREAKER_FAILURES)
+    backend_breaker.reset_timeout = BREAKER_RESET_SECONDS
+    upload_timeouts.minimum = UPLOAD_TIMEOUT_MIN
+    upload_timeouts.maximum = UPLOAD_TIMEOUT_MAX
+    upload_timeouts.min_rate = UPLOAD_MIN_RATE
+    backend_probe.interval = BACKEND_PROBE_INTERVAL
+    backend_probe.url = f"{BACKEND_API_URL}/health"
+    token_verifier.cache_size = JWT_CACHE_SIZE
+    token_verifier.leeway = JWT_LEEWAY
+    if 'DDAS_SHARD_MAX_ENTRIES' in changed:
+        with user_shards_lock:
+            for shard in user_shards.values():
+                shard.max_entries = SHARD_MAX_ENTRIES  # Takes effect at the shard's next insert
+    if changed.keys() & {'DDAS_BACKEND_API_URL', 'DDAS_BACKEND_POOL_SIZE'}:
+        # Calls in flight finish on the old client and pool; the old pool's
+        # threads exit once its queued attempts are done
+        with backend_client_lock:
+            backend_client = None
+        old_pool, hedge_pool = hedge_pool, ThreadPoolExecutor(max_workers=BACKEND_POOL_SIZE,
+                                                              thread_name_prefix='hedge')
+        old_pool.shutdown(wait=False)
+
+def reload_settings(reason):
+    """
+    Re-read the config file and environment and apply the tunable settings.
+    Every value is parsed and checked before any is applied, so an invalid
+    file changes nothing (ValueError or OSError). Returns the changed
+    settings as {name: [old, new]} and the changed ones that need a restart.
+    """
+    with reload_lock:
+        try:
+            file_values = read_config_file()
+            values = {}
+            for name, (parse, default) in TUNABLES.items():
+                raw = file_values.get(name, os.environ.get(name, default))
+                try:
+                    values[name] = parse(raw)
+                except (TypeError, ValueError):
+                    raise ValueError(f"{name}: invalid value {raw!r}") from None
+            check_settings(values)
+        except (OSError, ValueError) as e:
+            config_stats["rejected"] += 1
+            app.logger.error("Configuration reload (%s) rejected: %s", reason, e)
+            raise
+
+        changed = {name: [globals()[name[5:]], value] for name, value in values.items()
+                   if globals()[name[5:]] != value}
+        restart_required = sorted(name for name, (value, default) in SETTINGS.items() if name not in TUNABLES
+                                  and file_values.get(name, os.environ.get(name, default)) != value)
+        unknown = sorted(set(file_values) - set(SETTINGS))
+        globals().update({name[5:]: new for name, (old, new) in changed.items()})
+        apply_settings(changed)
+        config_stats["reloads"] += 1
+        config_stats["reloaded_at"] = datetime.now().isoformat(timespec='seconds')
+
+    app.logger.info("Configuration reloaded (%s): %s changed", reason,
+                    ', '.join(f"{name}={new}" for name, (old, new) in changed.items()) or "nothing")
+    if restart_required:
+        app.logger.warning("Only applied after a restart: %s", ', '.join(restart_required))
+    if unknown:
+        app.logger.warning("Unknown settings in %s: %s", CONFIG_PATH, ', '.join(unknown))
+    return changed, restart_required
+
+def handle_sighup(signum, frame):
+    def reload_from_signal():
+        try:
+            reload_settings('SIGHUP')
+        except (OSError, ValueError):
+            pass  # Already logged; the running settings stay in force
+    # Not in the handler itself: it interrupts the main thread, which may hold locks a reload takes
+    threading.Thread(target=reload_from_signal, name='config-reload', daemon=True).start()
+
+unknown_settings = sorted(set(config_file) - set(SETTINGS))
+if unknown_settings:
+    app.logger.warning("Unknown settings in %s: %s", CONFIG_PATH, ', '.join(unknown_settings))
+
+@app.route('/admin/reload', methods=['POST'])
+def reload_config():
+    """Apply the config file's tunable settings to the running server"""
+    denied = admin_denied()
+    if denied:
+        return denied
+    try:
+        changed, restart_required = reload_settings('admin request')
+    except (OSError, ValueError) as e:
+        return jsonify({"success": False, "error": f"Configuration not applied: {e}"}), 400
+    return jsonify({"success": True, "changed": changed, "restart_required": restart_required})
+
+@app.route('/admin/config', methods=['GET'])
+def show_config():
+    """Current values of the tunable settings"""
+    denied = admin_denied()
+    if denied:
+        return denied
+    return jsonify({
+        "success": True,
+        "config_path": CONFIG_PATH,
+        "settings": {name: globals()[name[5:]] for name in TUNABLES},
+        **config_stats
+    })
+
 @app.errorhandler(404)
 def not_found(error):
     return jsonify({"success": False, "error": "Endpoint not found"}), 404
@@ -247,18 +3268,52 @@ def not_found(error):
 def internal_error(error):
     return jsonify({"success": False, "error": "Internal server error"}), 500
 
+READY_AT = None  # Set by mark_ready once every listener is bound
+
+def mark_ready():
+    """Record time to ready: imports, snapshot load and binding the sockets"""
+    global READY_AT
+    READY_AT = time.monotonic()
+
+def serve_unix_socket(path):
+    """Serve the app on a Unix domain socket from a background thread"""
+    from werkzeug.serving import make_server
+
+    # Clear a stale socket from a previous run, but never a regular file
+    if os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode):
+        os.remove(path)
+    # Only the user running the server may connect. The umask makes the socket
+    # 0600 as it is created, so there is no window where others can connect
+    old_umask = os.umask(0o177)
+    try:
+        unix_server = make_server(f"unix://{path}", 0, app, threaded=True)
+    finally:
+        os.umask(old_umask)
+    threading.Thread(target=unix_server.serve_forever, name='unix-socket-server', daemon=True).start()
+    return unix_server
+
 if __name__ == '__main__':
     print("🚀 Starting DDAS Local HTTP Server...")
-    print("📡 Server will run on: http://localhost:5001")
+    print(f"📡 Server will run on: http://localhost:{PORT}")
     print("🔗 Main endpoint: POST /process")
     print("❤️ Health check: GET /health")
-    print("📋 Logs: server.log")
+    print(f"📋 Logs: {LOG_PATH}")
     print("🛑 Press Ctrl+C to stop")
 
-    # Start the Flask server
-    app.run(
-        host='0.0.0.0',  # Accept connections from any IP (for localhost)
-        port=5001,        # Using 5001 for local HTTP server
-        debug=False,      # Set to True for development
+    if UNIX_SOCKET_PATH:
+        serve_unix_socket(UNIX_SOCKET_PATH)
+        print(f"🔌 Also listening on unix://{UNIX_SOCKET_PATH}")
+    if hasattr(signal, 'SIGHUP'):
+        signal.signal(signal.SIGHUP, handle_sighup)
+        print(f"🔄 Reload settings from {CONFIG_PATH}: kill -HUP {os.getpid()}")
+
+    # Start the Flask server; binding before serving lets time to ready cover the bind
+    from werkzeug.serving import make_server
+    http_server = make_server(
+        '0.0.0.0',        # Accept connections from any IP (for localhost)
+        PORT,             # 5001 unless DDAS_PORT says otherwise
+        app,
         threaded=True     # Handle multiple requests
     )
+    mark_ready()
+    http_server.serve_forever()
@@ -0,0 +1,209 @@
+"""
+In-process stand-in for the Spring Boot file API, for testing the Python
+path without the Java stack or S3.
+
+Serves GET /api/files/check-hash/<hash>, POST /api/files/upload and
+GET /api/files/health. Uploads are hashed and remembered in memory (names
+only, never content); uploading a known hash answers 409 like the real
+backend. Latency, server errors and spurious 409s can be injected.
+
+With a trace file it also stands in for a tracing collector: OTLP/HTTP JSON
+posted to /v1/traces and a span for each traced backend call are appended
+there as JSON lines, in the same shape server.py writes to a file.
+
+    python3 stub_backend.py --port 8080 --latency-ms 20 --trace-file spans.jsonl
+    DDAS_BACKEND_API_URL=http://127.0.0.1:8080/api/files \
+    DDAS_TRACE_EXPORT=http://127.0.0.1:8080/v1/traces python3 server.py
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+
+from flask import Flask, jsonify, request
+from werkzeug.serving import make_server
+
+class StubFaults:
+    """
+    Injected behaviour, changeable while the stub runs. Latency is
+    latency_ms plus up to jitter_ms, per request; error_rate answers 500 and
+    conflict_rate answers 409 to uploads of new content.
+    """
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, conflict_rate=0.0, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.conflict_rate = conflict_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def roll(self, rate):
+        with self._lock:
+            return rate > 0 and self._random.random() < rate
+
+    def delay(self):
+        with self._lock:
+            seconds = (self.latency_ms + self._random.random() * self.jitter_ms) / 1000
+        if seconds > 0:
+            time.sleep(seconds)
+
+TRACEPARENT_PATTERN = re.compile(r'00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}')
+OTLP_KINDS = {1: "internal", 2: "server", 3: "client"}
+
+def otlp_attribute(value):
+    for key in ('stringValue', 'boolValue', 'doubleValue'):
+        if key in value:
+            return value[key]
+    return int(value['intValue']) if 'intValue' in value else None
+
+def flatten_otlp(body):
+    """OTLP/HTTP JSON export -> span dicts in server.py's file format"""
+    for resource_spans in body.get('resourceSpans', []):
+        resource = {a['key']: otlp_attribute(a['value'])
+                    for a in resource_spans.get('resource', {}).get('attributes', [])}
+        for scope_spans in resource_spans.get('scopeSpans', []):
+            for span in scope_spans.get('spans', []):
+                start, end = int(span['startTimeUnixNano']), int(span['endTimeUnixNano'])
+                status = span.get('status', {})
+                yield {
+                    "trace_id": span['traceId'],
+                    "span_id": span['spanId'],
+                    "parent_span_id": span.get('parentSpanId') or None,
+                    "name": span['name'],
+                    "start_unix_nano": start,
+                    "duration_ms": round((end - start) / 1e6, 3),
+                    "kind": OTLP_KINDS.get(span.get('kind'), "internal"),
+                    "service": resource.get('service.name'),
+                    "attributes": {a['key']: otlp_attribute(a['value']) for a in span.get('attributes', [])},
+                    "error": status.get('message') if status.get('code') == 2 else None,
+                }
+
+def create_stub_backend(faults=None, trace_path=None):
+    """
+    Build the stub Flask app; its counters are on app.config['STUB_STATS'].
+    With trace_path, spans are appended there (see the module docstring).
+    """
+    faults = faults or StubFaults()
+    stub = Flask('stub_backend')
+    known = {}  # sha256 -> filename
+    stats = {"check_hash": 0, "uploads": 0, "conflicts": 0, "errors": 0, "spans": 0}
+    lock = threading.Lock()
+    stub.config['STUB_FAULTS'] = faults
+    stub.config['STUB_STATS'] = stats
+
+    def count(key, amount=1):
+        with lock:
+            stats[key] += amount
+
+    def write_spans(spans):
+        if not trace_path or not spans:
+            return
+        with lock, open(trace_path, 'a', encoding='utf-8') as f:
+            f.write(''.join(json.dumps(span) + '\n' for span in spans))
+            stats["spans"] += len(spans)
+
+    @stub.before_request
+    def start_span():
+        request.environ['stub.start_ns'] = time.time_ns()
+
+    @stub.after_request
+    def record_span(response):
+        """A server span for each backend call that carried a traceparent"""
+        match = TRACEPARENT_PATTERN.fullmatch(request.headers.get('traceparent', '').strip())
+        if match and trace_path and request.path.startswith('/api/files/'):
+            start = request.environ['stub.start_ns']
+            write_spans([{
+                "trace_id": match.group(1),
+                "span_id": os.urandom(8).hex(),
+                "parent_span_id": match.group(2),
+                "name": f"backend {request.method} {request.url_rule.rule if request.url_rule else request.path}",
+                "start_unix_nano": start,
+                "duration_ms": round((time.time_ns() - start) / 1e6, 3),
+                "kind": "server",
+                "service": "stub-backend",
+                "attributes": {"http.status_code": response.status_code},
+                "error": f"HTTP {response.status_code}" if response.status_code >= 500 else None,
+            }])
+        return response
+
+    @stub.route('/v1/traces', methods=['POST'])
+    def collect_traces():
+        write_spans(list(flatten_otlp(request.get_json(force=True))))
+        return jsonify({})
+
+    def injected_error():
+        faults.delay()
+        if faults.roll(faults.error_rate):
+            count('errors')
+            return jsonify({"success": False, "error": "Injected failure"}), 500
+        return None
+
+    @stub.route('/api/files/health')
+    def health():
+        return jsonify({"status": "ok", "known": len(known)})
+
+    @stub.route('/api/files/check-hash/<file_hash>')
+    def check_hash(file_hash):
+        count('check_hash')
+        error = injected_error()
+        if error:
+            return error
+        filename = known.get(file_hash)
+        if filename is not None:
+            return jsonify({"exists": True, "filename": filename})
+        return jsonify({"exists": False})
+
+    @stub.route('/api/files/upload', methods=['POST'])
+    def upload():
+        count('uploads')
+        error = injected_error()
+        if error:
+            return error
+        upload = request.files['file']
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: upload.stream.read(1024 * 1024), b''):
+            digest.update(chunk)
+        file_hash = digest.hexdigest()
+        with lock:
+            existing = known.get(file_hash)
+            conflict = existing is not None or faults.roll(faults.conflict_rate)
+            if not conflict:
+                known[file_hash] = upload.filename
+        if conflict:
+            count('conflicts')
+            return jsonify({"success": False, "existingFileName": existing or f"stub-{file_hash[:12]}"}), 409
+        return jsonify({"success": True, "fileHash": file_hash}), 201
+
+    return stub
+
+def start_stub_backend(faults=None, host='127.0.0.1', port=0, trace_path=None):
+    """Serve a stub backend on a background thread; returns (base URL, server)"""
+    stub = create_stub_backend(faults, trace_path)
+    http_server = make_server(host, port, stub, threaded=True)
+    threading.Thread(target=http_server.serve_forever, daemon=True).start()
+    return f"http://{host}:{http_server.server_port}/api/files", http_server
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Stub DDAS file backend')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Added to every check-hash and upload')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='Extra random latency, up to this much')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests answered with 500')
+    parser.add_argument('--conflict-rate', type=float, default=0.0,
+                        help='Share of new uploads answered with 409')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--trace-file', help='Collect spans here (OTLP at /v1/traces and traced backend calls)')
+    args = parser.parse_args()
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+    faults = StubFaults(args.latency_ms, args.jitter_ms, args.error_rate, args.conflict_rate, args.seed)
+    http_server = make_server(args.host, args.port, create_stub_backend(faults, args.trace_file), threaded=True)
+    print(f"Stub backend: http://{args.host}:{http_server.server_port}/api/files")
+    http_server.serve_forever()
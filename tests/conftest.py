@@ -0,0 +1,16 @@
+"""Configure the server for in-process tests before anything imports it."""
+import os
+import sys
+import tempfile
+
+_tmp = tempfile.mkdtemp(prefix='ddas-tests-')
+# server.py reads its settings at import time
+os.environ.update({
+    'DDAS_SNAPSHOT_PATH': '',
+    'DDAS_METADATA_DB': '',
+    'DDAS_LOG_PATH': os.path.join(_tmp, 'server.log'),
+    'DDAS_CONFIG': os.path.join(_tmp, 'ddas_config.json'),
+    'DDAS_LOG_LEVEL': 'WARNING',
+    'DDAS_BACKEND_API_URL': 'http://127.0.0.1:9/api/files',
+})
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
@@ -0,0 +1,59 @@
+import pytest
+
+import server
+
+TOKEN = 'admin-secret'
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(server, 'ADMIN_TOKEN', TOKEN)
+    monkeypatch.setattr(server, 'PROFILING_ENABLED', True)
+    return server.app.test_client()
+
+
+def test_profile_needs_token(client):
+    assert client.get('/admin/profile?seconds=0.1').status_code == 403
+    response = client.get('/admin/profile?seconds=0.1', headers={'X-DDAS-Admin-Token': 'wrong'})
+    assert response.status_code == 403
+    response = client.get('/admin/profile?seconds=0.1', headers={'X-DDAS-Admin-Token': 'wröng'})
+    assert response.status_code == 403
+
+
+def test_profile_with_token(client):
+    response = client.get('/admin/profile?seconds=0.1&format=json', headers={'X-DDAS-Admin-Token': TOKEN})
+    assert response.status_code == 200
+    assert response.get_json()['success'] is True
+
+
+def test_profile_disabled_without_configured_token(client, monkeypatch):
+    monkeypatch.setattr(server, 'ADMIN_TOKEN', '')
+    # Local callers, as every browser page's requests are, no longer get in
+    response = client.get('/admin/profile?seconds=0.1', environ_base={'REMOTE_ADDR': '127.0.0.1'})
+    assert response.status_code == 403
+    assert 'DDAS_ADMIN_TOKEN' in response.get_json()['error']
+
+
+@pytest.mark.parametrize('method, path', [('POST', '/admin/reload'), ('GET', '/admin/config')])
+def test_config_endpoints_need_token(client, monkeypatch, method, path):
+    assert client.open(path, method=method).status_code == 403
+    assert client.open(path, method=method, headers={'X-DDAS-Admin-Token': 'wrong'}).status_code == 403
+    monkeypatch.setattr(server, 'ADMIN_TOKEN', '')
+    assert client.open(path, method=method, environ_base={'REMOTE_ADDR': '127.0.0.1'}).status_code == 403
+
+
+def test_config_with_token(client):
+    response = client.get('/admin/config', headers={'X-DDAS-Admin-Token': TOKEN})
+    assert response.status_code == 200
+    assert 'DDAS_HASH_MAX_ACTIVE_JOBS' in response.get_json()['settings']
+
+
+def test_admin_endpoints_are_not_shared_cross_origin(client):
+    origin = {'Origin': 'https://example.com'}
+    assert 'Access-Control-Allow-Origin' in client.get('/health', headers=origin).headers
+    for path in ('/admin/reload', '/admin/config', '/admin/profile'):
+        preflight = client.options(path, headers={**origin, 'Access-Control-Request-Method': 'POST',
+                                                  'Access-Control-Request-Headers': 'X-DDAS-Admin-Token'})
+        assert 'Access-Control-Allow-Origin' not in preflight.headers
+    response = client.get('/admin/config', headers={**origin, 'X-DDAS-Admin-Token': TOKEN})
+    assert 'Access-Control-Allow-Origin' not in response.headers
@@ -0,0 +1,78 @@
+import hashlib
+import threading
+import uuid
+
+import pytest
+
+import server
+
+
+class Response:
+    def __init__(self, exists):
+        self.status_code = 200
+        self._exists = exists
+
+    def json(self):
+        return {"exists": self._exists, "filename": "backend.bin"}
+
+
+class Backend:
+    """Knows the hashes in `known`; records every check-hash URL asked about"""
+
+    def __init__(self, known=()):
+        self.known = set(known)
+        self.urls = []
+        self.lock = threading.Lock()
+
+    def get(self, url, **kwargs):
+        with self.lock:
+            self.urls.append(url)
+        return Response(url.rsplit('/', 1)[1] in self.known)
+
+
+def member(i, size):
+    data = f"member {i}".encode()
+    return {"name": f"m{i}.bin", "size": size, "sha256": hashlib.sha256(data).hexdigest(),
+            "fast_hash": hashlib.blake2b(data).hexdigest()}
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    backend = Backend()
+    monkeypatch.setattr(server, 'get_backend_client', lambda: backend)
+    monkeypatch.setattr(server, 'HEDGE_CHECK_HASH', True)
+    monkeypatch.setattr(server, 'stage_latency', server.LatencyTracker())
+    return backend
+
+
+def test_backend_checks_are_capped_largest_first(backend, monkeypatch):
+    monkeypatch.setattr(server, 'ARCHIVE_MAX_BACKEND_CHECKS', 3)
+    members = [member(i, size) for i, size in enumerate([10, 500, 20, 400, 300, 30])]
+    backend.known = {members[1]['sha256'], members[2]['sha256']}
+    report = server.find_known_members(f"user-{uuid.uuid4()}", 'zip', members, {})
+    asked = {url.rsplit('/', 1)[1] for url in backend.urls}
+    assert asked == {members[1]['sha256'], members[3]['sha256'], members[4]['sha256']}
+    assert [m['name'] for m in report['known_members']] == ['m1.bin']
+    assert report['backend_checked'] and report['backend_limit_reached']
+
+
+def test_index_hits_are_not_sent_to_the_backend(backend):
+    user_id = f"user-{uuid.uuid4()}"
+    members = [member(i, 100) for i in range(4)]
+    server.remember_hash(user_id, members[0]['fast_hash'], members[0]['sha256'], 'local.bin')
+    report = server.find_known_members(user_id, 'tar', members, {})
+    assert len(backend.urls) == 3
+    assert report['known_members'][0]['original_filename'] == 'local.bin'
+    assert not report['backend_limit_reached']
+
+
+def test_member_checks_are_not_hedged_or_in_the_hedge_histogram(backend, monkeypatch):
+    def no_hedging(fn):
+        raise AssertionError("member lookups must not use the hedge pool")
+
+    monkeypatch.setattr(server, 'submit_hedged', no_hedging)
+    server.find_known_members(f"user-{uuid.uuid4()}", 'zip', [member(i, 100) for i in range(5)], {})
+    assert len(backend.urls) == 5
+    stages = server.stage_latency.summary()
+    assert 'check_hash_attempt' not in stages
+    assert stages['member_check']['count'] == 5
@@ -0,0 +1,99 @@
+import threading
+import time
+
+import server
+
+
+def test_backend_counters_do_not_lose_updates(monkeypatch):
+    monkeypatch.setattr(server, 'backend_stats', server.Counter(hedged=0, hedge_wins=0, retries=0))
+    start = threading.Barrier(8)
+
+    def count():
+        start.wait()
+        for _ in range(20000):
+            server.count_backend('hedged')
+
+    threads = [threading.Thread(target=count) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert server.backend_stats['hedged'] == 160000
+
+
+def test_health_reports_backend_counters(monkeypatch):
+    monkeypatch.setattr(server, 'backend_stats', server.Counter(hedged=3, hedge_wins=1, retries=2))
+    backend = server.app.test_client().get('/health').get_json()['backend']
+    assert (backend['hedged'], backend['hedge_wins'], backend['retries']) == (3, 1, 2)
+
+
+def test_cache_counters_do_not_lose_updates(monkeypatch):
+    monkeypatch.setattr(server, 'cache_stats', server.Counter())
+    start = threading.Barrier(8)
+
+    def count():
+        start.wait()
+        for _ in range(20000):
+            server.count_cache('index_hits')
+
+    threads = [threading.Thread(target=count) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert server.cache_stats['index_hits'] == 160000
+
+
+class SlowBackend:
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.calls = 0
+
+    def get(self, url, **kwargs):
+        self.calls += 1
+        time.sleep(self.seconds)
+        return FakeResponse()
+
+
+class FakeResponse:
+    status_code = 200
+
+    def json(self):
+        return {"exists": False}
+
+
+def test_time_queued_in_the_hedge_pool_does_not_trigger_a_hedge(monkeypatch):
+    # One worker, busy for longer than the hedge delay: the attempt waits in
+    # the queue, then answers well within the delay once it runs
+    pool = server.ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(server, 'hedge_pool', pool)
+    monkeypatch.setattr(server, 'HEDGE_CHECK_HASH', True)
+    monkeypatch.setattr(server, 'HEDGE_MIN_DELAY_MS', 100)
+    monkeypatch.setattr(server, 'stage_latency', server.LatencyTracker())
+    monkeypatch.setattr(server, 'backend_stats', server.Counter(hedged=0, hedge_wins=0, retries=0))
+    backend = SlowBackend(0.01)
+    monkeypatch.setattr(server, 'get_backend_client', lambda: backend)
+    try:
+        pool.submit(time.sleep, 0.3)
+        response = server.check_hash_request('ab' * 32, {})
+        assert response.status_code == 200
+        assert backend.calls == 1
+        assert server.backend_stats['hedged'] == 0
+    finally:
+        pool.shutdown()
+
+
+def test_slow_attempt_is_hedged(monkeypatch):
+    pool = server.ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(server, 'hedge_pool', pool)
+    monkeypatch.setattr(server, 'HEDGE_CHECK_HASH', True)
+    monkeypatch.setattr(server, 'HEDGE_MIN_DELAY_MS', 50)
+    monkeypatch.setattr(server, 'stage_latency', server.LatencyTracker())
+    monkeypatch.setattr(server, 'backend_stats', server.Counter(hedged=0, hedge_wins=0, retries=0))
+    backend = SlowBackend(0.3)
+    monkeypatch.setattr(server, 'get_backend_client', lambda: backend)
+    try:
+        server.check_hash_request('ab' * 32, {})
+        assert server.backend_stats['hedged'] == 1
+    finally:
+        pool.shutdown()
@@ -0,0 +1,127 @@
+import hashlib
+import os
+import threading
+import time
+
+import pytest
+
+import server
+
+KB = 1024
+
+
+def test_sizes_and_stats():
+    pool = server.BufferPool(64 * KB, 256 * KB)
+    assert pool.stats() == {"buffers": 4, "in_use": 0, "buffer_size": 64 * KB, "waits": 0}
+    with pool.buffer() as buffer:
+        assert len(buffer) == 64 * KB
+        assert pool.stats()["in_use"] == 1
+    assert pool.stats()["in_use"] == 0
+    assert server.BufferPool(64 * KB, 1).count == 1  # A budget below one buffer still gets one
+
+
+def test_buffers_are_reused_not_reallocated():
+    pool = server.BufferPool(4 * KB, 4 * KB)
+    with pool.buffer() as first:
+        pass
+    with pool.buffer() as second:
+        assert second is first
+
+
+def test_buffer_is_returned_when_the_block_raises():
+    pool = server.BufferPool(4 * KB, 4 * KB)
+    with pytest.raises(RuntimeError):
+        with pool.buffer():
+            raise RuntimeError("read failed")
+    assert pool.stats()["in_use"] == 0
+    with pool.buffer():
+        pass
+
+
+def test_exhausted_pool_blocks_until_a_buffer_comes_back():
+    pool = server.BufferPool(4 * KB, 4 * KB)
+    got = threading.Event()
+
+    def borrow():
+        with pool.buffer():
+            got.set()
+
+    with pool.buffer():
+        thread = threading.Thread(target=borrow)
+        thread.start()
+        assert not got.wait(0.1)
+        assert pool.stats()["waits"] == 1
+    assert got.wait(2)
+    thread.join()
+
+
+def test_each_buffer_is_lent_to_one_reader_at_a_time():
+    pool = server.BufferPool(4 * KB, 8 * KB)
+    lock = threading.Lock()
+    lent, errors, peak = [0], [], [0]
+
+    def work(n):
+        marker = bytes([n]) * 16
+        for _ in range(50):
+            with pool.buffer() as buffer:
+                with lock:
+                    lent[0] += 1
+                    peak[0] = max(peak[0], lent[0])
+                buffer[:16] = marker
+                time.sleep(0.0005)
+                if buffer[:16] != marker:
+                    errors.append(n)
+                with lock:
+                    lent[0] -= 1
+
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert peak[0] == 2
+    assert pool.stats()["waits"] > 0
+
+
+def test_resize_while_buffers_are_lent():
+    pool = server.BufferPool(4 * KB, 16 * KB)
+    with pool.buffer() as a, pool.buffer() as b, pool.buffer() as c:
+        pool.resize(8 * KB, 16 * KB)
+        assert pool.stats() == {"buffers": 2, "in_use": 3, "buffer_size": 8 * KB, "waits": 0}
+        assert len(a) == len(b) == len(c) == 4 * KB
+    # Old-size buffers came back as one new-size buffer (the pool is now two)
+    assert pool.stats()["in_use"] == 0
+    assert len(pool._free) == 2
+    with pool.buffer() as first, pool.buffer() as second:
+        assert len(first) == len(second) == 8 * KB
+
+
+def test_resize_wakes_waiters_when_growing():
+    pool = server.BufferPool(4 * KB, 4 * KB)
+    got = threading.Event()
+
+    def borrow():
+        with pool.buffer():
+            got.set()
+
+    with pool.buffer():
+        thread = threading.Thread(target=borrow)
+        thread.start()
+        assert not got.wait(0.1)
+        pool.resize(4 * KB, 8 * KB)
+        assert got.wait(2)
+    thread.join()
+
+
+def test_hashing_through_a_small_pool(tmp_path, monkeypatch):
+    path = tmp_path / 'data.bin'
+    data = os.urandom(300 * KB + 123)
+    path.write_bytes(data)
+    monkeypatch.setattr(server, 'buffer_pool', server.BufferPool(16 * KB, 32 * KB))
+    assert server.calculate_file_hash(str(path)) == hashlib.sha256(data).hexdigest()
+    small = server.calculate_tree_hash(str(path), segment_size=64 * KB, workers=4)
+    assert small is not None
+    monkeypatch.setattr(server, 'buffer_pool', server.BufferPool(64 * KB, 1024 * KB))
+    assert server.calculate_tree_hash(str(path), segment_size=64 * KB, workers=4) == small
+    assert server.buffer_pool.stats()["in_use"] == 0
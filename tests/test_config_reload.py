@@ -0,0 +1,41 @@
+import threading
+
+import server
+
+
+def test_reload_retires_old_hedge_pool(monkeypatch):
+    monkeypatch.setattr(server, 'hedge_pool', server.ThreadPoolExecutor(max_workers=2))
+    old_pool = server.hedge_pool
+    release = threading.Event()
+    in_flight = old_pool.submit(release.wait, 5)
+
+    server.apply_settings({'DDAS_BACKEND_POOL_SIZE': [2, server.BACKEND_POOL_SIZE]})
+    try:
+        assert server.hedge_pool is not old_pool
+        release.set()
+        assert in_flight.result(timeout=5) is True  # Work already queued still finishes
+        for thread in list(old_pool._threads):
+            thread.join(5)
+            assert not thread.is_alive()
+        assert server.submit_hedged(lambda: 'ok').result(timeout=5) == 'ok'
+    finally:
+        server.hedge_pool.shutdown()
+
+
+def test_submit_hedged_follows_a_replaced_pool(monkeypatch):
+    retired = server.ThreadPoolExecutor(max_workers=1)
+    current = server.ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(server, 'hedge_pool', retired)
+    submit = retired.submit
+
+    def reload_then_submit(fn):
+        # A reload swaps and shuts down the pool between the read and the submit
+        server.hedge_pool = current
+        retired.shutdown()
+        return submit(fn)
+
+    monkeypatch.setattr(retired, 'submit', reload_then_submit)
+    try:
+        assert server.submit_hedged(lambda: 'ok').result(timeout=5) == 'ok'
+    finally:
+        current.shutdown()
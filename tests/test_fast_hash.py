@@ -0,0 +1,57 @@
+import hashlib
+import os
+import uuid
+
+import server
+
+
+class FakeResponse:
+    def __init__(self, status_code, data=None):
+        self.status_code = status_code
+        self._data = data or {}
+
+    def json(self):
+        return self._data
+
+
+def test_new_file_is_read_once_for_both_digests(tmp_path, monkeypatch):
+    data = os.urandom(3 * 1024 * 1024 + 17)
+    path = tmp_path / 'new.bin'
+    path.write_bytes(data)
+    reads = []
+    read_file_chunks = server.read_file_chunks
+
+    def counting_reads(*args, **kwargs):
+        reads.append(args[0])
+        return read_file_chunks(*args, **kwargs)
+
+    monkeypatch.setattr(server, 'read_file_chunks', counting_reads)
+    monkeypatch.setattr(server, 'HASH_ALGORITHM', 'blake2b')
+    monkeypatch.setattr(server, 'TREE_HASH_MIN_SIZE', 0)
+    monkeypatch.setattr(server, 'HEDGE_CHECK_HASH', False)
+    monkeypatch.setattr(server, 'check_hash_request', lambda file_hash, headers: FakeResponse(404))
+    monkeypatch.setattr(server, 'post_multipart', lambda url, headers, upload, timeout: FakeResponse(201))
+    user_id = f"user-{uuid.uuid4()}"
+
+    result = server.check_and_upload(str(path), 'token', False, user_id)
+    assert result['file_hash'] == hashlib.sha256(data).hexdigest()
+    assert reads == [str(path)]
+
+    # The same bytes again are answered from the local index by the fast key
+    reads.clear()
+    copy = tmp_path / 'copy.bin'
+    copy.write_bytes(data)
+    result = server.check_and_upload(str(copy), 'token', False, user_id)
+    assert result['duplicate'] and result['original_filename'] == 'new.bin'
+    assert result['fast_hash'] == hashlib.blake2b(data).hexdigest()
+    assert result['file_hash'] == hashlib.sha256(data).hexdigest()
+    assert len(reads) == 1
+
+
+def test_calculate_file_hashes(tmp_path):
+    data = os.urandom(100000)
+    path = tmp_path / 'data.bin'
+    path.write_bytes(data)
+    assert server.calculate_file_hashes(str(path), ('blake2b', 'sha256')) == [
+        hashlib.blake2b(data).hexdigest(), hashlib.sha256(data).hexdigest()]
+    assert server.calculate_file_hashes(str(tmp_path / 'missing'), ('sha256',)) is None
@@ -0,0 +1,98 @@
+import threading
+import time
+
+import server
+
+
+def start(target):
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_interactive_job_preempts_aged_bulk_job():
+    # Slow aging makes the big interactive job's virtual start far later than
+    # the bulk job's, as for a bulk hash that has been running for a while
+    scheduler = server.HashScheduler(1, aging_rate=1024 ** 2, bulk_penalty=0.05)
+    bulk_running, stop = threading.Event(), threading.Event()
+    order = []
+
+    def bulk():
+        with scheduler.job(0, interactive=False, owner='alice'):
+            bulk_running.set()
+            deadline = time.monotonic() + 5
+            while not stop.is_set() and time.monotonic() < deadline:
+                scheduler.checkpoint(4096)
+                time.sleep(0.001)
+        order.append('bulk done')
+
+    def interactive():
+        with scheduler.job(64 * 1024 ** 2, interactive=True, owner='alice'):
+            order.append('interactive')
+
+    bulk_thread = start(bulk)
+    assert bulk_running.wait(2)
+    interactive_thread = start(interactive)
+    interactive_thread.join(2)
+    stop.set()
+    bulk_thread.join(2)
+    assert order == ['interactive', 'bulk done']
+    assert scheduler.stats()['active'] == 0
+
+
+def test_waiting_jobs_run_shortest_first_and_bulk_last():
+    scheduler = server.HashScheduler(1, aging_rate=1024 ** 2, bulk_penalty=10)
+    gate, order, threads = threading.Event(), [], []
+
+    def run(name, size, interactive):
+        with scheduler.job(size, interactive=interactive):
+            order.append(name)
+
+    def blocker():
+        with scheduler.job(0):
+            gate.wait(2)
+
+    threads.append(start(blocker))
+    while scheduler.stats()['active'] == 0:
+        time.sleep(0.001)
+    for name, size, interactive in [('bulk', 0, False), ('large', 4 * 1024 ** 2, True),
+                                    ('small', 1024, True)]:
+        threads.append(start(lambda n=name, s=size, i=interactive: run(n, s, i)))
+        while scheduler.stats()['queued'] < len(threads) - 1:
+            time.sleep(0.001)
+    assert scheduler.stats()['interactive_queued'] == 2
+    gate.set()
+    for thread in threads:
+        thread.join(2)
+    assert order == ['small', 'large', 'bulk']
+
+
+def test_least_served_owner_goes_first():
+    scheduler = server.HashScheduler(2, aging_rate=1024 ** 2)
+    gates, order, threads = [threading.Event(), threading.Event()], [], []
+
+    def hold(gate):
+        with scheduler.job(0, owner='alice'):
+            gate.wait(2)
+
+    def run(owner, size):
+        with scheduler.job(size, owner=owner):
+            order.append(owner)
+
+    threads += [start(lambda: hold(gates[0])), start(lambda: hold(gates[1]))]
+    while scheduler.stats()['active'] < 2:
+        time.sleep(0.001)
+    threads.append(start(lambda: run('alice', 0)))
+    while scheduler.stats()['queued'] < 1:
+        time.sleep(0.001)
+    threads.append(start(lambda: run('bob', 8 * 1024 ** 2)))
+    while scheduler.stats()['queued'] < 2:
+        time.sleep(0.001)
+    # alice still holds a slot, so the freed one goes to bob despite his larger file
+    gates[0].set()
+    while scheduler.stats()['queued'] > 1:
+        time.sleep(0.001)
+    gates[1].set()
+    for thread in threads:
+        thread.join(2)
+    assert order == ['bob', 'alice']
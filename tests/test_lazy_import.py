@@ -0,0 +1,46 @@
+import sys
+import threading
+
+import server
+
+
+def test_missing_module_is_none():
+    assert server.lazy_import('ddas_no_such_module') is None
+    assert server.lazy_import('ddas_no_such_package.child') is None
+
+
+def test_loaded_module_is_returned_as_is():
+    assert server.lazy_import('json') is sys.modules['json']
+
+
+def test_concurrent_first_access_sees_initialized_module(tmp_path, monkeypatch):
+    # A module whose body is slow to run, so racing threads overlap its import
+    (tmp_path / 'ddas_slow_module.py').write_text(
+        "import time\n"
+        "imports = globals().get('imports', 0) + 1\n"
+        "time.sleep(0.2)\n"
+        "READY = True\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, 'ddas_slow_module', raising=False)
+    module = server.lazy_import('ddas_slow_module')
+    assert 'ddas_slow_module' not in sys.modules  # Nothing ran yet
+
+    start = threading.Barrier(8)
+    seen, errors = [], []
+
+    def read():
+        start.wait()
+        try:
+            seen.append(module.READY)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=read) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert seen == [True] * 8
+    assert module.imports == 1
+    sys.modules.pop('ddas_slow_module', None)
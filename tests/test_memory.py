@@ -0,0 +1,101 @@
+import hashlib
+import io
+import os
+import tarfile
+import threading
+import tracemalloc
+import zipfile
+
+import pytest
+
+import server
+
+KB = 1024
+MB = 1024 * KB
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = server.BufferPool(64 * KB, 256 * KB)
+    monkeypatch.setattr(server, 'buffer_pool', pool)
+    monkeypatch.setattr(server, 'HASH_FADVISE', False)
+    return pool
+
+
+def write_file(path, size, seed):
+    block = hashlib.sha256(seed.encode()).digest() * (64 * KB // 32)
+    with open(path, 'wb') as f:
+        for _ in range(size // len(block)):
+            f.write(block)
+    return path
+
+
+def write_archive(path, kind, members):
+    if kind == 'zip':
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_STORED) as archive:
+            for member in members:
+                archive.write(member, os.path.basename(member))
+    else:
+        with tarfile.open(path, 'w') as archive:
+            for member in members:
+                archive.add(member, os.path.basename(member))
+    return path
+
+
+def peak_growth(jobs):
+    """Run jobs on one thread each and return (results, traced heap growth at the peak)"""
+    results = [None] * len(jobs)
+
+    def run(i):
+        results[i] = jobs[i]()
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(len(jobs))]
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return results, tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+
+def test_concurrent_hashing_stays_within_the_pool(pool, tmp_path):
+    files = [write_file(tmp_path / f'f{i}.bin', 8 * MB, f'f{i}') for i in range(8)]
+    jobs = [lambda p=p: server.calculate_file_hash(str(p)) for p in files]
+    digests, growth = peak_growth(jobs)
+    assert digests == [hashlib.sha256(p.read_bytes()).hexdigest() for p in files]
+    # 64 MB hashed by 8 threads; the data only ever lives in the four pooled buffers
+    assert growth < 2 * MB, f"peak heap growth {growth / MB:.1f} MB"
+
+
+@pytest.mark.parametrize('kind', ['zip', 'tar'])
+def test_concurrent_archive_members_stay_within_the_pool(pool, tmp_path, kind):
+    members = [write_file(tmp_path / f'm{i}.bin', 4 * MB, f'm{i}') for i in range(4)]
+    archives = [write_archive(tmp_path / f'a{i}.{kind}', kind, members) for i in range(4)]
+    jobs = [lambda a=a: server.calculate_archive_hashes(str(a), kind) for a in archives]
+    results, growth = peak_growth(jobs)
+    expected = {p.name: hashlib.sha256(p.read_bytes()).hexdigest() for p in members}
+    for archive, (file_hash, hashed) in zip(archives, results):
+        assert file_hash == hashlib.sha256(archive.read_bytes()).hexdigest()
+        assert {m['name']: m['sha256'] for m in hashed} == expected
+    # zipfile and tarfile copy each chunk once on its way into the pooled buffer
+    assert growth < 2 * MB, f"peak heap growth {growth / MB:.1f} MB"
+
+
+def test_hash_member_reads_through_pooled_buffers(pool, monkeypatch):
+    lent = []
+    real_buffer = pool.buffer
+
+    def counting_buffer():
+        lent.append(1)
+        return real_buffer()
+
+    monkeypatch.setattr(pool, 'buffer', counting_buffer)
+    data = os.urandom(300 * KB)
+    member = server.hash_member('m.bin', io.BytesIO(data))
+    assert member['sha256'] == hashlib.sha256(data).hexdigest()
+    assert member['size'] == len(data)
+    assert len(lent) == 6  # Five 64 KB chunks, then the read that finds the end
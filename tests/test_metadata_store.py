@@ -0,0 +1,123 @@
+import os
+import time
+import uuid
+
+import pytest
+
+import server
+
+
+def row(user, filename, sha256=None, verdict='uploaded', match=None, original=None, at=None, size=100):
+    return (user, at if at is not None else time.time(), f"/downloads/{filename}", filename, size,
+            sha256, verdict, match, original, None, 1.5)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'metadata.db')
+
+
+def open_store(path, **kwargs):
+    kwargs.setdefault('flush_interval', 3600)  # Tests flush explicitly
+    return server.MetadataStore(path, **kwargs)
+
+
+def test_history_is_newest_first_and_filtered(db_path):
+    store = open_store(db_path)
+    now = time.time()
+    store.record(row('alice', 'old.bin', 'a' * 64, at=now - 100, size=10))
+    store.record(row('alice', 'dup.bin', 'a' * 64, verdict='duplicate', match='exact', original='old.bin', at=now - 50))
+    store.record(row('alice', 'new.bin', 'b' * 64, at=now, size=5000))
+    store.record(row('bob', 'other.bin', 'c' * 64, at=now))
+
+    assert [f['filename'] for f in store.history('alice')] == ['new.bin', 'dup.bin', 'old.bin']
+    assert [f['filename'] for f in store.history('alice', verdict='duplicate')] == ['dup.bin']
+    assert [f['filename'] for f in store.history('alice', min_size=1000)] == ['new.bin']
+    assert [f['filename'] for f in store.history('alice', path='/downloads/old.bin')] == ['old.bin']
+    assert [f['filename'] for f in store.history('alice', since=now - 60)] == ['new.bin', 'dup.bin']
+    assert len(store.history('alice', limit=1)) == 1
+    first = store.history('alice')[1]
+    assert first['original_filename'] == 'old.bin' and first['file_hash'] == 'a' * 64
+
+
+def test_history_survives_a_reopen(db_path):
+    store = open_store(db_path)
+    store.record(row('alice', 'report.pdf', 'd' * 64))
+    store.flush()
+
+    reopened = open_store(db_path)
+    files = reopened.history('alice')
+    assert [(f['filename'], f['verdict'], f['file_hash']) for f in files] == [('report.pdf', 'uploaded', 'd' * 64)]
+    assert reopened.find_digest('alice', 'd' * 64) == 'report.pdf'
+
+
+def test_find_digest_sees_queued_rows_and_only_backend_digests(db_path):
+    store = open_store(db_path)
+    store.record(row('alice', 'a.bin', 'a' * 64))
+    assert store.find_digest('alice', 'a' * 64) == 'a.bin'  # Still queued
+    assert store.find_digest('bob', 'a' * 64) is None
+    store.record(row('alice', 'b.txt', 'b' * 64, verdict='duplicate', match='normalized', original='b-old.txt'))
+    store.record(row('alice', 'c (1).bin', 'c' * 64, verdict='duplicate', match='exact', original='c.bin'))
+    store.flush()
+    assert store.find_digest('alice', 'a' * 64) == 'a.bin'
+    assert store.find_digest('alice', 'b' * 64) is None  # The backend never saw b.txt's digest
+    assert store.find_digest('alice', 'c' * 64) == 'c.bin'
+    assert store.stats()['digest_hit_ratio'] is not None
+
+
+def test_full_batches_are_written_without_a_flush(db_path):
+    store = open_store(db_path, batch_size=5)
+    for i in range(5):
+        store.record(row('alice', f"{i}.bin"))
+    deadline = time.time() + 5
+    while store.written < 5 and time.time() < deadline:
+        time.sleep(0.01)
+    stats = store.stats()
+    assert (stats['rows_written'], stats['batches'], stats['pending']) == (5, 1, 0)
+
+
+def test_unopenable_store_is_disabled(tmp_path):
+    assert server.open_metadata_store(str(tmp_path / 'missing' / 'metadata.db')) is None
+
+
+class FakeResponse:
+    def __init__(self, status_code, data=None):
+        self.status_code = status_code
+        self._data = data or {}
+
+    def json(self):
+        return self._data
+
+
+@pytest.fixture
+def client(db_path, monkeypatch):
+    monkeypatch.setattr(server, 'metadata_store', open_store(db_path))
+    monkeypatch.setattr(server, 'HEDGE_CHECK_HASH', False)
+    monkeypatch.setattr(server, 'check_hash_request', lambda file_hash, headers: FakeResponse(200, {"exists": False}))
+    monkeypatch.setattr(server, 'post_multipart', lambda url, headers, upload, timeout: FakeResponse(201))
+    return server.app.test_client()
+
+
+def test_history_endpoint_survives_a_restart(client, db_path, tmp_path, monkeypatch):
+    token = f"opaque-{uuid.uuid4()}"
+    path = tmp_path / 'download.bin'
+    path.write_bytes(os.urandom(4096))
+    assert client.post('/process', json={'path': str(path), 'auth_token': token}).get_json()['success']
+
+    server.metadata_store.flush()  # What atexit does on shutdown
+    monkeypatch.setattr(server, 'metadata_store', open_store(db_path))
+    response = client.get('/history', headers={'Authorization': f"Bearer {token}"}).get_json()
+    assert response['success'] and response['count'] == 1
+    assert response['files'][0]['filename'] == 'download.bin'
+    assert response['files'][0]['verdict'] == 'uploaded'
+    other = client.get('/history', headers={'Authorization': f"Bearer opaque-{uuid.uuid4()}"}).get_json()
+    assert other['count'] == 0
+
+
+def test_history_endpoint_rejects_bad_requests(client, monkeypatch):
+    assert client.get('/history').status_code == 400
+    headers = {'Authorization': 'Bearer token'}
+    assert client.get('/history?since=yesterday', headers=headers).status_code == 400
+    assert client.get('/history?limit=many', headers=headers).status_code == 400
+    monkeypatch.setattr(server, 'metadata_store', None)
+    assert client.get('/history', headers=headers).status_code == 404
@@ -0,0 +1,130 @@
+import hashlib
+import uuid
+
+import pytest
+
+import server
+
+TEXT_VARIANTS = [
+    b"name,size\nreport.pdf,10\n\nend\n",
+    b"\xef\xbb\xbfname,size\r\nreport.pdf,10\r\n\r\nend\r\n",
+    b"name,size  \nreport.pdf,10\t\n\nend",
+    b"name,size\nreport.pdf,10\n\nend\n\n\n \n",
+]
+
+
+def content_key(tmp_path, data, suffix):
+    path = tmp_path / f"{uuid.uuid4()}{suffix}"
+    path.write_bytes(data)
+    raw, key = server.calculate_content_hashes(str(path), server.normalizer_for(str(path), len(data)))
+    assert raw == hashlib.sha256(data).hexdigest()
+    return key
+
+
+def canonical(normalizer, data, step):
+    out = [normalizer.feed(data[i:i + step]) for i in range(0, len(data), step)]
+    return b''.join(out) + normalizer.finish()
+
+
+def test_text_variants_share_a_key(tmp_path):
+    keys = {content_key(tmp_path, data, '.csv') for data in TEXT_VARIANTS}
+    assert len(keys) == 1
+    assert keys.pop().startswith('text:')
+
+
+def test_text_changes_still_change_the_key(tmp_path):
+    base = content_key(tmp_path, TEXT_VARIANTS[0], '.txt')
+    assert content_key(tmp_path, b"name,size\nreport.pdf,11\n\nend\n", '.txt') != base
+    assert content_key(tmp_path, b"name,size\nreport.pdf,10\nend\n", '.txt') != base  # Inner blank line
+    assert content_key(tmp_path, b"name, size\nreport.pdf,10\n\nend\n", '.txt') != base  # Inner space
+
+
+@pytest.mark.parametrize('step', [1, 3, 7, 64])
+def test_text_output_does_not_depend_on_chunking(step):
+    expected = canonical(server.TextNormalizer(), TEXT_VARIANTS[1], len(TEXT_VARIANTS[1]))
+    assert canonical(server.TextNormalizer(), TEXT_VARIANTS[1], step) == expected
+    assert expected == b"name,size\nreport.pdf,10\n\nend\n"
+    assert canonical(server.TextNormalizer(), b"\xef\xbb", step) == b"\xef\xbb\n"  # Not a BOM after all
+
+
+def test_long_lines_are_emitted_in_pieces(monkeypatch):
+    monkeypatch.setattr(server.TextNormalizer, 'CARRY_LIMIT', 16)
+    line = b"x" * 100
+    assert canonical(server.TextNormalizer(), line + b"   \r\n", 10) == line + b"\n"
+    assert canonical(server.TextNormalizer(), line + b"  y", 10) == line + b"  y\n"
+
+
+def pdf(created, producer, document_id, body=b"BT /F1 12 Tf (Quarterly report) Tj ET"):
+    objects = (b"%PDF-1.4\n"
+               b"1 0 obj << /Title (Report) /CreationDate (D:" + created + b")"
+               b" /Producer (" + producer + b") >> endobj\n"
+               b"2 0 obj << /Length " + str(len(body)).encode() + b" >> stream\n" + body + b"\nendstream endobj\n")
+    xref = (b"xref\n0 3\n0000000000 65535 f \n0000000009 00000 n \n"
+            + f"{len(objects) - 60:010d} 00000 n \n".encode())
+    trailer = (b"trailer << /Size 3 /Info 1 0 R /ID [<" + document_id + b"> <" + document_id + b">] >>\n"
+               b"startxref\n" + str(len(objects)).encode() + b"\n%%EOF\n")
+    return objects + xref + trailer
+
+
+def test_pdf_metadata_and_offsets_are_ignored(tmp_path):
+    first = content_key(tmp_path, pdf(b"20240101000000Z", b"Writer 1.0", b"aa11"), '.pdf')
+    # A longer producer and ID also shift the xref offsets and startxref
+    again = content_key(tmp_path, pdf(b"20250606121212Z", b"Other Producer 7", b"bb2233"), '.pdf')
+    assert first == again
+    assert first.startswith('pdf:')
+
+
+def test_pdf_content_changes_the_key(tmp_path):
+    first = content_key(tmp_path, pdf(b"20240101000000Z", b"Writer", b"aa"), '.pdf')
+    changed = content_key(tmp_path, pdf(b"20240101000000Z", b"Writer", b"aa",
+                                        body=b"BT /F1 12 Tf (Annual report) Tj ET"), '.pdf')
+    assert first != changed
+
+
+def test_pdf_matches_across_chunk_boundaries():
+    data = pdf(b"20240101000000Z", b"Writer", b"aa") * 50
+    whole = canonical(server.PdfNormalizer(), data, len(data))
+    assert canonical(server.PdfNormalizer(), data, 997) == whole
+    assert b"CreationDate" not in whole and b"startxref" not in whole
+
+
+def test_normalizer_for_picks_by_type_and_size(monkeypatch):
+    assert isinstance(server.normalizer_for('notes.txt', 10), server.TextNormalizer)
+    assert isinstance(server.normalizer_for('paper.pdf', 10), server.PdfNormalizer)
+    assert server.normalizer_for('data.csv.gz', 10) is None  # Compressed text stays raw
+    assert server.normalizer_for('photo.jpg', 10) is None
+    monkeypatch.setattr(server, 'NORMALIZED_HASH_MAX_SIZE', 5)
+    assert server.normalizer_for('notes.txt', 10) is None
+
+
+class FakeResponse:
+    def __init__(self, status_code, data=None):
+        self.status_code = status_code
+        self._data = data or {}
+
+    def json(self):
+        return self._data
+
+
+def test_re_download_with_other_line_endings_is_a_local_duplicate(tmp_path, monkeypatch):
+    monkeypatch.setattr(server, 'NORMALIZED_HASH', True)
+    monkeypatch.setattr(server, 'metadata_store', None)
+    monkeypatch.setattr(server, 'HEDGE_CHECK_HASH', False)
+    checks = []
+
+    def check_hash_request(file_hash, headers):
+        checks.append(file_hash)
+        return FakeResponse(200, {"exists": False})
+
+    monkeypatch.setattr(server, 'check_hash_request', check_hash_request)
+    monkeypatch.setattr(server, 'post_multipart', lambda url, headers, upload, timeout: FakeResponse(201))
+    user_id = f"user-{uuid.uuid4()}"
+    unix, windows = tmp_path / 'list.csv', tmp_path / 'list (1).csv'
+    unix.write_bytes(TEXT_VARIANTS[0])
+    windows.write_bytes(TEXT_VARIANTS[1])
+
+    assert not server.check_and_upload(str(unix), 'token', False, user_id)['duplicate']
+    result = server.check_and_upload(str(windows), 'token', False, user_id)
+    assert result['duplicate'] and result['match'] == 'normalized'
+    assert result['original_filename'] == 'list.csv'
+    assert len(checks) == 1
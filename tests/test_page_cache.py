@@ -0,0 +1,66 @@
+import os
+import uuid
+
+import pytest
+
+import server
+
+
+class FakeResponse:
+    def __init__(self, status_code, data=None):
+        self.status_code = status_code
+        self._data = data or {}
+
+    def json(self):
+        return self._data
+
+
+@pytest.fixture
+def events(tmp_path, monkeypatch):
+    """Record fadvise calls and upload reads, in order, against a fake backend"""
+    recorded = []
+    fadvise = os.posix_fadvise
+
+    def record_fadvise(fd, offset, length, advice):
+        names = {os.POSIX_FADV_DONTNEED: 'DONTNEED', os.POSIX_FADV_SEQUENTIAL: 'SEQUENTIAL'}
+        recorded.append(names.get(advice, advice))
+        return fadvise(fd, offset, length, advice)
+
+    def post_multipart(url, headers, upload, timeout):
+        while upload.read(64 * 1024):
+            pass
+        recorded.append('upload')
+        return FakeResponse(201)
+
+    monkeypatch.setattr(server, 'HASH_FADVISE', True)
+    monkeypatch.setattr(os, 'posix_fadvise', record_fadvise)
+    monkeypatch.setattr(server, 'post_multipart', post_multipart)
+    monkeypatch.setattr(server, 'HEDGE_CHECK_HASH', False)
+    return recorded
+
+
+def process(tmp_path, monkeypatch, exists, tree=False):
+    path = tmp_path / 'download.bin'
+    path.write_bytes(os.urandom(2 * 1024 * 1024))
+    monkeypatch.setattr(server, 'HASH_ALGORITHM', 'blake2b')
+    monkeypatch.setattr(server, 'TREE_HASH_MIN_SIZE', 1024 if tree else 0)
+    monkeypatch.setattr(server, 'TREE_HASH_SEGMENT_SIZE', 512 * 1024)
+    monkeypatch.setattr(server, 'check_hash_request', lambda file_hash, headers: FakeResponse(
+        200, {"exists": exists, "filename": "original.bin"}))
+    return server.check_and_upload(str(path), 'token', False, f"user-{uuid.uuid4()}")
+
+
+@pytest.mark.parametrize('tree', [False, True])
+def test_new_file_is_dropped_once_after_upload(tmp_path, monkeypatch, events, tree):
+    result = process(tmp_path, monkeypatch, exists=False, tree=tree)
+    assert result['success'] and not result['duplicate']
+    assert events.count('DONTNEED') == 1
+    assert events[-2:] == ['upload', 'DONTNEED']
+
+
+def test_duplicate_is_dropped_once_after_hashing(tmp_path, monkeypatch, events):
+    result = process(tmp_path, monkeypatch, exists=True)
+    assert result['duplicate']
+    assert 'upload' not in events
+    assert events.count('DONTNEED') == 1
+    assert events[-1] == 'DONTNEED'
@@ -0,0 +1,112 @@
+import uuid
+
+import pytest
+
+np = pytest.importorskip('numpy')
+Image = pytest.importorskip('PIL.Image')
+
+import server  # noqa: E402
+
+
+def scene(seed, size=256):
+    """A smooth grayscale test picture: a few random blobs on a gradient"""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:size, 0:size] / size
+    pixels = 80 * x + 40 * y
+    for _ in range(6):
+        cx, cy = rng.uniform(0.1, 0.9, size=2)
+        radius, level = rng.uniform(0.05, 0.25), rng.uniform(-90, 120)
+        pixels += level * np.exp(-((x - cx) ** 2 + (y - cy) ** 2) / radius ** 2)
+    return Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8)).convert('RGB')
+
+
+def fingerprint(tmp_path, image, name, **save_options):
+    path = tmp_path / name
+    image.save(path, **save_options)
+    return server.calculate_perceptual_hash(str(path))
+
+
+def distances(a, b):
+    return bin(a[0] ^ b[0]).count('1'), bin(a[1] ^ b[1]).count('1')
+
+
+def test_re_encoded_and_resized_copies_are_within_the_threshold(tmp_path):
+    original = scene(1)
+    reference = fingerprint(tmp_path, original, 'original.png')
+    copies = [
+        fingerprint(tmp_path, original, 'recompressed.jpg', quality=60),
+        fingerprint(tmp_path, original.resize((160, 160), Image.BILINEAR), 'thumbnail.png'),
+        fingerprint(tmp_path, original.point(lambda v: min(255, v + 8)), 'brighter.png'),
+    ]
+    for copy in copies:
+        assert max(distances(reference, copy)) <= server.PERCEPTUAL_MAX_DISTANCE
+
+
+def test_different_pictures_are_not(tmp_path):
+    reference = fingerprint(tmp_path, scene(1), 'one.png')
+    for seed in range(2, 6):
+        other = fingerprint(tmp_path, scene(seed), f'other-{seed}.png')
+        assert max(distances(reference, other)) > server.PERCEPTUAL_MAX_DISTANCE
+
+
+def test_undecodable_image_has_no_fingerprint(tmp_path):
+    path = tmp_path / 'broken.png'
+    path.write_bytes(b'not a png')
+    assert server.calculate_perceptual_hash(str(path)) is None
+
+
+def test_search_honours_the_distance_bound_on_both_hashes():
+    index = server.PerceptualIndex(16)
+    index.add(0, 0, 'a' * 64, 'zero.png')
+    index.add(0b1111, 0b1, 'b' * 64, 'near.png')
+    # 0b11 is 2 + 0 bits from zero.png and 2 + 1 from near.png; 0b111 is 3 + 0 and 1 + 1
+    assert index.search(0b11, 0, 2) == {"sha256": 'a' * 64, "filename": 'zero.png', "distance": 2}
+    assert index.search(0b111, 0, 3)['filename'] == 'near.png'
+    assert index.search(0b11, 0, 1) is None
+    assert index.search(0b1111, 0b1, 0) == {"sha256": 'b' * 64, "filename": 'near.png', "distance": 0}
+    assert index.search(0, 0b1111111, 5) is None  # zero.png's pHash matches, its dHash is seven bits off
+
+
+def test_index_grows_then_overwrites_the_oldest():
+    index = server.PerceptualIndex(100)
+    for i in range(150):
+        index.add(1 << (i % 64) | i << 32, i, f"{i:064x}", f"image-{i}.png")
+    assert len(index) == 100
+    assert index.search(1 << 10 | 10 << 32, 10, 0) is None  # Overwritten
+    assert index.search(1 << (149 % 64) | 149 << 32, 149, 0)['filename'] == 'image-149.png'
+
+
+def test_adding_the_same_image_twice_keeps_one_entry():
+    index = server.PerceptualIndex(8)
+    index.add(5, 7, 'a' * 64, 'first.png')
+    index.add(5, 7, 'a' * 64, 'again.png')
+    assert len(index) == 1
+
+
+class FakeResponse:
+    def __init__(self, status_code, data=None):
+        self.status_code = status_code
+        self._data = data or {}
+
+    def json(self):
+        return self._data
+
+
+def test_resized_re_download_is_flagged_as_similar(tmp_path, monkeypatch):
+    monkeypatch.setattr(server, 'PERCEPTUAL_HASH', True)
+    monkeypatch.setattr(server, 'metadata_store', None)
+    monkeypatch.setattr(server, 'HEDGE_CHECK_HASH', False)
+    monkeypatch.setattr(server, 'check_hash_request', lambda file_hash, headers: FakeResponse(200, {"exists": False}))
+    monkeypatch.setattr(server, 'post_multipart', lambda url, headers, upload, timeout: FakeResponse(201))
+    user_id = f"user-{uuid.uuid4()}"
+    original = scene(7)
+    original.save(tmp_path / 'photo.png')
+    original.resize((128, 128), Image.BILINEAR).save(tmp_path / 'photo-small.jpg', quality=70)
+    scene(8).save(tmp_path / 'unrelated.png')
+
+    assert not server.check_and_upload(str(tmp_path / 'photo.png'), 'token', False, user_id)['duplicate']
+    result = server.check_and_upload(str(tmp_path / 'photo-small.jpg'), 'token', False, user_id)
+    assert result['duplicate'] and result['match'] == 'perceptual'
+    assert result['original_filename'] == 'photo.png'
+    assert result['distance'] <= server.PERCEPTUAL_MAX_DISTANCE
+    assert not server.check_and_upload(str(tmp_path / 'unrelated.png'), 'token', False, user_id)['duplicate']
@@ -0,0 +1,36 @@
+import os
+import stat
+
+from werkzeug import serving
+
+import server
+
+
+def test_time_to_ready_is_set_once_listening(monkeypatch):
+    client = server.app.test_client()
+    monkeypatch.setattr(server, 'READY_AT', None)
+    assert client.get('/health').get_json()['startup']['time_to_ready_ms'] is None
+    server.mark_ready()
+    assert client.get('/health').get_json()['startup']['time_to_ready_ms'] > 0
+
+
+
+def test_unix_socket_is_private_from_creation(tmp_path, monkeypatch):
+    path = str(tmp_path / 'ddas.sock')
+    modes = []
+    server_bind = serving.BaseWSGIServer.server_bind
+
+    def record_mode(self):
+        server_bind(self)
+        modes.append(stat.S_IMODE(os.stat(path).st_mode))  # Before any later chmod could run
+
+    monkeypatch.setattr(serving.BaseWSGIServer, 'server_bind', record_mode)
+    previous = os.umask(0o022)
+    try:
+        unix_server = server.serve_unix_socket(path)
+        assert os.umask(0o022) == 0o022  # Restored after the bind
+    finally:
+        os.umask(previous)
+    unix_server.shutdown()
+    unix_server.server_close()
+    assert modes == [0o600]
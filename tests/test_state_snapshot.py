@@ -0,0 +1,152 @@
+import base64
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+import pytest
+
+import server
+
+Snapshot = server.StateSnapshot
+
+
+def make_entries(count, user='alice'):
+    return {Snapshot.key(user, f"fast{i}"): {"sha256": f"{i:064x}", "filename": f"file-{i}.bin"}
+            for i in range(count)}
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / 'state.snapshot')
+    entries = make_entries(100)
+    Snapshot.write(path, entries)
+    snapshot = Snapshot(path)
+    assert snapshot.count == 100
+    assert snapshot.lookup('alice', 'fast42') == {"sha256": f"{42:064x}", "filename": "file-42.bin"}
+    assert snapshot.lookup('bob', 'fast42') is None
+    assert dict(snapshot.items()) == entries
+
+
+def test_empty_and_missing(tmp_path):
+    path = str(tmp_path / 'state.snapshot')
+    assert Snapshot(path).count == 0
+    Snapshot.write(path, {})
+    assert Snapshot(path).count == 0
+
+
+def test_truncated_file_is_ignored(tmp_path, caplog):
+    path = str(tmp_path / 'state.snapshot')
+    Snapshot.write(path, make_entries(20))
+    with open(path, 'rb') as f:
+        data = f.read()
+    for length in [Snapshot.HEADER.size, Snapshot.HEADER.size + 5,
+                   Snapshot.HEADER.size + 20 * Snapshot.RECORD.size, len(data) - 40, len(data) - 1]:
+        with open(path, 'wb') as f:
+            f.write(data[:length])
+        with caplog.at_level(logging.WARNING):
+            snapshot = Snapshot(path)
+        assert snapshot.count == 0
+        assert snapshot.lookup('alice', 'fast19') is None
+        assert "Ignoring truncated snapshot" in caplog.text
+        caplog.clear()
+
+
+def test_trailing_bytes_are_ignored(tmp_path):
+    path = str(tmp_path / 'state.snapshot')
+    Snapshot.write(path, make_entries(3))
+    with open(path, 'ab') as f:
+        f.write(b'\0')
+    assert Snapshot(path).count == 0
+
+
+@pytest.fixture
+def snapshot_state(tmp_path, monkeypatch):
+    path = str(tmp_path / 'state.snapshot')
+    monkeypatch.setattr(server, 'SNAPSHOT_PATH', path)
+    monkeypatch.setattr(server, 'state_snapshot', None)
+    monkeypatch.setattr(server, 'snapshot_generation', server.index_generation)
+    monkeypatch.setattr(server, 'user_shards', OrderedDict())
+    return path
+
+
+def test_save_merges_memory_over_snapshot(snapshot_state):
+    server.get_user_shard('alice').remember('fast1', 'a' * 64, 'one.bin')
+    server.save_state_snapshot()
+    server.user_shards.clear()
+    server.get_user_shard('alice').remember('fast2', 'b' * 64, 'two.bin')
+    server.save_state_snapshot()
+    snapshot = Snapshot(snapshot_state)
+    assert snapshot.lookup('alice', 'fast1') == {"sha256": 'a' * 64, "filename": 'one.bin'}
+    assert snapshot.lookup('alice', 'fast2') == {"sha256": 'b' * 64, "filename": 'two.bin'}
+
+
+def test_concurrent_saves(snapshot_state, caplog):
+    for i in range(2000):
+        server.get_user_shard('alice').remember(f"fast{i}", f"{i:064x}", f"file-{i}.bin")
+    start = threading.Barrier(8)
+
+    def save(n):
+        server.get_user_shard(f"user{n}").remember('fast', f"{n:064x}", f"user-{n}.bin")
+        start.wait()
+        server.save_state_snapshot()
+
+    threads = [threading.Thread(target=save, args=(n,)) for n in range(8)]
+    with caplog.at_level(logging.ERROR):
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert "Could not write state snapshot" not in caplog.text
+    assert not os.path.exists(f"{snapshot_state}.tmp")
+    snapshot = Snapshot(snapshot_state)
+    assert snapshot.count == 2008
+    assert all(snapshot.lookup(f"user{n}", 'fast') is not None for n in range(8))
+
+
+def unsigned_token(subject, issued):
+    segment = lambda value: base64.urlsafe_b64encode(json.dumps(value).encode()).rstrip(b'=').decode()
+    return f"{segment({'alg': 'HS256'})}.{segment({'sub': subject, 'iat': issued})}.sig"
+
+
+class FakeResponse:
+    def __init__(self, status_code, data=None):
+        self.status_code = status_code
+        self._data = data or {}
+
+    def json(self):
+        return self._data
+
+
+def test_snapshot_entries_survive_token_rotation(snapshot_state, tmp_path, monkeypatch):
+    monkeypatch.setattr(server, 'backend_subjects', OrderedDict())
+    monkeypatch.setattr(server, 'HASH_ALGORITHM', 'blake2b')
+    monkeypatch.setattr(server, 'TREE_HASH_MIN_SIZE', 0)
+    monkeypatch.setattr(server, 'HEDGE_CHECK_HASH', False)
+    monkeypatch.setattr(server, 'check_hash_request', lambda file_hash, headers: FakeResponse(200, {"exists": False}))
+    monkeypatch.setattr(server, 'post_multipart', lambda url, headers, upload, timeout: FakeResponse(201))
+    path = tmp_path / 'download.bin'
+    path.write_bytes(os.urandom(64 * 1024))
+
+    old_token, new_token = unsigned_token('alice', 1), unsigned_token('alice', 2)
+    server.check_and_upload(str(path), old_token, False, server.user_id_from_token(old_token))
+    assert server.user_id_from_token(old_token) == 'sub:alice'
+    server.save_state_snapshot()
+
+    # A restart: memory is gone, only the snapshot remains
+    server.user_shards.clear()
+    server.backend_subjects.clear()
+    monkeypatch.setattr(server, 'state_snapshot', Snapshot(snapshot_state))
+    fast_hash = server.calculate_local_hash(str(path), path.stat().st_size)
+    # Until the backend accepts it, the rotated token's unverified subject is not trusted
+    assert server.lookup_known_hash(server.user_id_from_token(new_token), fast_hash) is None
+    assert server.trust_backend_subject(new_token, 'token:x') == 'sub:alice'
+    known = server.lookup_known_hash(server.user_id_from_token(new_token), fast_hash)
+    assert known['filename'] == 'download.bin'
+    assert server.lookup_known_hash(server.user_id_from_token(unsigned_token('mallory', 1)), fast_hash) is None
+
+
+def test_tokens_without_a_subject_keep_their_own_shard(monkeypatch):
+    monkeypatch.setattr(server, 'backend_subjects', OrderedDict())
+    assert server.trust_backend_subject('opaque', 'token:abc') == 'token:abc'
+    assert server.user_id_from_token('opaque').startswith('token:')
@@ -0,0 +1,90 @@
+import base64
+import hashlib
+import hmac
+import json
+import time
+
+import pytest
+
+import server
+
+SECRET = 'test-secret'
+
+
+def segment(value):
+    raw = value if isinstance(value, bytes) else json.dumps(value).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode()
+
+
+def sign(header, claims, secret=SECRET):
+    signing_input = f"{segment(header)}.{segment(claims)}"
+    signature = hmac.new(secret.encode(), signing_input.encode(), hashlib.sha256).digest()
+    return f"{signing_input}.{segment(signature)}"
+
+
+HS256 = {'alg': 'HS256', 'typ': 'JWT'}
+
+
+@pytest.fixture
+def verifier():
+    return server.TokenVerifier(secret=SECRET, cache_size=2, leeway=0)
+
+
+def test_disabled_verifier_accepts_nothing_and_rejects_nothing():
+    assert server.TokenVerifier().verify('anything') == (None, None)
+
+
+def test_valid_token_is_cached(verifier):
+    token = sign(HS256, {'sub': 'alice', 'exp': time.time() + 60})
+    claims, error = verifier.verify(token)
+    assert error is None and claims['sub'] == 'alice'
+    assert verifier.verify(token) == (claims, None)
+    assert (verifier.hits, verifier.misses) == (1, 1)
+
+
+def test_cache_evicts_least_recently_used(verifier):
+    tokens = [sign(HS256, {'sub': str(i)}) for i in range(3)]
+    for token in tokens:
+        verifier.verify(token)
+    assert list(verifier._cache) == tokens[1:]
+
+
+def test_bad_signature_and_expiry(verifier):
+    assert verifier.verify(sign(HS256, {'sub': 'a'}, secret='other'))[1] == "invalid signature"
+    assert verifier.verify(sign(HS256, {'exp': time.time() - 1}))[1] == "token expired"
+    assert verifier.verify(sign(HS256, {'nbf': time.time() + 60}))[1] == "token not yet valid"
+    assert verifier.verify(sign({'alg': 'none'}, {}))[1] == "unsupported algorithm none"
+
+
+@pytest.mark.parametrize('token', [
+    'not-a-jwt',
+    'a.b.c',
+    ['a', 'b', 'c'],
+    None,
+    sign(['HS256'], {'sub': 'alice'}),
+    sign('HS256', {'sub': 'alice'}),
+    sign(HS256, ['alice']),
+    sign(HS256, 42),
+    sign(HS256, {'exp': 'tomorrow'}),
+    sign(HS256, {'nbf': '0'}),
+    sign(HS256, {'exp': True}),
+    sign(HS256, {'exp': [1]}),
+    sign(dict(HS256, kid=['k']), {'sub': 'alice'}),
+    f"{segment(HS256)}.{segment(b'{not json')}.{segment(b'sig')}",
+])
+def test_wrong_shape_is_malformed(verifier, token):
+    assert verifier.verify(token) == (None, "malformed token")
+
+
+def test_nan_time_claim_is_malformed(verifier):
+    token = sign(HS256, b'{"exp": NaN}')
+    assert verifier.verify(token) == (None, "malformed token")
+
+
+def test_history_rejects_wrong_shape_token_with_401(monkeypatch, tmp_path):
+    monkeypatch.setattr(server, 'token_verifier', server.TokenVerifier(secret=SECRET))
+    monkeypatch.setattr(server, 'metadata_store', server.MetadataStore(str(tmp_path / 'meta.db')))
+    token = sign(HS256, {'exp': 'never'})
+    response = server.app.test_client().get('/history', headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 401
+    assert response.get_json()['error'] == "Invalid authentication token: malformed token"
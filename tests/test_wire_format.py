@@ -0,0 +1,72 @@
+import struct
+
+import pytest
+
+import server
+
+SHA = 'ab' * 32
+
+
+def round_trip(results):
+    return server.decode_binary_results(server.encode_binary_results(results))
+
+
+def test_upload_and_error():
+    results = [
+        {"success": True, "duplicate": False, "filename": "new.pdf", "file_hash": SHA,
+         "fast_hash": 'cd' * 64, "message": "File 'new.pdf' uploaded successfully"},
+        {"success": False, "error": "Upload failed: HTTP 500"},
+    ]
+    assert round_trip(results) == [
+        {"success": True, "duplicate": False, "filename": "new.pdf", "file_hash": SHA, "fast_hash": 'cd' * 64},
+        {"success": False, "duplicate": False, "filename": "", "error": "Upload failed: HTTP 500"},
+    ]
+
+
+@pytest.mark.parametrize('extra', [
+    {},
+    {"match": "normalized"},
+    {"match": "perceptual", "distance": 5},
+    {"match": "perceptual", "distance": 0},
+])
+def test_duplicate_match_kinds(extra):
+    result = {"success": True, "duplicate": True, "filename": "copy.png", "original_filename": "ünïcode.png",
+              "file_hash": SHA, **extra}
+    assert round_trip([result]) == [result]
+
+
+def test_archive_members():
+    archive = {
+        "format": "zip",
+        "member_count": 120,
+        "known_count": 2,
+        "known_members": [
+            {"name": "docs/a.txt", "size": 12, "file_hash": '01' * 32, "original_filename": "a.txt"},
+            {"name": "big.iso", "size": 5 * 1024 ** 3, "file_hash": '02' * 32, "original_filename": "big.iso"},
+        ],
+        "member_limit_reached": False,
+        "backend_checked": True,
+        "backend_limit_reached": False,
+    }
+    result = {"success": True, "duplicate": False, "filename": "bundle.zip", "file_hash": SHA,
+              "archive": archive}
+    assert round_trip([result]) == [result]
+
+    archive = dict(archive, known_count=0, known_members=[], member_limit_reached=True, backend_checked=False,
+                   backend_limit_reached=True)
+    result = dict(result, duplicate=True, original_filename="old.zip", archive=archive)
+    assert round_trip([result]) == [result]
+
+
+def test_decodes_version_1_payloads():
+    body = bytearray(struct.pack('<4sI', b'DDR1', 1))
+    body.append(server.RESULT_SUCCESS | server.RESULT_DUPLICATE | server.RESULT_ORIGINAL)
+    body += bytes.fromhex(SHA)
+    body += struct.pack('<H', 5) + b'a.txt' + struct.pack('<H', 5) + b'b.txt'
+    assert server.decode_binary_results(bytes(body)) == [
+        {"success": True, "duplicate": True, "filename": "a.txt", "file_hash": SHA, "original_filename": "b.txt"}]
+
+
+def test_rejects_unknown_magic():
+    with pytest.raises(ValueError):
+        server.decode_binary_results(struct.pack('<4sI', b'XXXX', 0))
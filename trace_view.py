@@ -0,0 +1,87 @@
+"""
+Show the slowest traces from exported span files as trees, with the
+critical path marked.
+
+    python3 trace_view.py spans.jsonl [more.jsonl ...] [--slowest 5] [--trace ID]
+
+Reads the JSON-lines spans server.py writes with DDAS_TRACE_EXPORT=<file>
+and stub_backend.py --trace-file collects. A span whose parent is not in
+the files (e.g. the extension's) is a root. The critical path follows, from
+each span, the child that finished last: the chain of work the verdict
+actually waited on.
+"""
+import argparse
+import json
+from collections import defaultdict
+
+def load_spans(paths):
+    spans = {}
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    span = json.loads(line)
+                except ValueError:
+                    continue
+                spans[span['span_id']] = span
+    return spans
+
+def end_ns(span):
+    return span['start_unix_nano'] + span['duration_ms'] * 1e6
+
+def build_traces(spans):
+    """{trace_id: (roots, children by parent span_id)}"""
+    traces = defaultdict(lambda: ([], defaultdict(list)))
+    for span in spans.values():
+        roots, children = traces[span['trace_id']]
+        if span.get('parent_span_id') in spans:
+            children[span['parent_span_id']].append(span)
+        else:
+            roots.append(span)
+    for roots, children in traces.values():
+        roots.sort(key=lambda s: s['start_unix_nano'])
+        for siblings in children.values():
+            siblings.sort(key=lambda s: s['start_unix_nano'])
+    return traces
+
+def critical_path(span, children):
+    path = {span['span_id']}
+    while children.get(span['span_id']):
+        span = max(children[span['span_id']], key=end_ns)
+        path.add(span['span_id'])
+    return path
+
+def print_tree(span, children, origin, critical, depth=0):
+    marker = '*' if span['span_id'] in critical else ' '
+    offset = (span['start_unix_nano'] - origin) / 1e6
+    service = f" [{span['service']}]" if span.get('service') else ''
+    details = ''.join(f" {key}={value}" for key, value in span.get('attributes', {}).items()
+                      if key.startswith(('ddas.', 'http.status')))
+    error = f"  ERROR {span['error']}" if span.get('error') else ''
+    print(f"{marker} {offset:>9.1f} ms {span['duration_ms']:>9.1f} ms  {'  ' * depth}{span['name']}"
+          f"{service}{details}{error}")
+    for child in children.get(span['span_id'], []):
+        print_tree(child, children, origin, critical, depth + 1)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Show the slowest traces from exported span files')
+    parser.add_argument('files', nargs='+')
+    parser.add_argument('--slowest', type=int, default=5)
+    parser.add_argument('--trace', help='Show only this trace ID')
+    args = parser.parse_args()
+
+    traces = build_traces(load_spans(args.files))
+    if args.trace:
+        selected = [args.trace] if args.trace in traces else []
+    else:
+        selected = sorted(traces, key=lambda t: max(s['duration_ms'] for s in traces[t][0]),
+                          reverse=True)[:args.slowest]
+    if not selected:
+        raise SystemExit("No matching traces")
+    print("* = critical path;    start    duration")
+    for trace_id in selected:
+        roots, children = traces[trace_id]
+        print(f"\ntrace {trace_id}")
+        origin = roots[0]['start_unix_nano']
+        for root in roots:
+            print_tree(root, children, origin, critical_path(root, children))